@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+#Infraestrutura comum dos microbenchmarks
+#Aquecimento, rodadas repetidas (mediana em ns/op), alocações por operação via tracemalloc
+#e resultados em JSON para comparar uma execução com outra e achar regressões
+
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+AQUECIMENTO_PADRAO = 2000  #Chamadas descartadas antes de medir (caches, fragmentos, buffers)
+RODADAS_PADRAO = 7
+ITERACOES_PADRAO = 20000  #Chamadas por rodada
+ITERACOES_ALOCACAO = 500  #Chamadas medidas sob tracemalloc (bem mais lento, então medidas à parte)
+LIMITE_REGRESSAO = 10.0  #Variação percentual de ns/op acima da qual um caso é apontado como regressão
+
+def medir(nome, funcao, argumentos=(), iteracoes=ITERACOES_PADRAO, rodadas=RODADAS_PADRAO,
+          aquecimento=AQUECIMENTO_PADRAO, operacoes_por_chamada=1):
+    #Mede um caso e devolve o dicionário gravado no JSON (tempos em ns por operação)
+    for _ in range(aquecimento):
+        funcao(*argumentos)
+
+    #Como o timeit: o coletor de ciclos fica desligado durante as rodadas para não sortear pausas entre elas
+    tempos = []
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rodadas):
+            inicio = time.perf_counter_ns()
+            for _ in range(iteracoes):
+                funcao(*argumentos)
+            tempos.append((time.perf_counter_ns() - inicio) / (iteracoes * operacoes_por_chamada))
+    finally:
+        if gc_ativo:
+            gc.enable()
+
+    alocacoes = medir_alocacoes(funcao, argumentos, min(iteracoes, ITERACOES_ALOCACAO), operacoes_por_chamada)
+
+    return {
+        'nome': nome,
+        'ns_op': statistics.median(tempos),
+        'ns_op_min': min(tempos),
+        'ns_op_max': max(tempos),
+        'desvio_ns_op': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        'ops_s': 1e9 / statistics.median(tempos),
+        'rodadas': rodadas,
+        'iteracoes': iteracoes,
+        'operacoes_por_chamada': operacoes_por_chamada,
+        **alocacoes
+    }
+
+def medir_alocacoes(funcao, argumentos, iteracoes, operacoes_por_chamada=1):
+    #Com tracemalloc ligado:
+    #- alocacoes_op / bytes_op: blocos e bytes que continuam vivos depois da chamada (o retorno é guardado)
+    #- pico_bytes_op: maior uso de memória durante a chamada acima do início (inclui temporários já liberados)
+    retornos = [None] * iteracoes
+    picos = 0
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.take_snapshot()
+        for i in range(iteracoes):
+            atual, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            retornos[i] = funcao(*argumentos)
+            picos += tracemalloc.get_traced_memory()[1] - atual
+        depois = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    filtro = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diferencas = depois.filter_traces(filtro).compare_to(antes.filter_traces(filtro), 'filename')
+    blocos = sum(diferenca.count_diff for diferenca in diferencas)
+    tamanho = sum(diferenca.size_diff for diferenca in diferencas)
+    del retornos
+
+    operacoes = iteracoes * operacoes_por_chamada
+    return {
+        'alocacoes_op': max(blocos, 0) / operacoes,
+        'bytes_op': max(tamanho, 0) / operacoes,
+        'pico_bytes_op': picos / operacoes
+    }
+
+def imprimir_cabecalho(titulo):
+    print(f"=== {titulo} ===")
+    print(f"  {'caso':<48} {'ns/op':>10} {'±':>7} {'op/s':>12} {'aloc/op':>8} {'B/op':>8} {'pico B/op':>10}")
+
+def imprimir(resultado):
+    print(f"  {resultado['nome']:<48} {resultado['ns_op']:>10,.0f} {resultado['desvio_ns_op']:>7,.0f} "
+          f"{resultado['ops_s']:>12,.0f} {resultado['alocacoes_op']:>8.2f} {resultado['bytes_op']:>8,.0f} "
+          f"{resultado['pico_bytes_op']:>10,.0f}")
+
+def metadados():
+    #Ambiente da execução: resultados de máquinas ou versões diferentes não são comparáveis
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'processador': platform.machine(),
+        'cpus': os.cpu_count(),
+        'commit': commit
+    }
+
+def salvar_resultados(caminho, suite, resultados):
+    #Um arquivo por execução; os casos ficam indexados pelo nome para facilitar o diff
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    dados = {
+        'suite': suite,
+        'metadados': metadados(),
+        'casos': {resultado['nome']: resultado for resultado in resultados}
+    }
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {caminho}")
+
+def comparar(caminho_base, resultados, limite=LIMITE_REGRESSAO):
+    #Compara ns/op e alocações com uma execução anterior; retorna o número de regressões
+    with open(caminho_base, 'r', encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+
+    print(f"\n=== Comparação com {caminho_base} (commit {base['metadados'].get('commit')}) ===")
+    regressoes = 0
+    for resultado in resultados:
+        anterior = base['casos'].get(resultado['nome'])
+        if anterior is None:
+            print(f"  {resultado['nome']:<48} (novo)")
+            continue
+
+        variacao = (resultado['ns_op'] / anterior['ns_op'] - 1) * 100 if anterior['ns_op'] else 0.0
+        alocacoes = resultado['alocacoes_op'] - anterior['alocacoes_op']
+        marca = ""
+        if variacao > limite:
+            marca = "  <- regressão"
+            regressoes += 1
+        elif variacao < -limite:
+            marca = "  <- melhora"
+        print(f"  {resultado['nome']:<48} {anterior['ns_op']:>10,.0f} -> {resultado['ns_op']:>10,.0f} ns/op "
+              f"({variacao:+6.1f}%)  aloc/op {alocacoes:+.2f}{marca}")
+
+    if regressoes:
+        print(f"\n[AVISO] {regressoes} caso(s) mais de {limite:.0f}% mais lentos que a base", file=sys.stderr)
+    return regressoes
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+#Microbenchmarks dos caminhos quentes de requisição/resposta, sem rede e sem Docker
+#Parse como em processar_requisicao, gerar_resposta/gerar_resposta_erro, laço de recepção do ClienteHTTP
+#e atualização de contadores; resultados em JSON para comparar execuções (--comparar)
+
+import os
+import sys
+import argparse
+import itertools
+import threading
+
+#Adicionar diretório src ao path (um nível acima da pasta benchmarks)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from configuracao import ID_CUSTOMIZADO
+from protocolo_http import ParserHTTP, negociar_keep_alive
+from roteador import ROTEADOR_PADRAO
+from contadores import ContadorFragmentado
+from metricas import RegistroMetricas
+from registro import registro
+from cliente import ClienteHTTP
+from servidor_sequencial import ServidorWebSequencial
+from servidor_concorrente import ServidorWebConcorrente, EstadoConexao
+import bancada
+
+SAIDA_PADRAO = os.path.join(os.path.dirname(__file__), '..', 'resultados', 'benchmark_caminhos.json')
+
+REQUISICAO_GET = (
+    b"GET /rapido HTTP/1.1\r\n"
+    b"X-Custom-ID: " + ID_CUSTOMIZADO.encode('ascii') + b"\r\n"
+    b"Host: 76.1.0.10:8080\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n"
+)
+
+class SocketMemoria:
+    #Socket falso: sendall descarta e recv entrega uma resposta fixa em segmentos (como chegariam do TCP)
+    def __init__(self, resposta, tamanho_segmento=1448):
+        self.resposta = resposta
+        self.tamanho_segmento = tamanho_segmento
+        self.posicao = 0
+
+    def rearmar(self):
+        self.posicao = 0
+        return self
+
+    def sendall(self, dados):
+        pass
+
+    def recv(self, tamanho):
+        inicio = self.posicao
+        self.posicao = min(len(self.resposta), inicio + min(tamanho, self.tamanho_segmento))
+        return self.resposta[inicio:self.posicao]
+
+    def recv_into(self, buffer, tamanho=0):
+        pedaco = self.recv(tamanho or len(buffer))
+        buffer[:len(pedaco)] = pedaco
+        return len(pedaco)
+
+def resposta_com_corpo(tamanho_corpo):
+    #Resposta HTTP com Content-Length e corpo do tamanho pedido
+    return (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: " + str(tamanho_corpo).encode('ascii') + b"\r\n"
+        b"Server: ServidorConcorrente/1.0\r\nConnection: keep-alive\r\n\r\n" + b"x" * tamanho_corpo
+    )
+
+def casos_parse():
+    #Etapas de processar_requisicao antes de montar a resposta: parse, keep-alive e resolução da rota
+    parser_conexao = ParserHTTP()
+
+    def parse_requisicao():
+        parser_conexao.alimentar(REQUISICAO_GET)
+        return parser_conexao.proxima_requisicao()
+
+    def processar_requisicao():
+        parser_conexao.alimentar(REQUISICAO_GET)
+        requisicao = parser_conexao.proxima_requisicao()
+        keep_alive = negociar_keep_alive(requisicao.versao, requisicao.cabecalhos, 1)
+        rota, parametros = ROTEADOR_PADRAO.resolver(requisicao.metodo, requisicao.caminho)
+        return requisicao, keep_alive, rota, parametros
+
+    return [
+        ("parse GET (parser da conexão)", parse_requisicao, ()),
+        ("parse + keep-alive + rota", processar_requisicao, ())
+    ]
+
+def casos_respostas():
+    #Montagem das respostas (sem o atraso simulado das rotas lentas)
+    sequencial = ServidorWebSequencial()
+    concorrente = ServidorWebConcorrente()
+    rota, parametros = ROTEADOR_PADRAO.resolver("GET", "/rapido")
+    keep_alive = (5, 99)
+    socket_falso = SocketMemoria(b"")
+    estado = EstadoConexao(1)
+
+    def atender_concorrente():
+        parser = estado.parser
+        parser.alimentar(REQUISICAO_GET)
+        estado.requisicoes_atendidas = 1
+        return concorrente.atender_requisicao(socket_falso, ("127.0.0.1", 40000), parser.proxima_requisicao(), estado)
+
+    return [
+        ("gerar_resposta /rapido (sequencial)", sequencial.gerar_resposta,
+         ("GET", "/rapido", ID_CUSTOMIZADO, 0.0, rota, parametros, keep_alive)),
+        ("gerar_resposta_erro 404 (sequencial)", sequencial.gerar_resposta_erro,
+         (404, "Não Encontrado", ID_CUSTOMIZADO, keep_alive)),
+        ("montar_resposta /rapido (concorrente)", concorrente.montar_resposta,
+         ("GET", "/rapido", ID_CUSTOMIZADO, 0.0, rota, parametros, 1, 1, keep_alive)),
+        ("gerar_resposta_erro 404 (concorrente)", concorrente.gerar_resposta_erro,
+         (404, "Não Encontrado", 1, ID_CUSTOMIZADO, keep_alive)),
+        ("atender_requisicao completa (concorrente)", atender_concorrente, ())
+    ]
+
+def casos_cliente():
+    #Laço de recepção do ClienteHTTP (trocar_mensagens) sobre respostas já em memória
+    cliente = ClienteHTTP("127.0.0.1")
+    requisicao = REQUISICAO_GET.decode('ascii')
+    casos = []
+    for rotulo, tamanho_corpo in (("512 B", 512), ("16 KB", 16 * 1024), ("256 KB", 256 * 1024)):
+        socket_falso = SocketMemoria(resposta_com_corpo(tamanho_corpo))
+
+        def receber(socket_falso=socket_falso):
+            return cliente.trocar_mensagens(socket_falso.rearmar(), requisicao)
+
+        casos.append((f"ClienteHTTP recepção corpo {rotulo}", receber, ()))
+    return casos
+
+def casos_contadores():
+    #Atualizações de contador por requisição: lock + inteiro (desenho antigo) x desenho atual
+    lock = threading.Lock()
+    total = [0]
+    fragmentado = ContadorFragmentado()
+    sequencia = itertools.count(1)
+    metricas = RegistroMetricas("benchmark")
+
+    def incrementar_com_lock():
+        with lock:
+            total[0] += 1
+
+    return [
+        ("contador com lock (+= 1)", incrementar_com_lock, ()),
+        ("ContadorFragmentado.somar", fragmentado.somar, ()),
+        ("ContadorFragmentado.valor_recente", fragmentado.valor_recente, ()),
+        ("itertools.count (número da requisição)", sequencia.__next__, ()),
+        ("RegistroMetricas.registrar", metricas.registrar, ("rapido", 200, 0.0012, 120, 480))
+    ]
+
+GRUPOS = {
+    'parse': casos_parse,
+    'respostas': casos_respostas,
+    'cliente': casos_cliente,
+    'contadores': casos_contadores
+}
+
+def main():
+    parser_args = argparse.ArgumentParser(description='Microbenchmarks dos caminhos quentes de requisição/resposta')
+    parser_args.add_argument('--grupos', nargs='+', choices=list(GRUPOS), default=list(GRUPOS),
+                            help='Grupos de casos a executar')
+    parser_args.add_argument('--iteracoes', type=int, default=bancada.ITERACOES_PADRAO,
+                            help='Chamadas por rodada')
+    parser_args.add_argument('--rodadas', type=int, default=bancada.RODADAS_PADRAO,
+                            help='Rodadas medidas por caso (o resultado é a mediana)')
+    parser_args.add_argument('--aquecimento', type=int, default=bancada.AQUECIMENTO_PADRAO,
+                            help='Chamadas de aquecimento descartadas antes de medir')
+    parser_args.add_argument('--saida', default=SAIDA_PADRAO,
+                            help='Arquivo JSON com os resultados')
+    parser_args.add_argument('--comparar', metavar='BASE',
+                            help='JSON de uma execução anterior; termina com código 1 se houver regressão')
+    parser_args.add_argument('--limite', type=float, default=bancada.LIMITE_REGRESSAO,
+                            help='Variação percentual de ns/op considerada regressão')
+    args = parser_args.parse_args()
+
+    #Os registros INFO por requisição iriam para a thread de escrita e para o terminal
+    registro.configurar(nivel="AVISO")
+
+    bancada.imprimir_cabecalho("Benchmark dos caminhos quentes")
+    resultados = []
+    for grupo in args.grupos:
+        for nome, funcao, argumentos in GRUPOS[grupo]():
+            resultado = bancada.medir(nome, funcao, argumentos, args.iteracoes, args.rodadas, args.aquecimento)
+            resultado['grupo'] = grupo
+            bancada.imprimir(resultado)
+            resultados.append(resultado)
+
+    bancada.salvar_resultados(args.saida, 'caminhos_quentes', resultados)
+
+    if args.comparar and bancada.comparar(args.comparar, resultados, args.limite):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
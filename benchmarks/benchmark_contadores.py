@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+#Benchmark de contenção dos contadores do servidor concorrente
+#Compara o desenho antigo (um lock global tomado várias vezes por requisição) com os contadores fragmentados
+
+import os
+import sys
+import time
+import argparse
+import itertools
+import threading
+
+#Adicionar diretório src ao path (um nível acima da pasta benchmarks)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from contadores import ContadorFragmentado
+
+NUM_THREADS_PADRAO = [1, 2, 4, 8, 16, 50, 100, 200]
+
+class ContadoresComLock:
+    #Desenho antigo de ServidorWebConcorrente: tudo protegido por self.lock
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conexoes_ativas = 0
+        self.contador_requisicoes = 0
+
+    def atender(self):
+        #Entrada da conexão, número da requisição, leitura das ativas e saída da conexão
+        with self.lock:
+            self.conexoes_ativas += 1
+            id_conexao = self.conexoes_ativas
+        with self.lock:
+            self.contador_requisicoes += 1
+            num_requisicao = self.contador_requisicoes
+        with self.lock:
+            ativas_atuais = self.conexoes_ativas
+        with self.lock:
+            self.conexoes_ativas -= 1
+        return id_conexao, num_requisicao, ativas_atuais
+
+    def totais(self):
+        with self.lock:
+            return self.contador_requisicoes, self.conexoes_ativas
+
+class ContadoresFragmentados:
+    #Desenho atual: ids por itertools.count e conexões ativas em ContadorFragmentado
+    def __init__(self):
+        self.sequencia_requisicoes = itertools.count(1)
+        self.ids_conexao = itertools.count(1)
+        self.conexoes_ativas = ContadorFragmentado()
+        self.atendidas = ContadorFragmentado()
+
+    def atender(self):
+        self.conexoes_ativas.somar(1)
+        id_conexao = next(self.ids_conexao)
+        num_requisicao = next(self.sequencia_requisicoes)
+        self.atendidas.somar(1)
+        ativas_atuais = self.conexoes_ativas.valor_recente()
+        self.conexoes_ativas.somar(-1)
+        return id_conexao, num_requisicao, ativas_atuais
+
+    def totais(self):
+        return self.atendidas.valor(), self.conexoes_ativas.valor()
+
+def executar(contadores, num_threads, operacoes_por_thread):
+    #Dispara as threads juntas (barreira) e mede o tempo até todas terminarem
+    barreira = threading.Barrier(num_threads + 1)
+
+    def trabalhador():
+        barreira.wait()
+        atender = contadores.atender
+        for _ in range(operacoes_por_thread):
+            atender()
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio
+
+def executar_threads_curtas(contadores, num_threads, operacoes):
+    #Uma thread nova por operação (thread por conexão), com até num_threads vivas ao mesmo tempo
+    inicio = time.perf_counter()
+    for lote in range(0, operacoes, num_threads):
+        threads = [threading.Thread(target=contadores.atender) for _ in range(min(num_threads, operacoes - lote))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return time.perf_counter() - inicio
+
+def comparar(args, titulo, medir):
+    #Mede as duas implementações para cada quantidade de threads e confere os totais
+    print(titulo)
+    print(f"  {'threads':>7}  {'lock global':>14}  {'fragmentados':>14}  {'ganho':>6}")
+
+    for num_threads in args.threads:
+        resultados = []
+
+        for classe in (ContadoresComLock, ContadoresFragmentados):
+            contadores = classe()
+            duracao, total = medir(contadores, num_threads)
+            requisicoes, ativas = contadores.totais()
+            if requisicoes != total or ativas != 0:
+                print(f"  [ERRO] {classe.__name__}: {requisicoes} requisições e {ativas} ativas (esperado {total} e 0)")
+            resultados.append(duracao)
+
+        com_lock, fragmentado = resultados
+        print(f"  {num_threads:>7}  {total / com_lock:>10,.0f} op/s  {total / fragmentado:>10,.0f} op/s  "
+              f"{com_lock / fragmentado:>5.2f}x")
+
+def main():
+    parser_args = argparse.ArgumentParser(description='Benchmark de contenção dos contadores')
+    parser_args.add_argument('--operacoes', type=int, default=200000,
+                            help='Total de requisições simuladas por cenário (divididas entre as threads)')
+    parser_args.add_argument('--threads', type=int, nargs='+', default=NUM_THREADS_PADRAO,
+                            help='Quantidades de threads a testar')
+    parser_args.add_argument('--operacoes-curtas', type=int, default=20000,
+                            help='Total de operações no cenário de uma thread nova por operação')
+    args = parser_args.parse_args()
+
+    def threads_longas(contadores, num_threads):
+        operacoes_por_thread = max(1, args.operacoes // num_threads)
+        return executar(contadores, num_threads, operacoes_por_thread), operacoes_por_thread * num_threads
+
+    def threads_curtas(contadores, num_threads):
+        return executar_threads_curtas(contadores, num_threads, args.operacoes_curtas), args.operacoes_curtas
+
+    comparar(args, "=== Benchmark de Contadores (lock global x fragmentados) ===", threads_longas)
+    print()
+    comparar(args, "=== Uma thread curta por operação (lock global x fragmentados) ===", threads_curtas)
+
+if __name__ == "__main__":
+    main()
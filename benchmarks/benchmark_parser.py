@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+#Microbenchmark do parser HTTP incremental (protocolo_http.ParserHTTP)
+#Compara a taxa de parse com o parse antigo baseado em str.split dos servidores
+#Medido com a bancada comum (aquecimento, rodadas, alocações e JSON comparável entre execuções)
+
+import os
+import sys
+import argparse
+
+#Adicionar diretório src ao path (um nível acima da pasta benchmarks)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from protocolo_http import ParserHTTP
+import bancada
+
+SAIDA_PADRAO = os.path.join(os.path.dirname(__file__), '..', 'resultados', 'benchmark_parser.json')
+PROFUNDIDADE_PIPELINE = 32
+
+REQUISICAO_GET = (
+    b"GET /rapido HTTP/1.1\r\n"
+    b"X-Custom-ID: 40093cb61c18ade519baca198537dd16\r\n"
+    b"Host: 76.1.0.10:8080\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n"
+)
+
+REQUISICAO_POST = (
+    b"POST /dados HTTP/1.1\r\n"
+    b"X-Custom-ID: 40093cb61c18ade519baca198537dd16\r\n"
+    b"Host: 76.1.0.10:8080\r\n"
+    b"Content-Length: 512\r\n"
+    b"\r\n" + b"x" * 512
+)
+
+def parse_antigo(dados_requisicao):
+    #Parse usado antes pelos servidores: decodifica tudo e divide por '\n'
+    texto = dados_requisicao.decode('utf-8')
+    linhas_requisicao = texto.split('\n')
+    metodo, caminho, versao = linhas_requisicao[0].strip().split(' ')
+    cabecalhos = {}
+    for linha in linhas_requisicao[1:]:
+        if ':' in linha:
+            chave, valor = linha.split(':', 1)
+            cabecalhos[chave.strip()] = valor.strip()
+    return metodo, caminho, cabecalhos
+
+def parse_incremental(pedacos):
+    #Parse de uma requisição entregue em pedaços por um parser novo
+    parser = ParserHTTP()
+    for pedaco in pedacos:
+        parser.alimentar(pedaco)
+    return parser.proxima_requisicao()
+
+def parse_reutilizado(parser, dados):
+    #Parse de uma requisição com um parser já existente (conexão keep-alive)
+    parser.alimentar(dados)
+    return parser.proxima_requisicao()
+
+def parse_pipeline(dados, quantidade):
+    #Parse de várias requisições recebidas em um único buffer
+    parser = ParserHTTP()
+    parser.alimentar(dados)
+    return [parser.proxima_requisicao() for _ in range(quantidade)]
+
+def dividir(dados, tamanho):
+    #Divide os bytes em pedaços de tamanho fixo (simula segmentos TCP)
+    return [dados[i:i + tamanho] for i in range(0, len(dados), tamanho)]
+
+def casos():
+    #(nome, função, argumentos, requisições por chamada)
+    return [
+        ("antigo (str.split) GET", parse_antigo, (REQUISICAO_GET,), 1),
+        ("incremental GET (1 pedaço)", parse_incremental, ([REQUISICAO_GET],), 1),
+        ("incremental GET (parser reutilizado)", parse_reutilizado, (ParserHTTP(), REQUISICAO_GET), 1),
+        ("incremental GET (pedaços de 16 bytes)", parse_incremental, (dividir(REQUISICAO_GET, 16),), 1),
+        ("incremental POST 512 bytes de corpo", parse_incremental, ([REQUISICAO_POST],), 1),
+        (f"incremental pipeline ({PROFUNDIDADE_PIPELINE} GET)", parse_pipeline,
+         (REQUISICAO_GET * PROFUNDIDADE_PIPELINE, PROFUNDIDADE_PIPELINE), PROFUNDIDADE_PIPELINE)
+    ]
+
+def main():
+    parser_args = argparse.ArgumentParser(description='Microbenchmark do parser HTTP')
+    parser_args.add_argument('--iteracoes', type=int, default=bancada.ITERACOES_PADRAO,
+                            help='Requisições por rodada em cada cenário')
+    parser_args.add_argument('--rodadas', type=int, default=bancada.RODADAS_PADRAO,
+                            help='Rodadas medidas por cenário (o resultado é a mediana)')
+    parser_args.add_argument('--aquecimento', type=int, default=bancada.AQUECIMENTO_PADRAO,
+                            help='Chamadas de aquecimento descartadas antes de medir')
+    parser_args.add_argument('--saida', default=SAIDA_PADRAO,
+                            help='Arquivo JSON com os resultados')
+    parser_args.add_argument('--comparar', metavar='BASE',
+                            help='JSON de uma execução anterior; termina com código 1 se houver regressão')
+    parser_args.add_argument('--limite', type=float, default=bancada.LIMITE_REGRESSAO,
+                            help='Variação percentual de ns/op considerada regressão')
+    args = parser_args.parse_args()
+
+    bancada.imprimir_cabecalho("Benchmark do Parser HTTP")
+    resultados = []
+    for nome, funcao, argumentos, requisicoes_por_chamada in casos():
+        #Cenários com várias requisições por chamada fazem menos chamadas para medir o mesmo número de requisições
+        iteracoes = max(1, args.iteracoes // requisicoes_por_chamada)
+        resultado = bancada.medir(nome, funcao, argumentos, iteracoes, args.rodadas,
+                                  max(1, args.aquecimento // requisicoes_por_chamada), requisicoes_por_chamada)
+        bancada.imprimir(resultado)
+        resultados.append(resultado)
+
+    #Custo relativo ao parse antigo (que não valida a requisição nem trata leituras parciais)
+    antigo = resultados[0]['ns_op']
+    print(f"\n  Custo relativo a '{resultados[0]['nome']}':")
+    for resultado in resultados[1:]:
+        print(f"    {resultado['nome']:<46} {resultado['ns_op'] / antigo:>5.2f}x  "
+              f"(+{resultado['ns_op'] - antigo:,.0f} ns/req)")
+
+    bancada.salvar_resultados(args.saida, 'parser_http', resultados)
+
+    if args.comparar and bancada.comparar(args.comparar, resultados, args.limite):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/bin/bash
 # Script principal para executar o projeto Redes II
 
-echo "=== Projeto Redes II - Servidor Web Sequencial vs Concorrente ==="
+echo "=== Projeto Redes II - Servidor Web Sequencial vs Concorrente vs Assíncrono ==="
 echo "Matrícula: 20239057601"
 echo "Subnet configurada: 76.1.0.0/16"
 echo ""
@@ -95,7 +95,7 @@ gerar_analises() {
     echo "=== Gerando análises e gráficos ==="
     
     # Verifica se existem resultados para analisar
-    if docker exec cliente_teste test -f /app/results/test_results.json; then
+    if docker exec cliente_teste test -f /app/resultados/resultados_testes.json; then
         echo "Analisando resultados existentes..."
         docker exec cliente_teste python3 testes/analisar_resultados.py
     else
@@ -3,14 +3,231 @@ Cliente HTTP para testar os servidores
 """
 import socket
 import time
-import json
+import select
 import threading
-from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR
+from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR, MAX_CONEXOES, TAMANHO_LEITURA, MAX_TAMANHO_CABECALHO
+
+TAMANHO_BUFFER_RESPOSTA = 4096  #Tamanho inicial do buffer de recepção; dobra quando não cabe mais um recv
+
+class PoolConexoes:
+    #Pool de sockets keep-alive reutilizáveis por (host, porta), seguro entre threads
+    def __init__(self, max_ociosas_por_destino=MAX_CONEXOES):
+        self.max_ociosas_por_destino = max_ociosas_por_destino
+        self.conexoes_ociosas = {}
+        self.lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+    
+    def obter(self, host, porta, timeout=10):
+        #Retira um socket ocioso do pool ou abre um novo (retorna socket, reutilizado)
+        destino = (host, porta)
+        while True:
+            with self.lock:
+                ociosas = self.conexoes_ociosas.get(destino)
+                socket_cliente = ociosas.pop() if ociosas else None
+            
+            if socket_cliente is None:
+                break
+            if not self.conexao_obsoleta(socket_cliente):
+                with self.lock:
+                    self.acertos += 1
+                return socket_cliente, True
+            socket_cliente.close()
+        
+        with self.lock:
+            self.falhas += 1
+        
+        socket_cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        socket_cliente.settimeout(timeout)
+        socket_cliente.connect(destino)
+        return socket_cliente, False
+    
+    def devolver(self, host, porta, socket_cliente):
+        #Devolve um socket ao pool para ser reutilizado por outra requisição
+        with self.lock:
+            ociosas = self.conexoes_ociosas.setdefault((host, porta), [])
+            if len(ociosas) < self.max_ociosas_por_destino:
+                ociosas.append(socket_cliente)
+                return
+        socket_cliente.close()
+    
+    def conexao_obsoleta(self, socket_cliente):
+        #Um socket ocioso legível foi fechado pelo servidor (EOF) ou tem dados inesperados
+        try:
+            legiveis, _, _ = select.select([socket_cliente], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(legiveis)
+    
+    def estatisticas(self):
+        #Contadores de acertos/falhas do pool
+        with self.lock:
+            return {'pool_acertos': self.acertos, 'pool_falhas': self.falhas}
+    
+    def fechar_todas(self):
+        #Fecha todos os sockets ociosos
+        with self.lock:
+            for ociosas in self.conexoes_ociosas.values():
+                for socket_cliente in ociosas:
+                    socket_cliente.close()
+            self.conexoes_ociosas = {}
+
+class ConexaoEncerrada(Exception):
+    #O servidor fechou a conexão antes de enviar qualquer dado da resposta
+    pass
+
+class RespostaInvalida(Exception):
+    #Resposta malformada ou cortada no meio (não é seguro repetir a requisição)
+    pass
+
+class LeitorResposta:
+    #Lê respostas HTTP/1.1 de um socket em tempo linear
+    #recv_into escreve direto num bytearray que só cresce por dobra (sem bytes += a cada pedaço),
+    #o fim do cabeçalho é procurado só nos bytes novos e o cabeçalho é interpretado uma única vez;
+    #o corpo vem pelo Content-Length, em chunks ou até o fechamento da conexão.
+    #Bytes recebidos além da resposta ficam no buffer para a próxima leitura (respostas em pipeline)
+    def __init__(self, socket_cliente, tamanho_inicial=TAMANHO_BUFFER_RESPOSTA):
+        self.socket_cliente = socket_cliente
+        self.buffer = bytearray(tamanho_inicial)
+        self.inicio = 0  #Primeiro byte ainda não consumido
+        self.fim = 0     #Fim dos bytes recebidos
+    
+    def receber(self, minimo=1):
+        #Lê do socket até haver pelo menos `minimo` bytes não consumidos; False se a conexão fechar antes
+        #(pode compactar o buffer: posições guardadas pelo chamador devem ser relativas a self.inicio)
+        while self.fim - self.inicio < minimo:
+            livre = len(self.buffer) - self.fim
+            if livre < min(minimo - (self.fim - self.inicio), TAMANHO_LEITURA):
+                self.reservar(minimo)
+            with memoryview(self.buffer) as visao:
+                lidos = self.socket_cliente.recv_into(visao[self.fim:])
+            if not lidos:
+                return False
+            self.fim += lidos
+        return True
+    
+    def reservar(self, total):
+        #Garante espaço para `total` bytes não consumidos: descarta o que já foi consumido e dobra o buffer se preciso
+        if self.inicio:
+            pendentes = self.fim - self.inicio
+            self.buffer[:pendentes] = self.buffer[self.inicio:self.fim]
+            self.inicio, self.fim = 0, pendentes
+        tamanho = len(self.buffer)
+        while tamanho < total:
+            tamanho *= 2
+        if tamanho > len(self.buffer):
+            self.buffer.extend(bytes(tamanho - len(self.buffer)))
+    
+    def ler(self, metodo='GET'):
+        #Lê uma resposta completa e retorna (codigo_status, cabecalhos, corpo em bytes)
+        codigo_status, versao, cabecalhos = self.ler_cabecalhos()
+        
+        if metodo == 'HEAD' or codigo_status < 200 or codigo_status in (204, 304):
+            return codigo_status, cabecalhos, b""
+        
+        if 'chunked' in cabecalhos.get('transfer-encoding', '').lower():
+            return codigo_status, cabecalhos, self.ler_chunks()
+        
+        tamanho_conteudo = cabecalhos.get('content-length')
+        if tamanho_conteudo:
+            try:
+                tamanho_conteudo = int(tamanho_conteudo)
+            except ValueError:
+                raise RespostaInvalida(f"Content-Length inválido: {tamanho_conteudo!r}")
+            return codigo_status, cabecalhos, self.consumir(tamanho_conteudo)
+        
+        #Sem tamanho declarado: o corpo vai até o fechamento, se o servidor for fechar a conexão
+        conexao = cabecalhos.get('connection', '').lower()
+        if 'close' in conexao or (versao == 'HTTP/1.0' and 'keep-alive' not in conexao):
+            while self.receber(self.fim - self.inicio + 1):
+                pass
+            return codigo_status, cabecalhos, self.consumir(self.fim - self.inicio)
+        return codigo_status, cabecalhos, b""
+    
+    def ler_cabecalhos(self):
+        #Recebe até o fim do bloco de cabeçalhos e o interpreta (linha de status + dicionário)
+        #Os nomes ficam em minúsculas, como no ParserHTTP dos servidores
+        busca = 0  #Relativa a self.inicio
+        while True:
+            fim_cabecalho = self.buffer.find(b"\r\n\r\n", self.inicio + busca, self.fim)
+            if fim_cabecalho >= 0:
+                break
+            if self.fim - self.inicio > MAX_TAMANHO_CABECALHO:
+                raise RespostaInvalida("Cabeçalho da resposta muito grande")
+            busca = max(0, self.fim - self.inicio - 3)  #O separador pode ter chegado cortado entre dois recv
+            vazio = self.fim == self.inicio
+            if not self.receber(self.fim - self.inicio + 1):
+                if vazio:
+                    raise ConexaoEncerrada("Conexão encerrada pelo servidor sem resposta")
+                raise RespostaInvalida("Conexão encerrada no meio do cabeçalho")
+        
+        linhas = self.buffer[self.inicio:fim_cabecalho].decode('latin-1').split('\r\n')
+        self.inicio = fim_cabecalho + 4
+        
+        try:
+            versao, codigo_status = linhas[0].split(' ', 2)[:2]
+            codigo_status = int(codigo_status)
+        except ValueError:
+            raise RespostaInvalida(f"Linha de status inválida: {linhas[0]!r}")
+        
+        cabecalhos = {}
+        for linha in linhas[1:]:
+            chave, separador, valor = linha.partition(':')
+            if separador:
+                cabecalhos[chave.strip().lower()] = valor.strip()
+        return codigo_status, versao, cabecalhos
+    
+    def consumir(self, tamanho):
+        #Retorna os próximos `tamanho` bytes, recebendo o que faltar (o buffer é reservado de uma vez)
+        if self.fim - self.inicio < tamanho:
+            self.reservar(tamanho)
+            if not self.receber(tamanho):
+                raise RespostaInvalida(f"Conexão encerrada com {self.fim - self.inicio} de {tamanho} bytes do corpo")
+        with memoryview(self.buffer) as visao:
+            dados = bytes(visao[self.inicio:self.inicio + tamanho])  #Uma cópia só (a fatia do bytearray copiaria duas vezes)
+        self.inicio += tamanho
+        return dados
+    
+    def ler_linha(self):
+        #Próxima linha terminada em CRLF (sem o CRLF), usada no tamanho dos chunks e nos trailers
+        busca = 0  #Relativa a self.inicio
+        while True:
+            fim_linha = self.buffer.find(b"\r\n", self.inicio + busca, self.fim)
+            if fim_linha >= 0:
+                linha = bytes(self.buffer[self.inicio:fim_linha])
+                self.inicio = fim_linha + 2
+                return linha
+            if self.fim - self.inicio > MAX_TAMANHO_CABECALHO:
+                raise RespostaInvalida("Linha de chunk muito grande")
+            busca = max(0, self.fim - self.inicio - 1)
+            if not self.receber(self.fim - self.inicio + 1):
+                raise RespostaInvalida("Conexão encerrada no meio de um chunk")
+    
+    def ler_chunks(self):
+        #Corpo com Transfer-Encoding: chunked (tamanho em hexadecimal, dados, CRLF; termina no chunk 0)
+        partes = []
+        while True:
+            linha = self.ler_linha()
+            try:
+                tamanho = int(linha.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise RespostaInvalida(f"Tamanho de chunk inválido: {linha!r}")
+            if tamanho == 0:
+                break
+            partes.append(self.consumir(tamanho))
+            if self.ler_linha():
+                raise RespostaInvalida("Chunk sem CRLF no final")
+        
+        #Trailers (ignorados) até a linha vazia
+        while self.ler_linha():
+            pass
+        return b"".join(partes)
 
 class ClienteHTTP:
-    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR):
+    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR, usar_pool=False):
         self.host_servidor = host_servidor
         self.porta_servidor = porta_servidor
+        self.pool = PoolConexoes() if usar_pool else None
         
     def enviar_requisicao(self, metodo='GET', caminho='/', cabecalhos=None, corpo=None):
         #Envia uma requisição HTTP para o servidor
@@ -20,80 +237,45 @@ class ClienteHTTP:
         #Adiciona o cabeçalho customizado obrigatório
         cabecalhos['X-Custom-ID'] = ID_CUSTOMIZADO
         cabecalhos['Host'] = f"{self.host_servidor}:{self.porta_servidor}"
-        cabecalhos['Connection'] = 'close'
+        cabecalhos['Connection'] = 'keep-alive' if self.pool else 'close'
         
         try:
-            #Cria conexão
-            socket_cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            socket_cliente.settimeout(10)  # Timeout de 10 segundos
-            
+            #Cria conexão (ou reutiliza uma do pool)
             tempo_inicio = time.time()
-            socket_cliente.connect((self.host_servidor, self.porta_servidor))
+            socket_cliente, reutilizada = self.abrir_conexao()
             tempo_conexao = time.time() - tempo_inicio
             
-            #Monta a requisição HTTP
+            #Monta a requisição HTTP (o Content-Length precisa entrar no bloco de cabeçalhos)
+            if corpo:
+                cabecalhos['Content-Length'] = str(len(corpo.encode('utf-8')))
+            
             linha_requisicao = f"{metodo} {caminho} HTTP/1.1\r\n"
             linhas_cabecalho = "\r\n".join([f"{chave}: {valor}" for chave, valor in cabecalhos.items()])
             
             if corpo:
-                cabecalhos['Content-Length'] = str(len(corpo))
                 requisicao = f"{linha_requisicao}{linhas_cabecalho}\r\n\r\n{corpo}"
             else:
                 requisicao = f"{linha_requisicao}{linhas_cabecalho}\r\n\r\n"
             
-            #Envia requisição
-            inicio_envio = time.time()
-            socket_cliente.send(requisicao.encode('utf-8'))
-            tempo_envio = time.time() - inicio_envio
-            
-            #Recebe resposta
-            inicio_recepcao = time.time()
-            dados_resposta = b""
-            while True:
-                pedaco = socket_cliente.recv(4096)
-                if not pedaco:
-                    break
-                dados_resposta += pedaco
-                
-                #Verifica se recebeu a resposta completa
-                if b"\r\n\r\n" in dados_resposta:
-                    fim_cabecalho = dados_resposta.find(b"\r\n\r\n")
-                    parte_cabecalhos = dados_resposta[:fim_cabecalho].decode('utf-8')
-                    
-                    #Verifica se tem Content-Length
-                    tamanho_conteudo = 0
-                    for linha in parte_cabecalhos.split('\r\n'):
-                        if linha.lower().startswith('content-length:'):
-                            tamanho_conteudo = int(linha.split(':')[1].strip())
-                            break
-                    
-                    if tamanho_conteudo > 0:
-                        inicio_corpo = fim_cabecalho + 4
-                        corpo_recebido = len(dados_resposta) - inicio_corpo
-                        if corpo_recebido >= tamanho_conteudo:
-                            break
-                    else:
-                        break
+            try:
+                resposta, tempo_envio, tempo_recepcao = self.trocar_mensagens(socket_cliente, requisicao, metodo)
+            except (ConexaoEncerrada, ConnectionError):
+                if not reutilizada:
+                    raise
+                #O servidor fechou o socket reaproveitado: repete uma vez com conexão nova
+                socket_cliente.close()
+                socket_cliente, reutilizada = self.abrir_conexao(somente_nova=True)
+                resposta, tempo_envio, tempo_recepcao = self.trocar_mensagens(socket_cliente, requisicao, metodo)
             
-            tempo_recepcao = time.time() - inicio_recepcao
             tempo_total = time.time() - tempo_inicio
+            codigo_status, cabecalhos_resposta, corpo_resposta = resposta
             
-            socket_cliente.close()
+            self.liberar_conexao(socket_cliente, cabecalhos_resposta)
             
-            #Parse da resposta
-            texto_resposta = dados_resposta.decode('utf-8')
-            
-            if "\r\n\r\n" in texto_resposta:
-                parte_cabecalhos, parte_corpo = texto_resposta.split("\r\n\r\n", 1)
-                linha_status = parte_cabecalhos.split('\r\n')[0]
-                codigo_status = int(linha_status.split(' ')[1])
-            else:
-                codigo_status = 0
-                parte_corpo = ""
-            
-            return {
+            resultado = {
                 'codigo_status': codigo_status,
-                'corpo': parte_corpo,
+                'cabecalhos': cabecalhos_resposta,
+                'corpo': corpo_resposta.decode('utf-8', 'replace'),
                 'tempo_resposta': tempo_total,
                 'tempo_conexao': tempo_conexao,
                 'tempo_envio': tempo_envio,
@@ -101,9 +283,19 @@ class ClienteHTTP:
                 'sucesso': True
             }
             
+            if self.pool:
+                resultado['conexao_reutilizada'] = reutilizada
+                resultado.update(self.pool.estatisticas())
+            
+            return resultado
+            
         except Exception as e:
-            return {
+            if 'socket_cliente' in locals():
+                socket_cliente.close()
+            
+            resultado = {
                 'codigo_status': 0,
+                'cabecalhos': {},
                 'corpo': "",
                 'tempo_resposta': time.time() - tempo_inicio if 'tempo_inicio' in locals() else 0,
                 'tempo_conexao': 0,
@@ -112,6 +304,141 @@ class ClienteHTTP:
                 'sucesso': False,
                 'erro': str(e)
             }
+            
+            if self.pool:
+                resultado['conexao_reutilizada'] = False
+                resultado.update(self.pool.estatisticas())
+            
+            return resultado
+    
+    def enviar_pipeline(self, caminhos, metodo='GET', cabecalhos=None):
+        #Pipelining HTTP/1.1: envia todas as requisições de uma vez na mesma conexão e lê as respostas na ordem
+        #Retorna uma lista de resultados no formato de enviar_requisicao (tempo_resposta conta do envio do lote);
+        #se o servidor fechar a conexão no meio do lote (Connection: close), o resto vai em uma conexão nova
+        requisicoes = {}
+        resultados = []
+        pendentes = list(caminhos)
+        somente_nova = False
+        
+        while pendentes:
+            tempo_inicio = time.time()
+            recebidas = 0
+            socket_cliente, reutilizada = None, False
+            try:
+                socket_cliente, reutilizada = self.abrir_conexao(somente_nova)
+                tempo_conexao = time.time() - tempo_inicio
+                
+                #Sem pool, só a última requisição do lote pede o fechamento da conexão
+                lote = []
+                for posicao, caminho in enumerate(pendentes):
+                    persistente = bool(self.pool) or posicao < len(pendentes) - 1
+                    chave = (caminho, persistente)
+                    if chave not in requisicoes:
+                        requisicoes[chave] = self.montar_requisicao(metodo, caminho, cabecalhos, persistente)
+                    lote.append(requisicoes[chave])
+                
+                inicio_envio = time.time()
+                socket_cliente.sendall(b"".join(lote))
+                tempo_envio = time.time() - inicio_envio
+                
+                leitor = LeitorResposta(socket_cliente)
+                for _ in pendentes:
+                    inicio_recepcao = time.time()
+                    codigo_status, cabecalhos_resposta, corpo_resposta = leitor.ler(metodo)
+                    agora = time.time()
+                    resultado = {
+                        'codigo_status': codigo_status,
+                        'cabecalhos': cabecalhos_resposta,
+                        'corpo': corpo_resposta.decode('utf-8', 'replace'),
+                        'tempo_resposta': agora - tempo_inicio,
+                        'tempo_conexao': tempo_conexao,
+                        'tempo_envio': tempo_envio,
+                        'tempo_recepcao': agora - inicio_recepcao,
+                        'sucesso': True
+                    }
+                    if self.pool:
+                        resultado['conexao_reutilizada'] = reutilizada
+                        resultado.update(self.pool.estatisticas())
+                    resultados.append(resultado)
+                    recebidas += 1
+                    if 'close' in cabecalhos_resposta.get('connection', '').lower():
+                        break
+                
+                self.liberar_conexao(socket_cliente, cabecalhos_resposta)
+                
+            except Exception as e:
+                if socket_cliente is not None:
+                    socket_cliente.close()
+                
+                #O servidor fechou o socket reaproveitado antes da primeira resposta: repete uma vez com conexão nova
+                if reutilizada and not recebidas and isinstance(e, (ConexaoEncerrada, ConnectionError)):
+                    somente_nova = True
+                    continue
+                
+                for _ in pendentes[recebidas:]:
+                    resultado = {
+                        'codigo_status': 0,
+                        'cabecalhos': {},
+                        'corpo': "",
+                        'tempo_resposta': time.time() - tempo_inicio,
+                        'tempo_conexao': 0,
+                        'tempo_envio': 0,
+                        'tempo_recepcao': 0,
+                        'sucesso': False,
+                        'erro': str(e)
+                    }
+                    if self.pool:
+                        resultado['conexao_reutilizada'] = False
+                        resultado.update(self.pool.estatisticas())
+                    resultados.append(resultado)
+                break
+            
+            pendentes = pendentes[recebidas:]
+            somente_nova = False
+        
+        return resultados
+    
+    def montar_requisicao(self, metodo, caminho, cabecalhos=None, persistente=True):
+        #Bytes de uma requisição sem corpo com os cabeçalhos obrigatórios (usado no pipelining)
+        todos_cabecalhos = dict(cabecalhos) if cabecalhos else {}
+        todos_cabecalhos['X-Custom-ID'] = ID_CUSTOMIZADO
+        todos_cabecalhos['Host'] = f"{self.host_servidor}:{self.porta_servidor}"
+        todos_cabecalhos['Connection'] = 'keep-alive' if persistente else 'close'
+        
+        linhas_cabecalho = "\r\n".join(f"{chave}: {valor}" for chave, valor in todos_cabecalhos.items())
+        return f"{metodo} {caminho} HTTP/1.1\r\n{linhas_cabecalho}\r\n\r\n".encode('utf-8')
+    
+    def abrir_conexao(self, somente_nova=False):
+        #Abre um socket novo ou retira um do pool (retorna socket, reutilizado)
+        if self.pool and not somente_nova:
+            return self.pool.obter(self.host_servidor, self.porta_servidor)
+        
+        socket_cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        socket_cliente.settimeout(10)  # Timeout de 10 segundos
+        socket_cliente.connect((self.host_servidor, self.porta_servidor))
+        return socket_cliente, False
+    
+    def liberar_conexao(self, socket_cliente, cabecalhos_resposta):
+        #Devolve o socket ao pool se o servidor mantiver a conexão aberta, senão fecha
+        if self.pool and 'close' not in cabecalhos_resposta.get('connection', '').lower():
+            self.pool.devolver(self.host_servidor, self.porta_servidor, socket_cliente)
+        else:
+            socket_cliente.close()
+    
+    def trocar_mensagens(self, socket_cliente, requisicao, metodo='GET'):
+        #Envia a requisição e recebe a resposta completa
+        #Retorna ((codigo_status, cabecalhos, corpo), tempo de envio, tempo de recepção)
+        
+        #Envia requisição
+        inicio_envio = time.time()
+        socket_cliente.sendall(requisicao.encode('utf-8'))
+        tempo_envio = time.time() - inicio_envio
+        
+        #Recebe resposta
+        inicio_recepcao = time.time()
+        resposta = LeitorResposta(socket_cliente).ler(metodo)
+        tempo_recepcao = time.time() - inicio_recepcao
+        return resposta, tempo_envio, tempo_recepcao
 
 if __name__ == "__main__":
     print("Este e o modulo cliente.py")
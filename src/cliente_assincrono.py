@@ -0,0 +1,260 @@
+"""
+Cliente HTTP assíncrono (asyncio) para gerar carga com milhares de conexões em um único processo
+"""
+import asyncio
+import resource
+import time
+from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR
+
+TIMEOUT_CLIENTE = 10  #Segundos para conectar e para receber a resposta completa
+
+def ajustar_limite_descritores(necessarios):
+    #Sobe o limite flexível de arquivos abertos (até o rígido) para caber uma conexão por cliente
+    flexivel, rigido = resource.getrlimit(resource.RLIMIT_NOFILE)
+    desejado = necessarios if rigido == resource.RLIM_INFINITY else min(necessarios, rigido)
+    if desejado > flexivel:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (desejado, rigido))
+        return desejado
+    return flexivel
+
+class ClienteHTTPAssincrono:
+    #Um cliente por conexão simulada: guarda no máximo um socket keep-alive, então o custo é só o do socket
+    __slots__ = ('host_servidor', 'porta_servidor', 'keep_alive', 'timeout', 'leitor', 'escritor',
+                 'manter_corpo')
+
+    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR, keep_alive=False,
+                 timeout=TIMEOUT_CLIENTE, manter_corpo=True):
+        self.host_servidor = host_servidor
+        self.porta_servidor = porta_servidor
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.manter_corpo = manter_corpo  #Sem corpo e cabeçalhos, a memória por resultado fica constante
+        self.leitor = None
+        self.escritor = None
+
+    def montar_requisicao(self, metodo, caminho, cabecalhos=None, corpo=None, persistente=None):
+        #Bytes da requisição com os mesmos cabeçalhos do ClienteHTTP
+        #persistente força o Connection (requisições de um lote em pipeline mantêm a conexão até a última)
+        if persistente is None:
+            persistente = self.keep_alive
+        todos_cabecalhos = dict(cabecalhos) if cabecalhos else {}
+        todos_cabecalhos['X-Custom-ID'] = ID_CUSTOMIZADO
+        todos_cabecalhos['Host'] = f"{self.host_servidor}:{self.porta_servidor}"
+        todos_cabecalhos['Connection'] = 'keep-alive' if persistente else 'close'
+
+        corpo_bytes = corpo.encode('utf-8') if corpo else b""
+        if corpo_bytes:
+            todos_cabecalhos['Content-Length'] = str(len(corpo_bytes))
+
+        linhas_cabecalho = "\r\n".join(f"{chave}: {valor}" for chave, valor in todos_cabecalhos.items())
+        return f"{metodo} {caminho} HTTP/1.1\r\n{linhas_cabecalho}\r\n\r\n".encode('utf-8') + corpo_bytes
+
+    async def enviar_requisicao(self, metodo='GET', caminho='/', cabecalhos=None, corpo=None, requisicao=None):
+        #Envia uma requisição e devolve um dicionário no mesmo formato de ClienteHTTP.enviar_requisicao
+        #requisicao permite reaproveitar bytes já montados quando o mesmo pedido se repete
+        if requisicao is None:
+            requisicao = self.montar_requisicao(metodo, caminho, cabecalhos, corpo)
+
+        tempo_inicio = time.time()
+        tempo_conexao = 0
+        try:
+            reutilizada = self.escritor is not None
+            if not reutilizada:
+                await self.abrir_conexao()
+                tempo_conexao = time.time() - tempo_inicio
+
+            try:
+                resposta, tempo_envio, tempo_recepcao = await self.trocar_mensagens(requisicao, metodo)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                if not reutilizada:
+                    raise
+                #O servidor fechou o socket reaproveitado: repete uma vez com conexão nova
+                self.fechar()
+                inicio_conexao = time.time()
+                await self.abrir_conexao()
+                tempo_conexao = time.time() - inicio_conexao
+                reutilizada = False
+                resposta, tempo_envio, tempo_recepcao = await self.trocar_mensagens(requisicao, metodo)
+
+            tempo_total = time.time() - tempo_inicio
+            codigo_status, cabecalhos_resposta, corpo_resposta = resposta
+
+            if not self.keep_alive or 'close' in cabecalhos_resposta.get('connection', '').lower():
+                self.fechar()
+
+            resultado = {
+                'codigo_status': codigo_status,
+                'cabecalhos': cabecalhos_resposta if self.manter_corpo else {},
+                'corpo': corpo_resposta.decode('utf-8', 'replace') if self.manter_corpo else "",
+                'tempo_resposta': tempo_total,
+                'tempo_conexao': tempo_conexao,
+                'tempo_envio': tempo_envio,
+                'tempo_recepcao': tempo_recepcao,
+                'sucesso': True
+            }
+            if self.keep_alive:
+                resultado['conexao_reutilizada'] = reutilizada
+            return resultado
+
+        except Exception as e:
+            self.fechar()
+            resultado = {
+                'codigo_status': 0,
+                'cabecalhos': {},
+                'corpo': "",
+                'tempo_resposta': time.time() - tempo_inicio,
+                'tempo_conexao': 0,
+                'tempo_envio': 0,
+                'tempo_recepcao': 0,
+                'sucesso': False,
+                'erro': str(e) or type(e).__name__
+            }
+            if self.keep_alive:
+                resultado['conexao_reutilizada'] = False
+            return resultado
+
+    async def enviar_pipeline(self, requisicoes, metodo='GET'):
+        #Pipelining HTTP/1.1: escreve os bytes de todas as requisições de uma vez e lê as respostas na ordem
+        #Retorna uma lista de resultados como enviar_requisicao (tempo_resposta conta do envio do lote);
+        #se o servidor fechar a conexão no meio do lote, o resto vai em uma conexão nova
+        resultados = []
+        pendentes = list(requisicoes)
+        repetiu = False
+
+        while pendentes:
+            tempo_inicio = time.time()
+            tempo_conexao = 0
+            recebidas = 0
+            reutilizada = self.escritor is not None
+            try:
+                if not reutilizada:
+                    await self.abrir_conexao()
+                    tempo_conexao = time.time() - tempo_inicio
+
+                inicio_envio = time.time()
+                self.escritor.write(b"".join(pendentes))
+                await self.escritor.drain()
+                tempo_envio = time.time() - inicio_envio
+
+                for _ in pendentes:
+                    inicio_recepcao = time.time()
+                    codigo_status, cabecalhos_resposta, corpo_resposta = await self.ler_resposta(metodo)
+                    agora = time.time()
+                    resultado = {
+                        'codigo_status': codigo_status,
+                        'cabecalhos': cabecalhos_resposta if self.manter_corpo else {},
+                        'corpo': corpo_resposta.decode('utf-8', 'replace') if self.manter_corpo else "",
+                        'tempo_resposta': agora - tempo_inicio,
+                        'tempo_conexao': tempo_conexao,
+                        'tempo_envio': tempo_envio,
+                        'tempo_recepcao': agora - inicio_recepcao,
+                        'sucesso': True
+                    }
+                    if self.keep_alive:
+                        resultado['conexao_reutilizada'] = reutilizada
+                    resultados.append(resultado)
+                    recebidas += 1
+                    if 'close' in cabecalhos_resposta.get('connection', '').lower():
+                        self.fechar()
+                        break
+
+                if not self.keep_alive:
+                    self.fechar()
+
+            except Exception as e:
+                self.fechar()
+                #O servidor fechou o socket reaproveitado antes da primeira resposta: repete uma vez com conexão nova
+                if reutilizada and not recebidas and not repetiu and \
+                        isinstance(e, (asyncio.IncompleteReadError, ConnectionError)):
+                    repetiu = True
+                    continue
+
+                for _ in pendentes[recebidas:]:
+                    resultado = {
+                        'codigo_status': 0,
+                        'cabecalhos': {},
+                        'corpo': "",
+                        'tempo_resposta': time.time() - tempo_inicio,
+                        'tempo_conexao': 0,
+                        'tempo_envio': 0,
+                        'tempo_recepcao': 0,
+                        'sucesso': False,
+                        'erro': str(e) or type(e).__name__
+                    }
+                    if self.keep_alive:
+                        resultado['conexao_reutilizada'] = False
+                    resultados.append(resultado)
+                break
+
+            pendentes = pendentes[recebidas:]
+            repetiu = False
+
+        return resultados
+
+    async def abrir_conexao(self):
+        self.leitor, self.escritor = await asyncio.wait_for(
+            asyncio.open_connection(self.host_servidor, self.porta_servidor), self.timeout
+        )
+
+    async def trocar_mensagens(self, requisicao, metodo='GET'):
+        #Envia a requisição e lê a resposta
+        #Retorna ((codigo_status, cabecalhos, corpo em bytes), tempo de envio, tempo de recepção)
+        inicio_envio = time.time()
+        self.escritor.write(requisicao)
+        await self.escritor.drain()
+        tempo_envio = time.time() - inicio_envio
+
+        inicio_recepcao = time.time()
+        resposta = await self.ler_resposta(metodo)
+        tempo_recepcao = time.time() - inicio_recepcao
+        return resposta, tempo_envio, tempo_recepcao
+
+    async def ler_resposta(self, metodo='GET'):
+        #Lê uma resposta completa do stream (mesmas regras de corpo do LeitorResposta do ClienteHTTP)
+        #e retorna (codigo_status, cabecalhos, corpo em bytes)
+        #Bytes de respostas seguintes (pipelining) ficam no StreamReader para a próxima leitura
+        bloco_cabecalhos = await asyncio.wait_for(self.leitor.readuntil(b"\r\n\r\n"), self.timeout)
+        linhas = bloco_cabecalhos[:-4].decode('latin-1').split('\r\n')
+        versao, codigo_status = linhas[0].split(' ', 2)[:2]
+        codigo_status = int(codigo_status)
+        cabecalhos = {}
+        for linha in linhas[1:]:
+            chave, separador, valor = linha.partition(':')
+            if separador:
+                cabecalhos[chave.strip().lower()] = valor.strip()  #Minúsculas, como no ClienteHTTP
+
+        corpo = b""
+        if metodo == 'HEAD' or codigo_status < 200 or codigo_status in (204, 304):
+            pass
+        elif 'chunked' in cabecalhos.get('transfer-encoding', '').lower():
+            corpo = await asyncio.wait_for(self.ler_chunks(), self.timeout)
+        elif cabecalhos.get('content-length'):
+            tamanho_conteudo = int(cabecalhos['content-length'])
+            corpo = await asyncio.wait_for(self.leitor.readexactly(tamanho_conteudo), self.timeout)
+        else:
+            #Sem tamanho declarado: o corpo vai até o fechamento, se o servidor for fechar a conexão
+            conexao = cabecalhos.get('connection', '').lower()
+            if 'close' in conexao or (versao == 'HTTP/1.0' and 'keep-alive' not in conexao):
+                corpo = await asyncio.wait_for(self.leitor.read(), self.timeout)
+
+        return codigo_status, cabecalhos, corpo
+
+    async def ler_chunks(self):
+        #Corpo com Transfer-Encoding: chunked (termina no chunk de tamanho 0 e nos trailers)
+        partes = []
+        while True:
+            linha = await self.leitor.readuntil(b"\r\n")
+            tamanho = int(linha.split(b';', 1)[0].strip(), 16)
+            if tamanho == 0:
+                break
+            dados = await self.leitor.readexactly(tamanho + 2)  #Dados do chunk + CRLF
+            partes.append(dados[:-2])
+        while await self.leitor.readuntil(b"\r\n") != b"\r\n":
+            pass
+        return b"".join(partes)
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+        self.leitor = None
+        self.escritor = None
@@ -0,0 +1,129 @@
+#Conexões keep-alive ociosas do pool de threads
+#Em vez de um worker bloqueado em recv até o keep-alive vencer, a conexão ociosa espera em um seletor:
+#quando chegam dados ela volta para a fila do pool, quando o prazo vence ela é fechada
+
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from registro import registro
+
+class EntradaOciosa:
+    #Conexão registrada no seletor; ativa fica False quando ela sai antes do prazo (remoção preguiçosa do heap)
+    __slots__ = ('socket', 'endereco', 'estado', 'prazo', 'ativa')
+
+    def __init__(self, socket_cliente, endereco, estado, prazo):
+        self.socket = socket_cliente
+        self.endereco = endereco
+        self.estado = estado
+        self.prazo = prazo
+        self.ativa = True
+
+class ConexoesOciosas:
+    def __init__(self, ao_receber, ao_expirar):
+        #ao_receber(socket, endereco, estado): a conexão tem dados; ao_expirar(socket, estado): keep-alive venceu
+        self.ao_receber = ao_receber
+        self.ao_expirar = ao_expirar
+        self.seletor = None
+        self.novas = deque()  #Preenchida pelos workers, esvaziada só pela thread do seletor
+        self.prazos = []
+        self.sequencia = itertools.count()
+        self.quantidade = 0
+        self.executando = False
+        self.thread = None
+        self.despertador = None
+        self.sinalizador = None
+
+    def iniciar(self):
+        #Inicia a thread do seletor; o par de sockets acorda o select quando um worker estaciona uma conexão
+        self.seletor = selectors.DefaultSelector()
+        self.despertador, self.sinalizador = socket.socketpair()
+        self.despertador.setblocking(False)
+        self.sinalizador.setblocking(False)
+        self.seletor.register(self.despertador, selectors.EVENT_READ, None)
+        self.executando = True
+        self.thread = threading.Thread(target=self.executar, daemon=True)
+        self.thread.start()
+
+    def estacionar(self, socket_cliente, endereco, estado):
+        #Chamado pelo worker: a conexão espera no seletor até o fim do keep-alive
+        self.novas.append(EntradaOciosa(socket_cliente, endereco, estado, time.monotonic() + estado.tempo_limite))
+        try:
+            self.sinalizador.send(b"\0")
+        except (BlockingIOError, InterruptedError):
+            pass  #O buffer do par já tem sinais pendentes: o select vai acordar de qualquer forma
+
+    def executar(self):
+        while self.executando:
+            for chave, _ in self.seletor.select(self.tempo_ate_proximo_prazo()):
+                if chave.data is None:
+                    self.esvaziar_despertador()
+                    continue
+                entrada = chave.data
+                self.remover(entrada)
+                self.chamar(self.ao_receber, entrada.socket, entrada.endereco, entrada.estado)
+
+            self.registrar_novas()
+            self.expirar()
+
+    def registrar_novas(self):
+        while self.novas:
+            entrada = self.novas.popleft()
+            try:
+                self.seletor.register(entrada.socket, selectors.EVENT_READ, entrada)
+            except (OSError, ValueError) as e:
+                registro.aviso("Conexão ociosa inválida", conexao=entrada.estado.id_conexao, erro=e)
+                self.chamar(self.ao_expirar, entrada.socket, entrada.estado)
+                continue
+            heapq.heappush(self.prazos, (entrada.prazo, next(self.sequencia), entrada))
+            self.quantidade += 1
+
+    def expirar(self):
+        #Fecha as conexões cujo keep-alive venceu sem nova requisição
+        agora = time.monotonic()
+        while self.prazos and self.prazos[0][0] <= agora:
+            _, _, entrada = heapq.heappop(self.prazos)
+            if entrada.ativa:
+                self.remover(entrada)
+                self.chamar(self.ao_expirar, entrada.socket, entrada.estado)
+
+    def remover(self, entrada):
+        entrada.ativa = False
+        self.quantidade -= 1
+        self.seletor.unregister(entrada.socket)
+
+    def tempo_ate_proximo_prazo(self):
+        #Descarta do topo do heap as entradas que já saíram do seletor
+        while self.prazos and not self.prazos[0][2].ativa:
+            heapq.heappop(self.prazos)
+        if not self.prazos:
+            return None
+        return max(0, self.prazos[0][0] - time.monotonic())
+
+    def esvaziar_despertador(self):
+        try:
+            while self.despertador.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def chamar(self, callback, *argumentos):
+        #Erro em uma conexão não pode parar a thread do seletor
+        try:
+            callback(*argumentos)
+        except Exception as e:
+            registro.erro("Erro em conexão ociosa", erro=e)
+
+    def estatisticas(self):
+        return {"conexoes_ociosas": self.quantidade}
+
+    def parar(self):
+        self.executando = False
+        if self.sinalizador is not None:
+            try:
+                self.sinalizador.send(b"\0")
+            except OSError:
+                pass
@@ -18,6 +18,46 @@ IP_BASE_CLIENTE = f"{BASE_SUBNET}.0"
 PORTA_SERVIDOR = 8080
 MAX_CONEXOES = 100
 
+#Pool de threads do servidor concorrente (modo --pool)
+TAMANHO_POOL_THREADS = 32
+TAMANHO_FILA_CONEXOES = 200
+ESPERA_OCIOSA_POOL = 0.05  #Segundos que um worker espera a próxima requisição antes de passar a conexão ao seletor
+ESPERA_FILA_RESPOSTA_PENDENTE = 0.5  #Segundos que a roda espera vaga na fila (ou o envio direto) de uma resposta atrasada
+
+#Supervisão dos workers do servidor pre-fork
+TEMPO_MINIMO_WORKER = 1.0  #Worker que termina antes disso conta como falha ao iniciar (ex.: porta ocupada)
+MAX_FALHAS_WORKER = 5  #Falhas seguidas ao iniciar até o mestre desistir do slot (espera dobra a cada falha)
+
+#Conexões persistentes (keep-alive)
+TEMPO_KEEP_ALIVE = 5  #Segundos que uma conexão ociosa fica aberta
+MAX_REQUISICOES_CONEXAO = 100
+TAMANHO_SAIDA_PIPELINE = 65536  #Bytes de respostas em pipeline acumulados antes de forçar o envio
+
+#Limites do parser HTTP
+TAMANHO_LEITURA = 65536  #Bytes lidos do socket por recv
+MAX_TAMANHO_CABECALHO = 8192
+MAX_TAMANHO_CORPO = 1024 * 1024
+
+#Respostas JSON compactas (sem indentação) reduzem o custo de serialização
+JSON_COMPACTO = False
+
+#Registro (log) assíncrono dos servidores
+NIVEL_LOG = "INFO"  #DEBUG, INFO, AVISO ou ERRO
+AMOSTRAGEM_LOG = 1.0  #Fração dos registros DEBUG/INFO escritos (AVISO e ERRO sempre são escritos)
+CAPACIDADE_FILA_LOG = 10000  #Registros acima disso são descartados e contados
+TAMANHO_LOTE_LOG = 256
+INTERVALO_ESCRITA_LOG = 0.2  #Segundos entre escritas da thread de registro
+
+#Roda de temporização do servidor concorrente (modo --roda-temporizacao)
+RESOLUCAO_RODA = 0.01  #Duração de um tick em segundos
+SLOTS_RODA = 512
+
+#Atraso simulado (em segundos) de cada endpoint
+ATRASOS_SIMULADOS = {
+    '/medio': 0.5,
+    '/lento': 2
+}
+
 #Cabeçalho HTTP personalizado
 def gerar_id_personalizado():
     #Gera o X-Custom-ID baseado na matrícula e nome do aluno
@@ -28,6 +68,9 @@ ID_CUSTOMIZADO = gerar_id_personalizado()
 
 #Configurações de teste
 ITERACOES_TESTE = 10
+TRABALHADORES_TAXA_CONSTANTE = 200  #Threads do gerador em malha aberta (limita requisições em voo)
+INTERVALO_HISTOGRAMA_PROCESSO = 0.5  #Segundos entre histogramas parciais enviados pelos processos de carga
+TEMPO_BARREIRA_PROCESSOS = 30  #Segundos que pai e processos de carga esperam uns pelos outros na largada
 CLIENTES_TESTE = [1, 5, 10, 20, 50]
 TAMANHOS_REQUISICAO = ["pequeno", "medio", "grande"]
 
@@ -0,0 +1,35 @@
+#Contadores sem lock no caminho quente
+#Cada thread soma na própria célula; o total só é calculado quando alguém lê (/status, métricas)
+
+import threading
+import time
+
+INTERVALO_CACHE_CONTADOR = 0.01  #Segundos em que valor_recente() reaproveita a última soma
+
+class ContadorFragmentado:
+    #Contador (ou medidor, com deltas negativos) somado sob demanda entre as células das threads
+    #As células são indexadas pelo id da thread: só uma thread viva tem cada id, então cada célula tem um único
+    #escritor e o incremento dispensa lock (GIL). Quando a thread termina, a célula fica com o que ela somou e
+    #é reaproveitada pela próxima thread que receber o mesmo id (sem registro nem finalizadores por thread)
+    def __init__(self, valor_inicial=0):
+        self.celulas = {None: [valor_inicial]}
+        self.cache = (0.0, valor_inicial)
+
+    def somar(self, delta=1):
+        celula = self.celulas.get(threading.get_ident())
+        if celula is None:
+            celula = self.celulas.setdefault(threading.get_ident(), [0])
+        celula[0] += delta
+
+    def valor(self):
+        #Soma das células no momento da leitura (a cópia da lista de células é atômica sob o GIL)
+        return sum(celula[0] for celula in list(self.celulas.values()))
+
+    def valor_recente(self, validade=INTERVALO_CACHE_CONTADOR):
+        #Soma reaproveitada por alguns milissegundos (para leituras em toda requisição)
+        agora = time.monotonic()
+        instante, valor = self.cache
+        if agora - instante > validade:
+            valor = self.valor()
+            self.cache = (agora, valor)
+        return valor
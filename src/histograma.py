@@ -0,0 +1,117 @@
+#Histograma log-linear (estilo HDR) para latências
+#Cada potência de 2 é dividida em sub-buckets lineares: erro relativo limitado e memória proporcional aos buckets usados
+
+BITS_SUB_BUCKET = 7  #Valores exatos até 2^7; acima, 2^6 sub-buckets por potência de 2 => erro relativo máximo de 1/64 (~1,6%)
+SUB_BUCKETS = 1 << BITS_SUB_BUCKET
+METADE_SUB_BUCKETS = SUB_BUCKETS >> 1
+
+PERCENTIS_PADRAO = (50, 90, 99, 99.9)
+
+def indice_bucket(valor):
+    #Índice do bucket de um valor inteiro não negativo (microssegundos)
+    if valor < SUB_BUCKETS:
+        return valor
+    expoente = valor.bit_length() - BITS_SUB_BUCKET
+    return SUB_BUCKETS + (expoente - 1) * METADE_SUB_BUCKETS + (valor >> expoente) - METADE_SUB_BUCKETS
+
+def limites_bucket(indice):
+    #Menor e maior valor representados pelo bucket
+    if indice < SUB_BUCKETS:
+        return indice, indice
+    expoente = (indice - SUB_BUCKETS) // METADE_SUB_BUCKETS + 1
+    mantissa = (indice - SUB_BUCKETS) % METADE_SUB_BUCKETS + METADE_SUB_BUCKETS
+    return mantissa << expoente, ((mantissa + 1) << expoente) - 1
+
+class HistogramaLatencia:
+    #Latências registradas em segundos e armazenadas em microssegundos inteiros
+    __slots__ = ('contagens', 'total', 'soma', 'minimo', 'maximo')
+
+    def __init__(self):
+        self.contagens = {}
+        self.total = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = 0
+
+    def registrar(self, segundos, vezes=1):
+        #Registra uma latência (caminho quente: só aritmética inteira e um incremento no dicionário)
+        valor = int(segundos * 1000000)
+        if valor < 0:
+            valor = 0
+        indice = indice_bucket(valor)
+        self.contagens[indice] = self.contagens.get(indice, 0) + vezes
+        self.total += vezes
+        self.soma += valor * vezes
+        if valor > self.maximo:
+            self.maximo = valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+
+    def mesclar(self, outro):
+        #Soma outro histograma a este (a mescla é exata: os buckets são os mesmos)
+        contagens = dict(outro.contagens)
+        for indice, quantidade in contagens.items():
+            self.contagens[indice] = self.contagens.get(indice, 0) + quantidade
+        self.total += outro.total
+        self.soma += outro.soma
+        self.maximo = max(self.maximo, outro.maximo)
+        if outro.minimo is not None and (self.minimo is None or outro.minimo < self.minimo):
+            self.minimo = outro.minimo
+        return self
+
+    def copiar(self):
+        #Cópia independente (usada para ler um histograma que outra thread continua alimentando)
+        return HistogramaLatencia().mesclar(self)
+
+    def percentil(self, percentual):
+        #Valor (em segundos) abaixo do qual está o percentual pedido das amostras
+        if not self.total:
+            return 0.0
+        alvo = max(1, -(-self.total * percentual // 100))
+        acumulado = 0
+        for indice in sorted(self.contagens):
+            acumulado += self.contagens[indice]
+            if acumulado >= alvo:
+                return min(limites_bucket(indice)[1], self.maximo) / 1000000
+        return self.maximo / 1000000
+
+    def contar_ate(self, limite_segundos):
+        #Quantidade de amostras menores ou iguais ao limite (buckets do formato Prometheus)
+        #Só entram buckets inteiros até o limite, o mesmo limite superior que percentil() reporta
+        limite = limite_segundos * 1000000
+        return sum(quantidade for indice, quantidade in self.contagens.items() if limites_bucket(indice)[1] <= limite)
+
+    def media(self):
+        return self.soma / self.total / 1000000 if self.total else 0.0
+
+    def resumo(self, percentis=PERCENTIS_PADRAO):
+        #Dicionário serializável com contagem, média, percentis e extremos (em segundos)
+        dados = {
+            "contagem": self.total,
+            "media": self.media(),
+            "minimo": (self.minimo or 0) / 1000000,
+            "maximo": self.maximo / 1000000
+        }
+        for percentual in percentis:
+            dados[f"p{percentual:g}".replace('.', '_')] = self.percentil(percentual)
+        return dados
+
+    def para_dict(self):
+        #Forma serializável sem perda (os buckets podem ser mesclados depois)
+        return {
+            "contagens": {str(indice): quantidade for indice, quantidade in self.contagens.items()},
+            "total": self.total,
+            "soma": self.soma,
+            "minimo": self.minimo,
+            "maximo": self.maximo
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        histograma = cls()
+        histograma.contagens = {int(indice): quantidade for indice, quantidade in dados["contagens"].items()}
+        histograma.total = dados["total"]
+        histograma.soma = dados["soma"]
+        histograma.minimo = dados["minimo"]
+        histograma.maximo = dados["maximo"]
+        return histograma
@@ -0,0 +1,166 @@
+#Telemetria dos servidores exposta em /metrics (formato texto do Prometheus) e /metrics/json
+#Cada thread grava no próprio fragmento sem lock; a coleta soma cópias dos fragmentos sem bloquear as requisições
+
+import threading
+import time
+import weakref
+from histograma import HistogramaLatencia
+from registro import registro
+
+#Buckets "le" (em segundos) exportados no formato Prometheus
+LIMITES_PROMETHEUS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                      0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+ROTA_DESCONHECIDA = "desconhecida"
+
+class FragmentoMetricas:
+    #Contadores de uma única thread (só ela escreve; a coleta apenas lê)
+    def __init__(self):
+        self.histogramas = {}  #(rota, código de status) -> HistogramaLatencia
+        self.conexoes_aceitas = 0
+        self.conexoes_encerradas = 0
+        self.bytes_recebidos = 0
+        self.bytes_enviados = 0
+
+    def mesclar(self, outro):
+        #Soma outro fragmento a este
+        for chave, histograma in list(outro.histogramas.items()):
+            atual = self.histogramas.get(chave)
+            if atual is None:
+                self.histogramas[chave] = histograma.copiar()
+            else:
+                atual.mesclar(histograma)
+        self.conexoes_aceitas += outro.conexoes_aceitas
+        self.conexoes_encerradas += outro.conexoes_encerradas
+        self.bytes_recebidos += outro.bytes_recebidos
+        self.bytes_enviados += outro.bytes_enviados
+        return self
+
+class DonoFragmento:
+    #Objeto guardado no threading.local; quando a thread termina ele é coletado e o fragmento é aposentado
+    __slots__ = ('fragmento', '__weakref__')
+
+    def __init__(self, fragmento):
+        self.fragmento = fragmento
+
+class RegistroMetricas:
+    def __init__(self, tipo_servidor):
+        self.tipo_servidor = tipo_servidor
+        self.inicio = time.time()
+        self.local = threading.local()
+        self.lock = threading.Lock()  #Protege só a lista de fragmentos (criação e fim de threads)
+        self.fragmentos = []
+        self.aposentado = FragmentoMetricas()  #Soma dos fragmentos de threads que já terminaram
+        self.ultima_coleta = (self.inicio, 0)
+
+    def fragmento(self):
+        #Fragmento da thread atual (criado no primeiro uso)
+        try:
+            return self.local.dono.fragmento
+        except AttributeError:
+            fragmento = FragmentoMetricas()
+            dono = DonoFragmento(fragmento)
+            self.local.dono = dono
+            weakref.finalize(dono, self.aposentar, fragmento)
+            with self.lock:
+                self.fragmentos.append(fragmento)
+            return fragmento
+
+    def aposentar(self, fragmento):
+        #Incorpora o fragmento de uma thread encerrada ao acumulado (mantém a lista de fragmentos pequena)
+        with self.lock:
+            self.aposentado.mesclar(fragmento)
+            self.fragmentos.remove(fragmento)
+
+    def conexao_aceita(self):
+        self.fragmento().conexoes_aceitas += 1
+
+    def conexao_encerrada(self):
+        self.fragmento().conexoes_encerradas += 1
+
+    def registrar(self, rota, codigo_status, duracao, bytes_recebidos, bytes_enviados):
+        #Registra uma requisição atendida (caminho quente: sem locks)
+        fragmento = self.fragmento()
+        chave = (rota, codigo_status)
+        histograma = fragmento.histogramas.get(chave)
+        if histograma is None:
+            histograma = fragmento.histogramas[chave] = HistogramaLatencia()
+        histograma.registrar(duracao)
+        fragmento.bytes_recebidos += bytes_recebidos
+        fragmento.bytes_enviados += bytes_enviados
+
+    def coletar(self):
+        #Soma de todos os fragmentos; o lock só protege a cópia da lista, não as gravações
+        with self.lock:
+            fragmentos = list(self.fragmentos)
+            total = FragmentoMetricas().mesclar(self.aposentado)
+        for fragmento in fragmentos:
+            total.mesclar(fragmento)
+        return total
+
+    def taxa_aceitacao(self, total_aceitas):
+        #Conexões aceitas por segundo desde a coleta anterior
+        agora = time.time()
+        instante_anterior, aceitas_anterior = self.ultima_coleta
+        self.ultima_coleta = (agora, total_aceitas)
+        intervalo = agora - instante_anterior
+        return (total_aceitas - aceitas_anterior) / intervalo if intervalo > 0 else 0.0
+
+    def instantaneo(self):
+        #Métricas em forma de dicionário (endpoint /metrics/json)
+        total = self.coletar()
+        rotas = []
+        for (rota, codigo_status), histograma in sorted(total.histogramas.items()):
+            dados = {"rota": rota, "codigo_status": codigo_status}
+            dados.update(histograma.resumo())
+            rotas.append(dados)
+
+        return {
+            "tipo_servidor": self.tipo_servidor,
+            "tempo_atividade": time.time() - self.inicio,
+            "conexoes_em_andamento": total.conexoes_aceitas - total.conexoes_encerradas,
+            "conexoes_aceitas": total.conexoes_aceitas,
+            "taxa_aceitacao": self.taxa_aceitacao(total.conexoes_aceitas),
+            "bytes_recebidos": total.bytes_recebidos,
+            "bytes_enviados": total.bytes_enviados,
+            "registros_log": registro.estatisticas(),
+            "latencia_por_rota": rotas
+        }
+
+    def formato_prometheus(self):
+        #Métricas no formato de exposição texto do Prometheus (bytes prontos para o corpo da resposta)
+        total = self.coletar()
+        servidor = f'servidor="{self.tipo_servidor}"'
+        linhas = [
+            "# HELP servidor_requisicao_duracao_segundos Latência das requisições por rota e código de status",
+            "# TYPE servidor_requisicao_duracao_segundos histogram"
+        ]
+        for (rota, codigo_status), histograma in sorted(total.histogramas.items()):
+            rotulos = f'{servidor},rota="{rota}",codigo="{codigo_status}"'
+            for limite in LIMITES_PROMETHEUS:
+                linhas.append(f'servidor_requisicao_duracao_segundos_bucket{{{rotulos},le="{limite}"}} {histograma.contar_ate(limite)}')
+            linhas.append(f'servidor_requisicao_duracao_segundos_bucket{{{rotulos},le="+Inf"}} {histograma.total}')
+            linhas.append(f'servidor_requisicao_duracao_segundos_sum{{{rotulos}}} {histograma.soma / 1000000}')
+            linhas.append(f'servidor_requisicao_duracao_segundos_count{{{rotulos}}} {histograma.total}')
+
+        linhas += [
+            "# HELP servidor_conexoes_em_andamento Conexões abertas no momento",
+            "# TYPE servidor_conexoes_em_andamento gauge",
+            f"servidor_conexoes_em_andamento{{{servidor}}} {total.conexoes_aceitas - total.conexoes_encerradas}",
+            "# HELP servidor_conexoes_aceitas_total Conexões aceitas desde o início",
+            "# TYPE servidor_conexoes_aceitas_total counter",
+            f"servidor_conexoes_aceitas_total{{{servidor}}} {total.conexoes_aceitas}",
+            "# HELP servidor_bytes_recebidos_total Bytes de requisições recebidos",
+            "# TYPE servidor_bytes_recebidos_total counter",
+            f"servidor_bytes_recebidos_total{{{servidor}}} {total.bytes_recebidos}",
+            "# HELP servidor_bytes_enviados_total Bytes de respostas enviados",
+            "# TYPE servidor_bytes_enviados_total counter",
+            f"servidor_bytes_enviados_total{{{servidor}}} {total.bytes_enviados}",
+            "# HELP servidor_registros_descartados_total Registros de log descartados com a fila cheia",
+            "# TYPE servidor_registros_descartados_total counter",
+            f"servidor_registros_descartados_total{{{servidor}}} {registro.descartados.valor()}",
+            "# HELP servidor_tempo_atividade_segundos Tempo desde o início do servidor",
+            "# TYPE servidor_tempo_atividade_segundos gauge",
+            f"servidor_tempo_atividade_segundos{{{servidor}}} {time.time() - self.inicio:.3f}"
+        ]
+        return ("\n".join(linhas) + "\n").encode('utf-8')
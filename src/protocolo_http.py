@@ -0,0 +1,210 @@
+#Funções do protocolo HTTP compartilhadas pelos servidores
+
+from configuracao import (TEMPO_KEEP_ALIVE, MAX_REQUISICOES_CONEXAO, TAMANHO_LEITURA,
+                          MAX_TAMANHO_CABECALHO, MAX_TAMANHO_CORPO, TAMANHO_SAIDA_PIPELINE)
+
+FIM_CABECALHO = b"\r\n\r\n"
+
+class ErroRequisicaoHTTP(Exception):
+    #Requisição malformada ou acima dos limites; indica o status HTTP a responder
+    def __init__(self, codigo_status, texto_status):
+        super().__init__(f"{codigo_status} {texto_status}")
+        self.codigo_status = codigo_status
+        self.texto_status = texto_status
+
+def decimal_ascii(texto):
+    #Só dígitos 0-9: isdigit() também aceita '²' (0xB2 em latin-1), que int() rejeita
+    return texto.isascii() and texto.isdecimal()
+
+class RequisicaoHTTP:
+    #Requisição já interpretada (nomes de cabeçalho em minúsculas); tamanho é o total de bytes lidos do socket
+    __slots__ = ('metodo', 'caminho', 'versao', 'cabecalhos', 'corpo', 'tamanho')
+
+    def __init__(self, metodo, caminho, versao, cabecalhos, corpo=b"", tamanho=0):
+        self.metodo = metodo
+        self.caminho = caminho
+        self.versao = versao
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+        self.tamanho = tamanho
+
+class ParserHTTP:
+    #Parser incremental: recebe bytes em pedaços arbitrários e devolve requisições completas
+    def __init__(self, max_tamanho_cabecalho=MAX_TAMANHO_CABECALHO, max_tamanho_corpo=MAX_TAMANHO_CORPO):
+        self.max_tamanho_cabecalho = max_tamanho_cabecalho
+        self.max_tamanho_corpo = max_tamanho_corpo
+        self.buffer = bytearray()
+        self.inicio_busca = 0
+        self.requisicao_pendente = None
+        self.tamanho_corpo = 0
+
+    def alimentar(self, dados):
+        #Acrescenta bytes recebidos do socket ao buffer
+        self.buffer += dados
+
+    def tem_dados_pendentes(self):
+        #Há bytes de outra requisição no buffer (cliente fazendo pipelining)
+        return bool(self.buffer) or self.requisicao_pendente is not None
+
+    def proxima_requisicao(self):
+        #Retorna a próxima requisição completa do buffer ou None se faltarem bytes
+        if self.requisicao_pendente is None:
+            #Continua a busca do terminador de onde parou, sem reprocessar o buffer
+            buffer = self.buffer
+            fim_cabecalho = buffer.find(FIM_CABECALHO, self.inicio_busca)
+            if fim_cabecalho < 0:
+                if len(buffer) > self.max_tamanho_cabecalho:
+                    raise ErroRequisicaoHTTP(431, "Cabeçalhos Muito Grandes")
+                self.inicio_busca = max(0, len(buffer) - len(FIM_CABECALHO) + 1)
+                return None
+            if fim_cabecalho > self.max_tamanho_cabecalho:
+                raise ErroRequisicaoHTTP(431, "Cabeçalhos Muito Grandes")
+
+            #O bloco de cabeçalhos é decodificado direto do buffer, em uma única chamada
+            inicio_corpo = fim_cabecalho + len(FIM_CABECALHO)
+            texto = buffer[:fim_cabecalho].decode('latin-1')
+            if inicio_corpo == len(buffer):
+                buffer.clear()  #Caso comum: o segmento trazia exatamente uma requisição sem corpo
+            else:
+                del buffer[:inicio_corpo]
+            self.inicio_busca = 0
+
+            requisicao = self.interpretar_cabecalho(texto)
+            requisicao.tamanho = inicio_corpo + self.tamanho_corpo
+            if not self.tamanho_corpo:
+                return requisicao
+            self.requisicao_pendente = requisicao
+
+        #Aguarda o corpo completo indicado pelo Content-Length
+        if len(self.buffer) < self.tamanho_corpo:
+            return None
+
+        requisicao = self.requisicao_pendente
+        requisicao.corpo = bytes(self.buffer[:self.tamanho_corpo])
+        del self.buffer[:self.tamanho_corpo]
+
+        self.requisicao_pendente = None
+        self.tamanho_corpo = 0
+        return requisicao
+
+    def interpretar_cabecalho(self, texto):
+        #Interpreta a linha de requisição e os cabeçalhos do bloco já decodificado
+        linha_requisicao, _, bloco_cabecalhos = texto.partition('\r\n')
+
+        partes = linha_requisicao.split(' ')
+        if len(partes) != 3 or not partes[2].startswith('HTTP/'):
+            raise ErroRequisicaoHTTP(400, "Requisição Inválida")
+        metodo, caminho, versao = partes
+
+        cabecalhos = {}
+        if bloco_cabecalhos:
+            for linha in bloco_cabecalhos.split('\r\n'):
+                chave, separador, valor = linha.partition(':')
+                if not separador:
+                    raise ErroRequisicaoHTTP(400, "Requisição Inválida")
+                cabecalhos[chave.strip().lower()] = valor.strip()
+
+        if 'transfer-encoding' in cabecalhos:
+            raise ErroRequisicaoHTTP(501, "Não Implementado")
+
+        tamanho_corpo = cabecalhos.get('content-length')
+        if tamanho_corpo is not None:
+            if not decimal_ascii(tamanho_corpo):
+                raise ErroRequisicaoHTTP(400, "Requisição Inválida")
+            self.tamanho_corpo = int(tamanho_corpo)
+            if self.tamanho_corpo > self.max_tamanho_corpo:
+                raise ErroRequisicaoHTTP(413, "Conteúdo Muito Grande")
+
+        return RequisicaoHTTP(metodo, caminho, versao, cabecalhos)
+
+def receber_requisicao(socket_cliente, parser):
+    #Lê do socket até o parser ter uma requisição completa (None se o cliente fechar a conexão)
+    while True:
+        requisicao = parser.proxima_requisicao()
+        if requisicao is not None:
+            return requisicao
+
+        dados = socket_cliente.recv(TAMANHO_LEITURA)
+        if not dados:
+            return None
+        parser.alimentar(dados)
+
+class ConexaoPipeline:
+    #Socket de uma conexão com escrita agrupada para pipelining HTTP/1.1
+    #Enquanto o parser tiver bytes da próxima requisição, as respostas ficam acumuladas e saem em um único
+    #sendall (na ordem das requisições); recv e close enviam o que estiver pendente antes de bloquear/fechar
+    def __init__(self, socket_cliente, parser, tamanho_maximo=TAMANHO_SAIDA_PIPELINE):
+        self.socket = socket_cliente
+        self.parser = parser
+        self.tamanho_maximo = tamanho_maximo
+        self.pendente = bytearray()
+
+    def __getattr__(self, nome):
+        #settimeout, send, fileno... vão direto para o socket
+        return getattr(self.socket, nome)
+
+    def sendall(self, dados):
+        if self.parser.tem_dados_pendentes() and len(self.pendente) + len(dados) < self.tamanho_maximo:
+            self.pendente += dados
+            return
+        if self.pendente:
+            self.pendente += dados
+            self.descarregar()
+            return
+        self.socket.sendall(dados)
+
+    def descarregar(self):
+        #Envia as respostas acumuladas
+        if self.pendente:
+            self.socket.sendall(self.pendente)
+            self.pendente.clear()
+
+    def recv(self, tamanho):
+        self.descarregar()
+        return self.socket.recv(tamanho)
+
+    def close(self):
+        try:
+            self.descarregar()
+        except OSError:
+            pass
+        finally:
+            self.socket.close()
+
+def obter_cabecalho(cabecalhos, nome, padrao=''):
+    #Busca um cabeçalho sem diferenciar maiúsculas de minúsculas
+    nome = nome.lower()
+    for chave, valor in cabecalhos.items():
+        if chave.lower() == nome:
+            return valor
+    return padrao
+
+def negociar_keep_alive(versao, cabecalhos, requisicoes_atendidas):
+    #Decide se a conexão continua aberta depois da resposta atual
+    #Retorna None para fechar ou (timeout, requisições restantes) para manter
+    conexao = obter_cabecalho(cabecalhos, 'Connection').lower()
+    if 'close' in conexao:
+        return None
+    
+    #HTTP/1.0 só mantém a conexão se o cliente pedir explicitamente
+    if versao != 'HTTP/1.1' and 'keep-alive' not in conexao:
+        return None
+    
+    tempo_limite = TEMPO_KEEP_ALIVE
+    max_requisicoes = MAX_REQUISICOES_CONEXAO
+    
+    #O cliente pode pedir limites menores via cabeçalho Keep-Alive
+    for parametro in obter_cabecalho(cabecalhos, 'Keep-Alive').split(','):
+        chave, _, valor = parametro.strip().partition('=')
+        if not decimal_ascii(valor):
+            continue  #Parâmetro inválido é ignorado, a requisição segue com os limites do servidor
+        if chave == 'timeout':
+            tempo_limite = min(tempo_limite, int(valor))
+        elif chave == 'max':
+            max_requisicoes = min(max_requisicoes, int(valor))
+    
+    requisicoes_restantes = max_requisicoes - requisicoes_atendidas
+    if requisicoes_restantes <= 0 or tempo_limite <= 0:
+        return None
+    
+    return tempo_limite, requisicoes_restantes
@@ -0,0 +1,143 @@
+#Registro (log) assíncrono em lotes
+#As threads de requisição só enfileiram tuplas; uma thread de fundo formata e escreve em lotes no stdout
+
+import os
+import sys
+import time
+import random
+import threading
+import collections
+from datetime import datetime
+from configuracao import (NIVEL_LOG, AMOSTRAGEM_LOG, CAPACIDADE_FILA_LOG, TAMANHO_LOTE_LOG,
+                          INTERVALO_ESCRITA_LOG)
+from contadores import ContadorFragmentado
+
+NIVEIS = {"DEBUG": 10, "INFO": 20, "AVISO": 30, "ERRO": 40}
+NOMES_NIVEIS = {valor: nome for nome, valor in NIVEIS.items()}
+
+class RegistroAssincrono:
+    def __init__(self, nivel=NIVEL_LOG, amostragem=AMOSTRAGEM_LOG, capacidade=CAPACIDADE_FILA_LOG,
+                 tamanho_lote=TAMANHO_LOTE_LOG, intervalo=INTERVALO_ESCRITA_LOG, saida=None):
+        self.nivel = NIVEIS[nivel]
+        self.amostragem = amostragem  #Fração dos registros DEBUG/INFO mantidos (AVISO e ERRO sempre passam)
+        self.capacidade = capacidade
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.saida = saida or sys.stdout
+
+        #append/popleft da deque são atômicos: produtores não disputam lock
+        self.fila = collections.deque()
+        self.descartados = ContadorFragmentado()
+        self.escritos = 0
+        self.sinal = threading.Event()
+        self.lock_inicio = threading.Lock()
+        self.executando = False
+        self.thread = None
+
+        #Depois de um fork (servidor pre-fork) o filho precisa da própria thread escritora
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reiniciar_apos_fork)
+
+    def configurar(self, nivel=None, amostragem=None):
+        #Ajusta nível e amostragem em tempo de execução (ex.: argumentos de linha de comando)
+        if nivel is not None:
+            self.nivel = NIVEIS[nivel]
+        if amostragem is not None:
+            self.amostragem = amostragem
+
+    def registrar(self, nivel, mensagem, campos):
+        #Caminho quente: filtro de nível, amostragem e um append
+        if nivel < self.nivel:
+            return
+        if nivel < NIVEIS["AVISO"] and self.amostragem < 1.0 and random.random() >= self.amostragem:
+            return
+        if len(self.fila) >= self.capacidade:
+            self.descartados.somar(1)
+            return
+
+        self.fila.append((time.time(), nivel, mensagem, campos))
+        if self.thread is None:
+            self.iniciar()
+        elif len(self.fila) == self.tamanho_lote:
+            self.sinal.set()
+
+    def debug(self, mensagem, **campos):
+        self.registrar(10, mensagem, campos)
+
+    def info(self, mensagem, **campos):
+        self.registrar(20, mensagem, campos)
+
+    def aviso(self, mensagem, **campos):
+        self.registrar(30, mensagem, campos)
+
+    def erro(self, mensagem, **campos):
+        self.registrar(40, mensagem, campos)
+
+    def iniciar(self):
+        #Cria a thread escritora (no primeiro registro do processo)
+        with self.lock_inicio:
+            if self.thread is not None:
+                return
+            self.executando = True
+            self.thread = threading.Thread(target=self.executar, daemon=True)
+            self.thread.start()
+
+    def executar(self):
+        #Acorda a cada intervalo (ou quando um lote enche) e escreve tudo o que estiver na fila
+        while self.executando:
+            self.sinal.wait(self.intervalo)
+            self.sinal.clear()
+            self.descarregar()
+        self.descarregar()
+
+    def descarregar(self):
+        #Formata e escreve os registros pendentes em lotes de uma única escrita cada
+        while self.fila:
+            linhas = []
+            while self.fila and len(linhas) < self.tamanho_lote:
+                linhas.append(self.formatar(*self.fila.popleft()))
+            try:
+                self.saida.write("\n".join(linhas) + "\n")
+                self.saida.flush()
+            except (OSError, ValueError):
+                return
+            self.escritos += len(linhas)
+
+    def formatar(self, instante, nivel, mensagem, campos):
+        #Linha de texto: horário, nível, mensagem e campos chave=valor
+        horario = datetime.fromtimestamp(instante).isoformat(timespec='milliseconds')
+        linha = f"{horario} [{NOMES_NIVEIS[nivel]}] {mensagem}"
+        for chave, valor in campos.items():
+            if type(valor) is float:
+                valor = f"{valor:.4f}"
+            elif type(valor) is tuple:
+                valor = ":".join(map(str, valor))
+            linha += f" {chave}={valor}"
+        return linha
+
+    def estatisticas(self):
+        return {
+            "registros_pendentes": len(self.fila),
+            "registros_escritos": self.escritos,
+            "registros_descartados": self.descartados.valor()
+        }
+
+    def reiniciar_apos_fork(self):
+        #No processo filho a thread do pai não existe; registros herdados seriam escritos em dobro
+        self.fila.clear()
+        self.sinal = threading.Event()
+        self.lock_inicio = threading.Lock()
+        self.executando = False
+        self.thread = None
+
+    def fechar(self):
+        #Para a thread escritora depois de escrever o que estiver pendente
+        if self.thread is None:
+            self.descarregar()
+            return
+        self.executando = False
+        self.sinal.set()
+        self.thread.join(timeout=2)
+
+#Instância compartilhada pelos servidores
+registro = RegistroAssincrono()
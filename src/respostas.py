@@ -0,0 +1,131 @@
+#Montagem de respostas HTTP com fragmentos pré-codificados
+#Cabeçalhos fixos, linhas de status e pares JSON estáticos são convertidos para bytes uma única vez
+
+import json
+import time
+from datetime import datetime
+from configuracao import JSON_COMPACTO
+
+MAX_FRAGMENTOS_CACHE = 4096
+
+class RelogioSegundos:
+    #Timestamp ISO recalculado no máximo uma vez por segundo
+    def __init__(self):
+        self.cache = (None, "")
+
+    def agora(self):
+        #Retorna o timestamp do segundo atual (sem microssegundos)
+        segundo = int(time.time())
+        segundo_cache, texto = self.cache
+        if segundo != segundo_cache:
+            texto = datetime.fromtimestamp(segundo).isoformat()
+            self.cache = (segundo, texto)
+        return texto
+
+relogio = RelogioSegundos()
+
+class ConstrutorRespostas:
+    #Monta respostas HTTP em bytes reaproveitando fragmentos já codificados
+    def __init__(self, nome_servidor, tipo_servidor, json_compacto=JSON_COMPACTO):
+        self.json_compacto = json_compacto
+        self.cabecalhos_fixos = (
+            f"Server: {nome_servidor}\r\nX-Server-Type: {tipo_servidor}\r\n"
+        ).encode('utf-8')
+        self.linhas_status = {}
+        self.linhas_conexao = {}
+        self.fragmentos = {}
+
+        if json_compacto:
+            self.abertura, self.separador, self.separador_chave, self.fechamento = b"{", b",", b":", b"}"
+        else:
+            self.abertura, self.separador, self.separador_chave, self.fechamento = b"{\n  ", b",\n  ", b": ", b"\n}"
+
+    def montar(self, codigo_status, texto_status, dados, id_customizado="", keep_alive=None, cabecalhos_extras=None,
+               cachear_valores=True):
+        #Monta a resposta JSON completa; o Content-Length é o tamanho do corpo em bytes
+        corpo = self.serializar(dados, cachear_valores)
+        return self.montar_bruta(codigo_status, texto_status, corpo, b"application/json",
+                                 id_customizado, keep_alive, cabecalhos_extras)
+
+    def montar_bruta(self, codigo_status, texto_status, corpo, tipo_conteudo, id_customizado="",
+                     keep_alive=None, cabecalhos_extras=None):
+        #Monta uma resposta com corpo já em bytes
+        partes = [
+            self.linha_status(codigo_status, texto_status),
+            b"Content-Type: ", tipo_conteudo,
+            b"\r\nContent-Length: ", str(len(corpo)).encode('ascii'),
+            b"\r\n", self.cabecalhos_fixos
+        ]
+        if cabecalhos_extras:
+            for chave, valor in cabecalhos_extras.items():
+                partes.append(f"{chave}: {valor}\r\n".encode('utf-8'))
+        partes.append(b"X-Custom-ID: ")
+        partes.append(id_customizado.encode('utf-8'))
+        partes.append(b"\r\n")
+        partes.append(self.linha_conexao(keep_alive))
+        partes.append(b"\r\n")
+        partes.append(corpo)
+        return b"".join(partes)
+
+    def linha_status(self, codigo_status, texto_status):
+        #Linha de status pré-codificada
+        chave = (codigo_status, texto_status)
+        linha = self.linhas_status.get(chave)
+        if linha is None:
+            linha = f"HTTP/1.1 {codigo_status} {texto_status}\r\n".encode('utf-8')
+            self.linhas_status[chave] = linha
+        return linha
+
+    def linha_conexao(self, keep_alive):
+        #Cabeçalhos Connection/Keep-Alive pré-codificados para cada combinação usada
+        linha = self.linhas_conexao.get(keep_alive)
+        if linha is None:
+            if keep_alive is None:
+                linha = b"Connection: close\r\n"
+            else:
+                tempo_limite, requisicoes_restantes = keep_alive
+                linha = f"Connection: keep-alive\r\nKeep-Alive: timeout={tempo_limite}, max={requisicoes_restantes}\r\n".encode('ascii')
+            self.linhas_conexao[keep_alive] = linha
+        return linha
+
+    def serializar(self, dados, cachear_valores=True):
+        #Serializa um dict com a mesma saída de json.dumps (indent=2 ou compacto), par a par
+        #Sem cachear_valores (rotas cujo conteúdo muda a cada requisição) só as chaves vêm do cache
+        if not dados:
+            return b"{}"
+        pares = [self.fragmento(chave, valor, cachear_valores) for chave, valor in dados.items()]
+        return self.abertura + self.separador.join(pares) + self.fechamento
+
+    def fragmento(self, chave, valor, cachear_valores=True):
+        #Par "chave": valor em bytes; strings, booleanos e None vêm do cache
+        tipo = type(valor)
+        if tipo is int or tipo is float:
+            return self.chave_codificada(chave) + repr(valor).encode('ascii')
+
+        if tipo is dict or tipo is list:
+            if self.json_compacto:
+                texto = json.dumps(valor, separators=(',', ':'))
+            else:
+                texto = json.dumps(valor, indent=2).replace("\n", "\n  ")
+            return self.chave_codificada(chave) + texto.encode('ascii')
+
+        if not cachear_valores and tipo is str:
+            #Valores variáveis (ex.: o caminho de /eco/{mensagem}) esvaziariam o cache sem nunca serem reaproveitados
+            return self.chave_codificada(chave) + json.dumps(valor).encode('ascii')
+
+        chave_cache = (chave, valor)
+        fragmento = self.fragmentos.get(chave_cache)
+        if fragmento is None:
+            fragmento = self.chave_codificada(chave) + json.dumps(valor).encode('ascii')
+            if len(self.fragmentos) >= MAX_FRAGMENTOS_CACHE:
+                self.fragmentos.clear()
+            self.fragmentos[chave_cache] = fragmento
+        return fragmento
+
+    def chave_codificada(self, chave):
+        #"chave": já codificado
+        fragmento = self.fragmentos.get(chave)
+        if fragmento is None:
+            fragmento = json.dumps(chave).encode('ascii') + self.separador_chave
+            self.fragmentos[chave] = fragmento
+        return fragmento
@@ -0,0 +1,98 @@
+#Roda de temporização (hashed timer wheel)
+#Agenda callbacks com custo O(1) por inserção; uma única thread avança a roda a cada tick e dispara os vencidos
+
+import math
+import threading
+import time
+from configuracao import RESOLUCAO_RODA, SLOTS_RODA
+from registro import registro
+
+class Temporizador:
+    #Entrada da roda; rodadas é quantas voltas completas faltam até disparar
+    __slots__ = ('rodadas', 'callback', 'argumentos', 'cancelado')
+
+    def __init__(self, rodadas, callback, argumentos):
+        self.rodadas = rodadas
+        self.callback = callback
+        self.argumentos = argumentos
+        self.cancelado = False
+
+    def cancelar(self):
+        self.cancelado = True
+
+class RodaTemporizacao:
+    def __init__(self, resolucao=RESOLUCAO_RODA, num_slots=SLOTS_RODA):
+        self.resolucao = resolucao
+        self.num_slots = num_slots
+        self.slots = [[] for _ in range(num_slots)]
+        self.posicao = 0
+        self.pendentes = 0
+        self.disparados = 0
+        self.lock = threading.Lock()
+        self.executando = False
+        self.thread = None
+
+    def iniciar(self):
+        #Inicia a thread que avança a roda
+        self.executando = True
+        self.thread = threading.Thread(target=self.executar, daemon=True)
+        self.thread.start()
+        print(f"Roda de temporização iniciada ({self.num_slots} slots de {self.resolucao * 1000:.0f}ms)")
+
+    def agendar(self, atraso, callback, *argumentos):
+        #Agenda callback(*argumentos) para daqui a atraso segundos (arredondado para cima no tick)
+        ticks = max(1, math.ceil(atraso / self.resolucao))
+        temporizador = Temporizador((ticks - 1) // self.num_slots, callback, argumentos)
+        with self.lock:
+            self.slots[(self.posicao + ticks) % self.num_slots].append(temporizador)
+            self.pendentes += 1
+        return temporizador
+
+    def executar(self):
+        #Avança um slot por tick; se atrasar, avança sem dormir até alcançar o relógio
+        proximo_tick = time.monotonic() + self.resolucao
+        while self.executando:
+            espera = proximo_tick - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            proximo_tick += self.resolucao
+            self.avancar()
+
+    def avancar(self):
+        #Processa o próximo slot: dispara as entradas da volta atual e desconta uma volta das demais
+        with self.lock:
+            self.posicao = (self.posicao + 1) % self.num_slots
+            vencidos = []
+            restantes = []
+            for temporizador in self.slots[self.posicao]:
+                if temporizador.rodadas > 0:
+                    temporizador.rodadas -= 1
+                    restantes.append(temporizador)
+                else:
+                    vencidos.append(temporizador)
+            self.slots[self.posicao] = restantes
+            self.pendentes -= len(vencidos)
+
+        #Callbacks rodam fora do lock para poderem agendar novos temporizadores
+        for temporizador in vencidos:
+            if temporizador.cancelado:
+                continue
+            try:
+                temporizador.callback(*temporizador.argumentos)
+            except Exception as e:
+                registro.erro("Erro no temporizador", erro=e)
+            self.disparados += 1
+
+    def estatisticas(self):
+        #Resumo da roda para o endpoint /status
+        with self.lock:
+            return {
+                "temporizadores_pendentes": self.pendentes,
+                "temporizadores_disparados": self.disparados,
+                "resolucao": self.resolucao,
+                "slots": self.num_slots
+            }
+
+    def parar(self):
+        #Para a thread da roda (temporizadores pendentes são descartados)
+        self.executando = False
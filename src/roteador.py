@@ -0,0 +1,149 @@
+#Roteador HTTP orientado a tabela compartilhado por todos os servidores
+#Rotas são registradas uma vez como (método, caminho) -> handler; o despacho é uma busca em dicionário
+
+import re
+from configuracao import ATRASOS_SIMULADOS
+from protocolo_http import ErroRequisicaoHTTP
+
+PADRAO_PARAMETRO = re.compile(r"\{(\w+)\}")
+TIPO_PROMETHEUS = b"text/plain; version=0.0.4; charset=utf-8"
+
+class ErroRota(ErroRequisicaoHTTP):
+    #404/405 gerado pelo roteador; no 405 guarda os métodos aceitos para o cabeçalho Allow
+    def __init__(self, codigo_status, texto_status, metodos_permitidos=()):
+        super().__init__(codigo_status, texto_status)
+        self.metodos_permitidos = tuple(sorted(metodos_permitidos))
+
+    def cabecalhos(self):
+        #Cabeçalhos extras da resposta de erro
+        if self.metodos_permitidos:
+            return {"Allow": ", ".join(self.metodos_permitidos)}
+        return None
+
+class Rota:
+    #Rota registrada e seus metadados (custo esperado, atraso simulado e se a resposta é cacheável)
+    #Cacheável: os textos da resposta se repetem entre requisições e podem ficar no cache de fragmentos
+    #Rotas brutas devolvem (corpo em bytes, Content-Type) em vez do conteúdo do JSON padrão
+    __slots__ = ('metodo', 'caminho', 'handler', 'nome', 'custo', 'atraso', 'cacheavel', 'bruta')
+
+    def __init__(self, metodo, caminho, handler, nome=None, custo="baixo", atraso=0, cacheavel=False, bruta=False):
+        self.metodo = metodo
+        self.caminho = caminho
+        self.handler = handler
+        self.nome = nome or caminho
+        self.custo = custo
+        self.atraso = atraso
+        self.cacheavel = cacheavel
+        self.bruta = bruta
+
+class PadraoRota:
+    #Caminho com parâmetros ({nome}) pré-compilado em regex, com as rotas de cada método
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.regex = re.compile("^" + PADRAO_PARAMETRO.sub(r"(?P<\1>[^/]+)", caminho) + "$")
+        self.rotas = {}
+
+class Roteador:
+    def __init__(self):
+        self.rotas = {}                #(método, caminho) -> Rota
+        self.metodos_por_caminho = {}  #caminho -> métodos registrados (usado no 405)
+        self.padroes = {}              #primeiro segmento literal -> [PadraoRota]
+        self.padroes_por_caminho = {}
+
+    def registrar(self, metodo, caminho, handler, **metadados):
+        #Registra uma rota; caminhos com {parametro} vão para a tabela de padrões
+        rota = Rota(metodo, caminho, handler, **metadados)
+
+        if PADRAO_PARAMETRO.search(caminho) is None:
+            self.rotas[(metodo, caminho)] = rota
+            self.metodos_por_caminho.setdefault(caminho, set()).add(metodo)
+            return rota
+
+        padrao = self.padroes_por_caminho.get(caminho)
+        if padrao is None:
+            padrao = PadraoRota(caminho)
+            self.padroes_por_caminho[caminho] = padrao
+            self.padroes.setdefault(self.primeiro_segmento(caminho), []).append(padrao)
+        padrao.rotas[metodo] = rota
+        return rota
+
+    def rota(self, metodo, caminho, **metadados):
+        #Decorador: @roteador.rota('GET', '/caminho', atraso=0.5)
+        def decorador(handler):
+            self.registrar(metodo, caminho, handler, **metadados)
+            return handler
+        return decorador
+
+    def resolver(self, metodo, caminho):
+        #Retorna (rota, parametros) ou levanta ErroRota com 404/405
+        if '?' in caminho:
+            caminho = caminho.split('?', 1)[0]
+
+        rota = self.rotas.get((metodo, caminho))
+        if rota is not None:
+            return rota, {}
+
+        metodos = self.metodos_por_caminho.get(caminho)
+        if metodos:
+            raise ErroRota(405, "Método Não Permitido", metodos)
+
+        #Só os padrões que começam com o mesmo segmento literal (ou com parâmetro) são testados
+        segmento = self.primeiro_segmento(caminho)
+        for padrao in self.padroes.get(segmento, []) + self.padroes.get(None, []):
+            correspondencia = padrao.regex.match(caminho)
+            if correspondencia is None:
+                continue
+            rota = padrao.rotas.get(metodo)
+            if rota is None:
+                raise ErroRota(405, "Método Não Permitido", padrao.rotas)
+            return rota, correspondencia.groupdict()
+
+        raise ErroRota(404, "Não Encontrado")
+
+    @staticmethod
+    def primeiro_segmento(caminho):
+        #Primeiro segmento do caminho ou None se for um parâmetro
+        segmento = caminho.split('/', 2)[1] if caminho.startswith('/') else caminho
+        if segmento.startswith('{'):
+            return None
+        return segmento
+
+#Handlers compartilhados: recebem o servidor, o dicionário da resposta e os parâmetros do caminho
+def pagina_inicial(servidor, dados_resposta, parametros):
+    return f"Página inicial do servidor {dados_resposta['tipo_servidor']}"
+
+def status(servidor, dados_resposta, parametros):
+    return servidor.dados_status(dados_resposta)
+
+def endpoint_simulado(servidor, dados_resposta, parametros):
+    return f"Endpoint {dados_resposta['caminho']} processado"
+
+def eco(servidor, dados_resposta, parametros):
+    return f"Eco: {parametros['mensagem']}"
+
+def receber_dados(servidor, dados_resposta, parametros):
+    return "Dados recebidos via POST"
+
+def metricas_prometheus(servidor, dados_resposta, parametros):
+    return servidor.metricas.formato_prometheus(), TIPO_PROMETHEUS
+
+def metricas_json(servidor, dados_resposta, parametros):
+    return servidor.metricas.instantaneo()
+
+def criar_roteador_padrao():
+    #Rotas atendidas por todos os servidores
+    roteador = Roteador()
+    roteador.registrar('GET', '/', pagina_inicial, cacheavel=True)
+    roteador.registrar('GET', '/status', status, cacheavel=True)
+    roteador.registrar('GET', '/rapido', endpoint_simulado, cacheavel=True)
+    roteador.registrar('GET', '/medio', endpoint_simulado, custo="medio",
+                       atraso=ATRASOS_SIMULADOS.get('/medio', 0), cacheavel=True)
+    roteador.registrar('GET', '/lento', endpoint_simulado, custo="alto",
+                       atraso=ATRASOS_SIMULADOS.get('/lento', 0), cacheavel=True)
+    roteador.registrar('GET', '/eco/{mensagem}', eco, nome='/eco')
+    roteador.registrar('POST', '/dados', receber_dados, cacheavel=True)
+    roteador.registrar('GET', '/metrics', metricas_prometheus, bruta=True)
+    roteador.registrar('GET', '/metrics/json', metricas_json, cacheavel=True)
+    return roteador
+
+ROTEADOR_PADRAO = criar_roteador_padrao()
@@ -0,0 +1,208 @@
+#Servidor Web Assíncrono (asyncio)
+#Implementa um servidor que atende múltiplas requisições em uma única thread usando um event loop
+
+import asyncio
+import argparse
+import socket
+import time
+from configuracao import PORTA_SERVIDOR, TEMPO_KEEP_ALIVE, TAMANHO_LEITURA, TAMANHO_SAIDA_PIPELINE
+from protocolo_http import ParserHTTP, ErroRequisicaoHTTP, negociar_keep_alive
+from roteador import ErroRota
+from metricas import ROTA_DESCONHECIDA
+from registro import registro
+from servidor_sequencial import ServidorWebSequencial
+
+class EscritorPipeline:
+    #Equivalente da ConexaoPipeline para o StreamWriter: respostas de requisições em pipeline acumulam
+    #enquanto o parser tiver bytes da próxima requisição e vão ao transporte em uma única escrita
+    def __init__(self, escritor, parser, tamanho_maximo=TAMANHO_SAIDA_PIPELINE):
+        self.escritor = escritor
+        self.parser = parser
+        self.tamanho_maximo = tamanho_maximo
+        self.pendente = bytearray()
+
+    def write(self, dados):
+        if self.parser.tem_dados_pendentes() and len(self.pendente) + len(dados) < self.tamanho_maximo:
+            self.pendente += dados
+            return
+        if self.pendente:
+            self.pendente += dados
+            dados, self.pendente = self.pendente, bytearray()
+        self.escritor.write(dados)
+
+    def descarregar(self):
+        #Entrega ao transporte as respostas acumuladas (o bytearray não é reutilizado, o transporte pode guardá-lo)
+        if self.pendente:
+            dados, self.pendente = self.pendente, bytearray()
+            self.escritor.write(dados)
+
+    async def drain(self):
+        await self.escritor.drain()
+
+class ServidorWebAssincrono(ServidorWebSequencial):
+    TIPO_SERVIDOR = "assincrono"
+    NOME_SERVIDOR = "ServidorAssincrono/1.0"
+
+    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
+        super().__init__(host, porta)
+        self.conexoes_ativas = 0
+
+    def iniciar(self):
+        #Inicia o servidor assíncrono
+        try:
+            asyncio.run(self.executar())
+        except KeyboardInterrupt:
+            print("\nServidor interrompido pelo usuário")
+        except Exception as e:
+            print(f"Erro no servidor: {e}")
+        finally:
+            self.parar()
+
+    async def executar(self):
+        #Cria o servidor asyncio e atende conexões até ser interrompido
+        self.socket_servidor = await asyncio.start_server(
+            self.gerenciar_cliente,
+            self.host,
+            self.porta,
+            reuse_address=True,
+            backlog=socket.SOMAXCONN
+        )
+        print(f"Servidor Assíncrono iniciado em {self.host}:{self.porta}")
+
+        async with self.socket_servidor:
+            await self.socket_servidor.serve_forever()
+
+    async def gerenciar_cliente(self, leitor, escritor):
+        #Gerencia a conexão com um cliente como uma corrotina do event loop
+        endereco_cliente = escritor.get_extra_info('peername')
+        self.conexoes_ativas += 1
+        self.metricas.conexao_aceita()
+        registro.info("Conexão aceita", endereco=endereco_cliente)
+
+        try:
+            await self.processar_requisicao(leitor, escritor)
+        except OSError as e:
+            registro.aviso("Erro na conexão", endereco=endereco_cliente, erro=e)
+        finally:
+            self.conexoes_ativas -= 1
+            self.metricas.conexao_encerrada()
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def processar_requisicao(self, leitor, escritor):
+        #Atende as requisições HTTP de uma conexão (persistente ou não)
+        parser = ParserHTTP()
+        requisicoes_atendidas = 0
+        tempo_limite = TEMPO_KEEP_ALIVE
+        #Respostas de requisições em pipeline saem juntas em uma única escrita
+        escritor = EscritorPipeline(escritor, parser)
+
+        try:
+            while True:
+                #Aguarda a próxima requisição até o tempo ocioso expirar
+                try:
+                    requisicao = await asyncio.wait_for(self.receber_requisicao(leitor, parser, escritor), tempo_limite)
+                except asyncio.TimeoutError:
+                    break
+                except ErroRequisicaoHTTP as e:
+                    resposta_erro = self.gerar_resposta_erro(e.codigo_status, e.texto_status)
+                    escritor.write(resposta_erro)
+                    break
+                if requisicao is None:
+                    break
+
+                requisicoes_atendidas += 1
+                keep_alive = await self.atender_requisicao(escritor, requisicao, requisicoes_atendidas)
+                if keep_alive is None:
+                    break
+                tempo_limite = keep_alive[0]
+        finally:
+            escritor.descarregar()
+        await escritor.drain()
+
+    async def receber_requisicao(self, leitor, parser, escritor=None):
+        #Lê do stream até o parser ter uma requisição completa (None se o cliente fechar a conexão)
+        while True:
+            requisicao = parser.proxima_requisicao()
+            if requisicao is not None:
+                return requisicao
+
+            #Antes de esperar mais bytes, envia as respostas do pipeline que ficaram acumuladas
+            if escritor is not None:
+                escritor.descarregar()
+            dados = await leitor.read(TAMANHO_LEITURA)
+            if not dados:
+                return None
+            parser.alimentar(dados)
+
+    async def atender_requisicao(self, escritor, requisicao, requisicoes_atendidas):
+        #Processa uma requisição HTTP sem bloquear o event loop
+        try:
+            tempo_inicio = time.time()
+            metodo, caminho = requisicao.metodo, requisicao.caminho
+
+            #Verifica o cabeçalho customizado
+            id_customizado = requisicao.cabecalhos.get('x-custom-id', '')
+            keep_alive = negociar_keep_alive(requisicao.versao, requisicao.cabecalhos, requisicoes_atendidas)
+
+            self.contador_requisicoes += 1
+            requisicao_atual = self.contador_requisicoes
+
+            try:
+                rota, parametros = self.roteador.resolver(metodo, caminho)
+            except ErroRota as e:
+                nome_rota, codigo_status = ROTA_DESCONHECIDA, e.codigo_status
+                resposta = self.gerar_resposta_erro(e.codigo_status, e.texto_status, id_customizado, keep_alive, e.cabecalhos())
+            else:
+                nome_rota, codigo_status = rota.nome, 200
+                #Simula o processamento liberando o event loop para outras conexões
+                if rota.atraso:
+                    #Respostas anteriores do pipeline não esperam pelo atraso desta requisição
+                    escritor.descarregar()
+                    await asyncio.sleep(rota.atraso)
+
+                resposta = self.montar_resposta(metodo, caminho, id_customizado, tempo_inicio, rota, parametros,
+                                                requisicao_atual, keep_alive)
+
+            #Envia resposta
+            escritor.write(resposta)
+            await escritor.drain()
+
+            tempo_processamento = time.time() - tempo_inicio
+            self.metricas.registrar(nome_rota, codigo_status, tempo_processamento, requisicao.tamanho, len(resposta))
+            registro.info("Requisição processada", requisicao=requisicao_atual, tempo=tempo_processamento)
+
+            return keep_alive
+
+        except Exception as e:
+            registro.erro("Erro ao processar requisição", erro=e)
+            resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor")
+            escritor.write(resposta_erro)
+            return None
+
+    def dados_status(self, dados_resposta=None):
+        #Dados retornados pelo endpoint /status
+        dados = super().dados_status(dados_resposta)
+        dados["conexoes_ativas"] = self.conexoes_ativas
+        return dados
+
+    def parar(self):
+        #Para o servidor
+        if self.socket_servidor:
+            self.socket_servidor.close()
+            print("Servidor assíncrono parado")
+        registro.fechar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor Web Assíncrono (asyncio)')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=PORTA_SERVIDOR,
+                       help='Porta de escuta')
+    args = parser.parse_args()
+    
+    servidor = ServidorWebAssincrono(args.host, args.porta)
+    servidor.iniciar()
@@ -2,25 +2,76 @@
 #Implementa um servidor que atende múltiplas requisições simultaneamente usando threads
 
 import socket
-import json
 import time
 import threading
-from datetime import datetime
-from configuracao import PORTA_SERVIDOR, ID_CUSTOMIZADO, MAX_CONEXOES
+import queue
+import argparse
+import itertools
+from configuracao import (PORTA_SERVIDOR, ID_CUSTOMIZADO, MAX_CONEXOES, TAMANHO_POOL_THREADS, TAMANHO_FILA_CONEXOES,
+                          TEMPO_KEEP_ALIVE, ESPERA_OCIOSA_POOL, ESPERA_FILA_RESPOSTA_PENDENTE)
+from protocolo_http import ParserHTTP, ConexaoPipeline, ErroRequisicaoHTTP, receber_requisicao, negociar_keep_alive
+from respostas import ConstrutorRespostas, relogio
+from roteador import ROTEADOR_PADRAO, ErroRota
+from roda_temporizacao import RodaTemporizacao
+from conexoes_ociosas import ConexoesOciosas
+from metricas import RegistroMetricas, ROTA_DESCONHECIDA
+from contadores import ContadorFragmentado
+from registro import registro
+
+#Retornado por atender_requisicao quando a conexão foi entregue à roda de temporização
+ESTACIONADA = object()
+
+class EstadoConexao:
+    #Estado de uma conexão keep-alive preservado enquanto ela fica estacionada na roda de temporização
+    __slots__ = ('id_conexao', 'parser', 'requisicoes_atendidas', 'tempo_limite', 'resposta_pendente')
+
+    def __init__(self, id_conexao):
+        self.id_conexao = id_conexao
+        self.parser = ParserHTTP()
+        self.requisicoes_atendidas = 0
+        self.tempo_limite = TEMPO_KEEP_ALIVE
+        self.resposta_pendente = None  #Resposta montada pela roda, enviada pelo worker que retomar a conexão
 
 class ServidorWebConcorrente:
-    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
+    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR, usar_pool = False,
+                 tamanho_pool = TAMANHO_POOL_THREADS, tamanho_fila = TAMANHO_FILA_CONEXOES, reuse_port = False,
+                 usar_roda = False):
         self.host = host
         self.porta = porta
+        self.reuse_port = reuse_port
         self.socket_servidor = None
-        self.contador_requisicoes = 0
-        self.lock = threading.Lock()
-        self.conexoes_ativas = 0
+        self.erro = None  #Exceção que encerrou o servidor (ex.: bind falhou), para quem o embute decidir o status
+        self.lock = threading.Lock()  #Só para as estatísticas do pool; o caminho de cada requisição não usa lock
+        
+        #next() de itertools.count é atômico no CPython; conexões ativas são somadas só na leitura
+        self.sequencia_requisicoes = itertools.count(1)
+        self.ids_conexao = itertools.count(1)
+        self.conexoes_ativas = ContadorFragmentado()
+        self.construtor = ConstrutorRespostas("ServidorConcorrente/1.0", "concorrente")
+        self.roteador = ROTEADOR_PADRAO
+        self.metricas = RegistroMetricas("concorrente")
+        
+        #Modo pool: workers fixos consumindo uma fila limitada de conexões
+        self.usar_pool = usar_pool
+        self.tamanho_pool = tamanho_pool
+        self.fila_conexoes = queue.Queue(maxsize=tamanho_fila)
+        self.conexoes_rejeitadas = 0
+        self.conexoes_retiradas_fila = 0
+        self.tempo_espera_total = 0.0
+        self.tempo_espera_maximo = 0.0
+        #Conexões keep-alive ociosas esperam em um seletor, não em um worker bloqueado em recv
+        self.ociosas = ConexoesOciosas(self.despachar_conexao, self.expirar_conexao) if usar_pool else None
+        
+        #Modo roda de temporização: atrasos simulados não prendem threads
+        self.roda = RodaTemporizacao() if usar_roda else None
         
     def iniciar(self):
         #Inicia o servidor concorrente"
         self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            #Vários processos podem escutar a mesma porta; o kernel distribui as conexões
+            self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             self.socket_servidor.bind((self.host, self.porta))
@@ -28,102 +79,298 @@ class ServidorWebConcorrente:
             print(f"Servidor Concorrente iniciado em {self.host}:{self.porta}")
             print(f"Máximo de {MAX_CONEXOES} conexões simultâneas")
             
+            if self.usar_pool:
+                self.iniciar_pool()
+                self.ociosas.iniciar()
+            if self.roda is not None:
+                self.roda.iniciar()
+            
             while True:
                 socket_cliente, endereco_cliente = self.socket_servidor.accept()
-                
-                #Cria uma thread para cada cliente
-                thread_cliente = threading.Thread(
-                    target=self.gerenciar_cliente,
-                    args=(socket_cliente, endereco_cliente)
-                )
-                thread_cliente.daemon = True
-                thread_cliente.start()
+                self.metricas.conexao_aceita()
+                self.despachar_conexao(socket_cliente, endereco_cliente)
                 
         except KeyboardInterrupt:
             print("\nServidor interrompido pelo usuário")
         except Exception as e:
             print(f"Erro no servidor: {e}")
+            self.erro = e
         finally:
             self.parar()
     
-    def gerenciar_cliente(self, socket_cliente, endereco_cliente):
-        #Gerencia a conexão com um cliente em uma thread separada
-        with self.lock:
-            self.conexoes_ativas += 1
-            id_conexao = self.conexoes_ativas
-            
-        print(f"Conexão {id_conexao} aceita de {endereco_cliente}")
+    def despachar_conexao(self, socket_cliente, endereco_cliente, estado=None):
+        #Entrega a conexão ao pool ou a uma thread nova (estado vem preenchido quando ela volta da roda)
+        if self.usar_pool:
+            self.enfileirar_conexao(socket_cliente, endereco_cliente, estado)
+            return
+        
+        #Cria uma thread para cada cliente
+        thread_cliente = threading.Thread(
+            target=self.gerenciar_cliente,
+            args=(socket_cliente, endereco_cliente, estado)
+        )
+        thread_cliente.daemon = True
+        thread_cliente.start()
+    
+    def iniciar_pool(self):
+        #Cria o conjunto fixo de threads reutilizáveis
+        for _ in range(self.tamanho_pool):
+            thread_worker = threading.Thread(target=self.executar_worker)
+            thread_worker.daemon = True
+            thread_worker.start()
         
+        print(f"Pool de {self.tamanho_pool} threads com fila de {self.fila_conexoes.maxsize} conexões")
+    
+    def enfileirar_conexao(self, socket_cliente, endereco_cliente, estado=None):
+        #Coloca a conexão na fila do pool ou rejeita com 503 se a fila estiver cheia
+        #Uma conexão keep-alive ociosa que volta do seletor não pediu nada agora: é só fechada; uma que volta da
+        #roda com a resposta pronta espera vaga por um tempo limitado e, se a fila continuar cheia, recebe a
+        #resposta antes de ser fechada
+        item = (socket_cliente, endereco_cliente, estado, time.time())
         try:
-            self.processar_requisicao(socket_cliente, endereco_cliente, id_conexao)
-        finally:
+            if estado is not None and estado.resposta_pendente is not None:
+                self.fila_conexoes.put(item, timeout=ESPERA_FILA_RESPOSTA_PENDENTE)
+            else:
+                self.fila_conexoes.put_nowait(item)
+        except queue.Full:
             with self.lock:
-                self.conexoes_ativas -= 1
-            print(f"Conexão {id_conexao} finalizada")
+                self.conexoes_rejeitadas += 1
+            registro.aviso("Fila cheia, conexão rejeitada", endereco=endereco_cliente)
+            if estado is not None:
+                if estado.resposta_pendente is not None:
+                    self.entregar_e_fechar(socket_cliente, estado)
+                socket_cliente.close()
+                self.finalizar_conexao(estado)
+                return
+            try:
+                resposta_erro = self.gerar_resposta_erro(503, "Serviço Indisponível", 0)
+                socket_cliente.send(resposta_erro)
+            except OSError:
+                pass
+            finally:
+                socket_cliente.close()
+                self.metricas.conexao_encerrada()
     
-    def processar_requisicao(self, socket_cliente, endereco_cliente, id_conexao):
-        #Processa uma requisição HTTP
+    def entregar_e_fechar(self, socket_cliente, estado):
+        #Envia a resposta atrasada sem passar pelo pool (o envio tem tempo limite para não travar a roda)
         try:
-            tempo_inicio = time.time()
-            
-            #Recebe a requisição
-            dados_requisicao = socket_cliente.recv(4096).decode('utf-8')
-            if not dados_requisicao:
-                return
+            socket_cliente.settimeout(ESPERA_FILA_RESPOSTA_PENDENTE)
+            self.enviar_resposta_pendente(socket_cliente, estado)
+        except OSError as e:
+            registro.aviso("Erro na conexão", conexao=estado.id_conexao, erro=e)
+    
+    def executar_worker(self):
+        #Laço de uma thread do pool: retira conexões da fila e as atende
+        while True:
+            socket_cliente, endereco_cliente, estado, tempo_enfileirada = self.fila_conexoes.get()
+            tempo_espera = time.time() - tempo_enfileirada
             
-            #Parse da requisição HTTP
-            linhas_requisicao = dados_requisicao.split('\n')
-            linha_requisicao = linhas_requisicao[0].strip()
-            metodo, caminho, versao = linha_requisicao.split(' ')
+            with self.lock:
+                self.conexoes_retiradas_fila += 1
+                self.tempo_espera_total += tempo_espera
+                self.tempo_espera_maximo = max(self.tempo_espera_maximo, tempo_espera)
             
-            #Extrai headers
-            cabecalhos = {}
-            for linha in linhas_requisicao[1:]:
-                if ':' in linha:
-                    chave, valor = linha.split(':', 1)
-                    cabecalhos[chave.strip()] = valor.strip()
+            try:
+                self.gerenciar_cliente(socket_cliente, endereco_cliente, estado)
+            except Exception as e:
+                registro.erro("Erro no worker do pool", erro=e)
+    
+    def estatisticas_pool(self):
+        #Resumo da fila do pool para o endpoint /status
+        with self.lock:
+            retiradas = self.conexoes_retiradas_fila
+            return {
+                "tamanho_pool": self.tamanho_pool,
+                "profundidade_fila": self.fila_conexoes.qsize(),
+                "capacidade_fila": self.fila_conexoes.maxsize,
+                "conexoes_rejeitadas": self.conexoes_rejeitadas,
+                "tempo_espera_medio": self.tempo_espera_total / retiradas if retiradas else 0.0,
+                "tempo_espera_maximo": self.tempo_espera_maximo
+            }
+    
+    def gerenciar_cliente(self, socket_cliente, endereco_cliente, estado=None):
+        #Gerencia a conexão com um cliente em uma thread separada
+        if estado is None:
+            id_conexao = self.registrar_conexao()
+            estado = EstadoConexao(id_conexao)
+            #Respostas de requisições em pipeline saem juntas; o mesmo objeto volta da roda junto com o estado
+            socket_cliente = ConexaoPipeline(socket_cliente, estado.parser)
+            registro.info("Conexão aceita", conexao=id_conexao, endereco=endereco_cliente)
+        
+        estacionada = False
+        try:
+            estacionada = self.processar_requisicao(socket_cliente, endereco_cliente, estado)
+        finally:
+            if not estacionada:
+                self.finalizar_conexao(estado)
+    
+    def registrar_conexao(self):
+        #Contabiliza uma conexão nova e retorna seu id
+        self.conexoes_ativas.somar(1)
+        return next(self.ids_conexao)
+    
+    def finalizar_conexao(self, estado):
+        #Contabiliza o fim de uma conexão
+        self.conexoes_ativas.somar(-1)
+        self.metricas.conexao_encerrada()
+        registro.info("Conexão finalizada", conexao=estado.id_conexao)
+    
+    def processar_requisicao(self, socket_cliente, endereco_cliente, estado):
+        #Atende as requisições HTTP de uma conexão (persistente ou não); retorna True se ela foi estacionada
+        #(na roda de temporização ou, no pool, no seletor de conexões ociosas)
+        estacionada = False
+        
+        try:
+            continuar = self.enviar_resposta_pendente(socket_cliente, estado)
+            while continuar:
+                #Aguarda a próxima requisição até o tempo ocioso expirar
+                try:
+                    requisicao = self.aguardar_requisicao(socket_cliente, estado)
+                except socket.timeout:
+                    if self.ociosas is None:
+                        break
+                    #No pool a conexão ociosa vai para o seletor e o worker volta para a fila
+                    socket_cliente.descarregar()
+                    self.ociosas.estacionar(socket_cliente, endereco_cliente, estado)
+                    estacionada = True
+                    break
+                except ErroRequisicaoHTTP as e:
+                    resposta_erro = self.gerar_resposta_erro(e.codigo_status, e.texto_status, estado.id_conexao)
+                    socket_cliente.sendall(resposta_erro)
+                    break
+                if requisicao is None:
+                    break
+                
+                estado.requisicoes_atendidas += 1
+                keep_alive = self.atender_requisicao(socket_cliente, endereco_cliente, requisicao, estado)
+                if keep_alive is ESTACIONADA:
+                    #A roda passa a ser dona do socket; esta thread volta a atender outras conexões
+                    estacionada = True
+                    break
+                if keep_alive is None:
+                    break
+                estado.tempo_limite = keep_alive[0]
+        except OSError as e:
+            registro.aviso("Erro na conexão", conexao=estado.id_conexao, erro=e)
+        finally:
+            if not estacionada:
+                socket_cliente.close()
+        
+        return estacionada
+    
+    def aguardar_requisicao(self, socket_cliente, estado):
+        #Próxima requisição da conexão (None se o cliente fechar); socket.timeout se ela ficar ociosa
+        #No pool o worker só espera um instante, e nada se houver conexões na fila
+        espera = estado.tempo_limite
+        if self.ociosas is not None:
+            requisicao = estado.parser.proxima_requisicao()
+            if requisicao is not None:
+                return requisicao
+            if not self.fila_conexoes.empty():
+                raise socket.timeout()
+            espera = min(espera, ESPERA_OCIOSA_POOL)
+        
+        socket_cliente.settimeout(espera)
+        return receber_requisicao(socket_cliente, estado.parser)
+    
+    def expirar_conexao(self, socket_cliente, estado):
+        #Keep-alive vencido enquanto a conexão esperava no seletor de ociosas
+        socket_cliente.close()
+        self.finalizar_conexao(estado)
+    
+    def atender_requisicao(self, socket_cliente, endereco_cliente, requisicao, estado):
+        #Processa uma requisição HTTP e retorna o keep-alive negociado (None fecha a conexão, ESTACIONADA se ficou na roda)
+        id_conexao = estado.id_conexao
+        try:
+            tempo_inicio = time.time()
+            metodo, caminho = requisicao.metodo, requisicao.caminho
             
             #Verifica o cabeçalho customizado
-            id_customizado = cabecalhos.get('X-Custom-ID', '')
+            id_customizado = requisicao.cabecalhos.get('x-custom-id', '')
+            keep_alive = negociar_keep_alive(requisicao.versao, requisicao.cabecalhos, estado.requisicoes_atendidas)
             
-            with self.lock:
-                self.contador_requisicoes += 1
-                requisicao_atual = self.contador_requisicoes
+            requisicao_atual = self.registrar_requisicao()
             
-            #Gera resposta baseada no método e path
-            resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio, requisicao_atual, id_conexao)
+            try:
+                rota, parametros = self.roteador.resolver(metodo, caminho)
+            except ErroRota as e:
+                nome_rota, codigo_status = ROTA_DESCONHECIDA, e.codigo_status
+                resposta = self.gerar_resposta_erro(e.codigo_status, e.texto_status, id_conexao, id_customizado, keep_alive, e.cabecalhos())
+            else:
+                nome_rota, codigo_status = rota.nome, 200
+                argumentos = (metodo, caminho, id_customizado, tempo_inicio, rota, parametros, requisicao_atual, id_conexao, keep_alive)
+                if rota.atraso:
+                    #Respostas anteriores do pipeline não esperam pelo atraso desta requisição
+                    socket_cliente.descarregar()
+                if rota.atraso and self.roda is not None:
+                    #Em vez de dormir, a resposta é concluída quando o temporizador disparar
+                    self.roda.agendar(rota.atraso, self.concluir_estacionada, socket_cliente, endereco_cliente, estado,
+                                      argumentos, requisicao.tamanho)
+                    return ESTACIONADA
+                
+                #Simula o processamento com o atraso definido na rota ('/' e '/rapido' não têm atraso)
+                if rota.atraso:
+                    time.sleep(rota.atraso)
+                resposta = self.montar_resposta(*argumentos)
             
             #Envia resposta
-            socket_cliente.send(resposta.encode('utf-8'))
+            socket_cliente.sendall(resposta)
             
             tempo_processamento = time.time() - tempo_inicio
-            print(f"Requisição {requisicao_atual} (conexão {id_conexao}) processada em {tempo_processamento:.4f}s")
+            self.metricas.registrar(nome_rota, codigo_status, tempo_processamento, requisicao.tamanho, len(resposta))
+            registro.info("Requisição processada", requisicao=requisicao_atual, conexao=id_conexao, tempo=tempo_processamento)
+            
+            return keep_alive
             
         except Exception as e:
-            print(f"Erro ao processar requisição na conexão {id_conexao}: {e}")
+            registro.erro("Erro ao processar requisição", conexao=id_conexao, erro=e)
             resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor", id_conexao)
-            socket_cliente.send(resposta_erro.encode('utf-8'))
-        finally:
-            socket_cliente.close()
+            socket_cliente.sendall(resposta_erro)
+            return None
     
-    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, num_requisicao, id_conexao):
-        #Gera resposta HTTP baseada no método e path
+    def concluir_estacionada(self, socket_cliente, endereco_cliente, estado, argumentos, bytes_recebidos):
+        #Executado pela thread da roda: só monta a resposta atrasada; o envio (que pode bloquear) fica com o worker
+        try:
+            estado.resposta_pendente = (self.montar_resposta(*argumentos), 200, argumentos, bytes_recebidos)
+        except Exception as e:
+            registro.erro("Erro ao processar requisição", conexao=estado.id_conexao, erro=e)
+            resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor", estado.id_conexao)
+            estado.resposta_pendente = (resposta_erro, 500, argumentos[:-1] + (None,), bytes_recebidos)
+        self.despachar_conexao(socket_cliente, endereco_cliente, estado)
+    
+    def enviar_resposta_pendente(self, socket_cliente, estado):
+        #Envia a resposta deixada pela roda; retorna False se a conexão deve ser fechada em seguida
+        if estado.resposta_pendente is None:
+            return True
+        resposta, codigo_status, argumentos, bytes_recebidos = estado.resposta_pendente
+        estado.resposta_pendente = None
         
-        #Simula diferentes tipos de processamento
-        if caminho == '/lento':
-            time.sleep(2)  #Simula processamento lento
-        elif caminho == '/medio':
-            time.sleep(0.5)  #Processamento médio
-        #Path '/' ou '/rapido' - processamento rápido (sem delay)
+        socket_cliente.sendall(resposta)
+        tempo_processamento = time.time() - argumentos[3]
+        self.metricas.registrar(argumentos[4].nome, codigo_status, tempo_processamento, bytes_recebidos, len(resposta))
+        registro.info("Requisição processada", requisicao=argumentos[6], conexao=estado.id_conexao, tempo=tempo_processamento)
         
-        with self.lock:
-            ativas_atuais = self.conexoes_ativas
+        keep_alive = argumentos[-1]
+        if keep_alive is None:
+            return False
+        estado.tempo_limite = keep_alive[0]
+        return True
+    
+    def montar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, rota, parametros, num_requisicao, id_conexao,
+                        keep_alive=None):
+        #Monta a resposta HTTP da rota já resolvida, sem simular o processamento
+        if rota.bruta:
+            corpo, tipo_conteudo = rota.handler(self, None, parametros)
+            return self.construtor.montar_bruta(200, "OK", corpo, tipo_conteudo, id_customizado, keep_alive,
+                                                {"X-Connection-ID": id_conexao})
+        
+        ativas_atuais = self.conexoes_ativas.valor_recente()
         
         dados_resposta = {
             "tipo_servidor": "concorrente",
             "metodo": metodo,
             "caminho": caminho,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": relogio.agora(),
             "contador_requisicoes": num_requisicao,
             "id_conexao": id_conexao,
             "conexoes_ativas": ativas_atuais,
@@ -135,47 +382,33 @@ class ServidorWebConcorrente:
             "mensagem": f"Resposta do servidor concorrente para {metodo} {caminho}"
         }
         
-        if metodo == 'GET':
-            if caminho == '/':
-                dados_resposta["conteudo"] = "Página inicial do servidor concorrente"
-            elif caminho == '/status':
-                dados_resposta["conteudo"] = {
-                    "status_servidor": "rodando",
-                    "total_requisicoes": num_requisicao,
-                    "conexoes_ativas": ativas_atuais,
-                    "tipo_servidor": "concorrente"
-                }
-            elif caminho in ['/rapido', '/medio', '/lento']:
-                dados_resposta["conteudo"] = f"Endpoint {caminho} processado"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_conexao, id_customizado)
-                
-        elif metodo == 'POST':
-            if caminho == '/dados':
-                dados_resposta["conteudo"] = "Dados recebidos via POST"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_conexao, id_customizado)
-                
-        else:
-            return self.gerar_resposta_erro(405, "Método Não Permitido", id_conexao, id_customizado)
-        
-        resposta_json = json.dumps(dados_resposta, indent=2)
-        
-        resposta = f"""HTTP/1.1 200 OK\r
-Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
-Server: ServidorConcorrente/1.0\r
-X-Server-Type: concorrente\r
-X-Connection-ID: {id_conexao}\r
-X-Thread-ID: {threading.current_thread().ident}\r
-X-Custom-ID: {id_customizado}\r
-Connection: close\r
-\r
-{resposta_json}"""
-        
-        return resposta
-    
-    def gerar_resposta_erro(self, codigo_status, texto_status, id_conexao, id_customizado=""):
+        dados_resposta["conteudo"] = rota.handler(self, dados_resposta, parametros)
+        
+        cabecalhos_extras = {"X-Connection-ID": id_conexao, "X-Thread-ID": dados_resposta["id_thread"]}
+        return self.construtor.montar(200, "OK", dados_resposta, id_customizado, keep_alive, cabecalhos_extras,
+                                      rota.cacheavel)
+    
+    def registrar_requisicao(self):
+        #Retorna o número da requisição atual (sem lock)
+        return next(self.sequencia_requisicoes)
+    
+    def dados_status(self, dados_resposta):
+        #Dados retornados pelo endpoint /status
+        dados = {
+            "status_servidor": "rodando",
+            "total_requisicoes": dados_resposta["contador_requisicoes"],
+            "conexoes_ativas": self.conexoes_ativas.valor(),
+            "tipo_servidor": "concorrente"
+        }
+        if self.usar_pool:
+            dados["pool"] = self.estatisticas_pool()
+            dados["pool"].update(self.ociosas.estatisticas())
+        if self.roda is not None:
+            dados["roda_temporizacao"] = self.roda.estatisticas()
+        return dados
+    
+    def gerar_resposta_erro(self, codigo_status, texto_status, id_conexao, id_customizado="", keep_alive=None,
+                            cabecalhos_extras=None):
         #Gera resposta de erro HTTP
         dados_erro = {
             "erro": codigo_status,
@@ -183,29 +416,46 @@ Connection: close\r
             "tipo_servidor": "concorrente",
             "id_conexao": id_conexao,
             "id_thread": threading.current_thread().ident,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": relogio.agora()
         }
         
-        resposta_json = json.dumps(dados_erro, indent=2)
-        
-        resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
-Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
-Server: ServidorConcorrente/1.0\r
-X-Connection-ID: {id_conexao}\r
-X-Custom-ID: {id_customizado}\r
-Connection: close\r
-\r
-{resposta_json}"""
-        
-        return resposta
+        extras = {"X-Connection-ID": id_conexao}
+        if cabecalhos_extras:
+            extras.update(cabecalhos_extras)
+        return self.construtor.montar(codigo_status, texto_status, dados_erro, id_customizado, keep_alive, extras)
     
     def parar(self):
         #Para o servidor
+        if self.roda is not None:
+            self.roda.parar()
+        if self.ociosas is not None:
+            self.ociosas.parar()
         if self.socket_servidor:
             self.socket_servidor.close()
             print("Servidor concorrente parado")
+        registro.fechar()
 
 if __name__ == "__main__":
-    servidor = ServidorWebConcorrente()
+    parser = argparse.ArgumentParser(description='Servidor Web Concorrente')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=PORTA_SERVIDOR,
+                       help='Porta de escuta')
+    parser.add_argument('--pool', action='store_true',
+                       help='Usar pool fixo de threads com fila limitada')
+    parser.add_argument('--threads', type=int, default=TAMANHO_POOL_THREADS,
+                       help='Número de threads do pool')
+    parser.add_argument('--fila', type=int, default=TAMANHO_FILA_CONEXOES,
+                       help='Tamanho máximo da fila de conexões do pool')
+    parser.add_argument('--roda-temporizacao', action='store_true',
+                       help='Atrasos simulados viram temporizadores em vez de sleep (a thread é liberada)')
+    parser.add_argument('--log-nivel', choices=['DEBUG', 'INFO', 'AVISO', 'ERRO'], default=None,
+                       help='Nível mínimo dos registros por requisição')
+    parser.add_argument('--log-amostragem', type=float, default=None,
+                       help='Fração dos registros DEBUG/INFO mantidos (0 a 1)')
+    args = parser.parse_args()
+    registro.configurar(nivel=args.log_nivel, amostragem=args.log_amostragem)
+    
+    servidor = ServidorWebConcorrente(args.host, args.porta, usar_pool=args.pool, tamanho_pool=args.threads, tamanho_fila=args.fila,
+                                      usar_roda=args.roda_temporizacao)
     servidor.iniciar()
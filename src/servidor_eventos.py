@@ -0,0 +1,331 @@
+#Servidor Web orientado a eventos (selectors/epoll)
+#Implementa um servidor de uma única thread com sockets não bloqueantes e sem threads auxiliares
+
+import socket
+import argparse
+import selectors
+import heapq
+import itertools
+import time
+from configuracao import PORTA_SERVIDOR, TEMPO_KEEP_ALIVE, TAMANHO_LEITURA, TAMANHO_SAIDA_PIPELINE
+from protocolo_http import ParserHTTP, ErroRequisicaoHTTP, negociar_keep_alive
+from roteador import ErroRota
+from metricas import ROTA_DESCONHECIDA
+from registro import registro
+from servidor_sequencial import ServidorWebSequencial
+
+class ConexaoEventos:
+    #Estado de uma conexão: parser (buffer de leitura), buffer de escrita e controle do keep-alive
+    def __init__(self, socket_cliente, endereco_cliente):
+        self.socket = socket_cliente
+        self.endereco = endereco_cliente
+        self.parser = ParserHTTP()
+        self.buffer_escrita = bytearray()
+        self.requisicoes_atendidas = 0
+        self.tempo_limite = TEMPO_KEEP_ALIVE
+        self.ultima_atividade = time.monotonic()
+        self.aguardando_resposta = False
+        self.fechar_apos_envio = False
+        self.fechada = False
+        self.eventos = 0  #Eventos registrados no seletor (0: fora do seletor)
+
+class ServidorWebEventos(ServidorWebSequencial):
+    TIPO_SERVIDOR = "eventos"
+    NOME_SERVIDOR = "ServidorEventos/1.0"
+
+    def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
+        super().__init__(host, porta)
+        self.seletor = None
+        self.conexoes_ativas = 0
+        self.timers = []
+        self.sequencia_timers = itertools.count()
+
+    def iniciar(self):
+        #Inicia o servidor orientado a eventos
+        self.seletor = selectors.DefaultSelector()
+        self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            self.socket_servidor.bind((self.host, self.porta))
+            self.socket_servidor.listen(socket.SOMAXCONN)
+            self.socket_servidor.setblocking(False)
+            self.seletor.register(self.socket_servidor, selectors.EVENT_READ, None)
+            print(f"Servidor de Eventos iniciado em {self.host}:{self.porta} ({type(self.seletor).__name__})")
+
+            while True:
+                for chave, eventos in self.seletor.select(self.tempo_ate_proximo_timer()):
+                    if chave.data is None:
+                        self.aceitar_conexoes()
+                        continue
+
+                    conexao = chave.data
+                    if eventos & selectors.EVENT_READ:
+                        self.ler(conexao)
+                    if eventos & selectors.EVENT_WRITE and not conexao.fechada:
+                        self.escrever(conexao)
+
+                self.disparar_timers()
+
+        except KeyboardInterrupt:
+            print("\nServidor interrompido pelo usuário")
+        except Exception as e:
+            print(f"Erro no servidor: {e}")
+        finally:
+            self.parar()
+
+    def agendar(self, atraso, callback, *argumentos):
+        #Agenda um callback no heap de timers (sem dormir)
+        instante = time.monotonic() + atraso
+        heapq.heappush(self.timers, (instante, next(self.sequencia_timers), callback, argumentos))
+
+    def tempo_ate_proximo_timer(self):
+        #Timeout do select: até o próximo timer ou indefinido se não houver nenhum
+        if not self.timers:
+            return None
+        return max(0, self.timers[0][0] - time.monotonic())
+
+    def disparar_timers(self):
+        #Executa todos os timers vencidos; o erro de um timer só derruba a conexão dele
+        agora = time.monotonic()
+        while self.timers and self.timers[0][0] <= agora:
+            _, _, callback, argumentos = heapq.heappop(self.timers)
+            try:
+                callback(*argumentos)
+            except Exception as e:
+                registro.erro("Erro no timer", erro=e)
+                if argumentos and isinstance(argumentos[0], ConexaoEventos):
+                    self.abortar(argumentos[0])
+
+    def abortar(self, conexao):
+        #Responde 500 e fecha a conexão após o envio
+        if conexao.fechada:
+            return
+        conexao.aguardando_resposta = False
+        self.enviar(conexao, self.gerar_resposta_erro(500, "Erro Interno do Servidor"), None)
+        self.escrever(conexao)
+
+    def aceitar_conexoes(self):
+        #Aceita todas as conexões pendentes na fila do socket de escuta
+        while True:
+            try:
+                socket_cliente, endereco_cliente = self.socket_servidor.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+
+            socket_cliente.setblocking(False)
+            conexao = ConexaoEventos(socket_cliente, endereco_cliente)
+            self.atualizar_eventos(conexao)
+            self.conexoes_ativas += 1
+            self.metricas.conexao_aceita()
+            self.agendar(conexao.tempo_limite, self.verificar_ociosidade, conexao)
+            registro.info("Conexão aceita", endereco=endereco_cliente)
+
+    def ler(self, conexao):
+        #Lê os dados disponíveis e processa as requisições completas
+        try:
+            dados = conexao.socket.recv(TAMANHO_LEITURA)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            registro.aviso("Erro na conexão", endereco=conexao.endereco, erro=e)
+            self.fechar(conexao)
+            return
+
+        if not dados:
+            self.fechar(conexao)
+            return
+
+        conexao.parser.alimentar(dados)
+        conexao.ultima_atividade = time.monotonic()
+        self.processar_buffer(conexao)
+
+    def processar_buffer(self, conexao):
+        #Retira todas as requisições completas do buffer (pipelining) e acumula as respostas em ordem no buffer
+        #de escrita, que sai em um único send; para numa requisição com atraso ou se o buffer de escrita encher
+        while not (conexao.aguardando_resposta or conexao.fechar_apos_envio or conexao.fechada):
+            if len(conexao.buffer_escrita) >= TAMANHO_SAIDA_PIPELINE:
+                break
+            try:
+                requisicao = conexao.parser.proxima_requisicao()
+            except ErroRequisicaoHTTP as e:
+                resposta_erro = self.gerar_resposta_erro(e.codigo_status, e.texto_status)
+                self.enviar(conexao, resposta_erro, None)
+                break
+            if requisicao is None:
+                break
+            self.atender_requisicao(conexao, requisicao)
+
+        if conexao.fechada:
+            return
+        if conexao.buffer_escrita:
+            self.escrever(conexao)
+        else:
+            self.atualizar_eventos(conexao)
+
+    def atualizar_eventos(self, conexao):
+        #Leitura só quando as requisições podem ser processadas: estacionada em um timer ou com o buffer de escrita
+        #cheio, a conexão sai do EVENT_READ e o que o cliente mandar espera no kernel em vez de crescer o parser
+        eventos = 0
+        if not (conexao.aguardando_resposta or len(conexao.buffer_escrita) >= TAMANHO_SAIDA_PIPELINE):
+            eventos |= selectors.EVENT_READ
+        if conexao.buffer_escrita:
+            eventos |= selectors.EVENT_WRITE
+
+        if eventos == conexao.eventos:
+            return
+        if conexao.eventos == 0:
+            self.seletor.register(conexao.socket, eventos, conexao)
+        elif eventos == 0:
+            self.seletor.unregister(conexao.socket)
+        else:
+            self.seletor.modify(conexao.socket, eventos, conexao)
+        conexao.eventos = eventos
+
+    def atender_requisicao(self, conexao, requisicao):
+        #Processa uma requisição; rotas com atraso estacionam a conexão em um timer
+        conexao.requisicoes_atendidas += 1
+
+        try:
+            tempo_inicio = time.time()
+            metodo, caminho = requisicao.metodo, requisicao.caminho
+
+            #Verifica o cabeçalho customizado
+            id_customizado = requisicao.cabecalhos.get('x-custom-id', '')
+            keep_alive = negociar_keep_alive(requisicao.versao, requisicao.cabecalhos, conexao.requisicoes_atendidas)
+
+            self.contador_requisicoes += 1
+            requisicao_atual = self.contador_requisicoes
+
+            try:
+                rota, parametros = self.roteador.resolver(metodo, caminho)
+            except ErroRota as e:
+                resposta_erro = self.gerar_resposta_erro(e.codigo_status, e.texto_status, id_customizado, keep_alive, e.cabecalhos())
+                self.enviar(conexao, resposta_erro, keep_alive)
+                self.metricas.registrar(ROTA_DESCONHECIDA, e.codigo_status, time.time() - tempo_inicio,
+                                        requisicao.tamanho, len(resposta_erro))
+                return
+
+            #O atraso simulado vira um timer: a conexão fica estacionada até ele disparar
+            argumentos = (conexao, metodo, caminho, id_customizado, tempo_inicio, rota, parametros, requisicao_atual,
+                          keep_alive, requisicao.tamanho)
+            if rota.atraso:
+                conexao.aguardando_resposta = True
+                self.agendar(rota.atraso, self.concluir_estacionada, *argumentos)
+            else:
+                self.concluir_requisicao(*argumentos)
+
+        except Exception as e:
+            registro.erro("Erro ao processar requisição", erro=e)
+            resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor")
+            self.enviar(conexao, resposta_erro, None)
+
+    def concluir_requisicao(self, conexao, metodo, caminho, id_customizado, tempo_inicio, rota, parametros,
+                            requisicao_atual, keep_alive, bytes_recebidos):
+        #Monta a resposta (reaproveitando o servidor sequencial) e a coloca no buffer de escrita
+        if conexao.fechada:
+            return
+
+        resposta = self.montar_resposta(metodo, caminho, id_customizado, tempo_inicio, rota, parametros,
+                                        requisicao_atual, keep_alive)
+        self.enviar(conexao, resposta, keep_alive)
+
+        tempo_processamento = time.time() - tempo_inicio
+        self.metricas.registrar(rota.nome, 200, tempo_processamento, bytes_recebidos, len(resposta))
+        registro.info("Requisição processada", requisicao=requisicao_atual, tempo=tempo_processamento)
+
+    def concluir_estacionada(self, conexao, *argumentos):
+        #Timer de uma rota com atraso: conclui a resposta e volta a processar o que chegou nesse meio tempo
+        self.concluir_requisicao(conexao, *argumentos)
+        conexao.aguardando_resposta = False
+        self.processar_buffer(conexao)
+
+    def enviar(self, conexao, resposta, keep_alive):
+        #Enfileira a resposta no buffer de escrita (enviado ao fim de processar_buffer)
+        conexao.buffer_escrita += resposta
+        conexao.fechar_apos_envio = keep_alive is None
+        if keep_alive is not None:
+            conexao.tempo_limite = keep_alive[0]
+
+    def escrever(self, conexao):
+        #Envia o que couber do buffer de escrita; fica em EVENT_WRITE se sobrar
+        try:
+            enviados = conexao.socket.send(conexao.buffer_escrita)
+            del conexao.buffer_escrita[:enviados]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            registro.aviso("Erro na conexão", endereco=conexao.endereco, erro=e)
+            self.fechar(conexao)
+            return
+
+        if conexao.buffer_escrita:
+            self.atualizar_eventos(conexao)
+            return
+
+        #Respostas enviadas por completo
+        if conexao.fechar_apos_envio:
+            self.fechar(conexao)
+            return
+
+        self.atualizar_eventos(conexao)
+        conexao.ultima_atividade = time.monotonic()
+        self.processar_buffer(conexao)
+
+    def verificar_ociosidade(self, conexao):
+        #Fecha conexões keep-alive ociosas por mais tempo que o limite
+        if conexao.fechada:
+            return
+
+        #Conexão com requisição em andamento ou resposta por enviar não está ociosa
+        if conexao.aguardando_resposta or conexao.buffer_escrita:
+            self.agendar(conexao.tempo_limite, self.verificar_ociosidade, conexao)
+            return
+
+        tempo_ocioso = time.monotonic() - conexao.ultima_atividade
+        if tempo_ocioso >= conexao.tempo_limite:
+            self.fechar(conexao)
+        else:
+            self.agendar(conexao.tempo_limite - tempo_ocioso, self.verificar_ociosidade, conexao)
+
+    def fechar(self, conexao):
+        #Remove a conexão do seletor e fecha o socket
+        if conexao.fechada:
+            return
+
+        conexao.fechada = True
+        self.conexoes_ativas -= 1
+        self.metricas.conexao_encerrada()
+        if conexao.eventos:
+            try:
+                self.seletor.unregister(conexao.socket)
+            except (KeyError, ValueError):
+                pass
+        conexao.socket.close()
+
+    def dados_status(self, dados_resposta=None):
+        #Dados retornados pelo endpoint /status
+        dados = super().dados_status(dados_resposta)
+        dados["conexoes_ativas"] = self.conexoes_ativas
+        dados["timers_pendentes"] = len(self.timers)
+        return dados
+
+    def parar(self):
+        #Para o servidor
+        if self.seletor:
+            self.seletor.close()
+        if self.socket_servidor:
+            self.socket_servidor.close()
+            print("Servidor de eventos parado")
+        registro.fechar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor Web orientado a eventos (selectors)')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=PORTA_SERVIDOR,
+                       help='Porta de escuta')
+    args = parser.parse_args()
+    
+    servidor = ServidorWebEventos(args.host, args.porta)
+    servidor.iniciar()
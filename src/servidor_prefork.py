@@ -0,0 +1,239 @@
+#Servidor Web Pre-fork (multiprocesso)
+#Cria N processos worker que escutam a mesma porta com SO_REUSEPORT, cada um executando o servidor concorrente
+
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+import itertools
+import multiprocessing
+from configuracao import (PORTA_SERVIDOR, TAMANHO_POOL_THREADS, TAMANHO_FILA_CONEXOES, TEMPO_MINIMO_WORKER,
+                          MAX_FALHAS_WORKER)
+from servidor_concorrente import ServidorWebConcorrente
+from metricas import RegistroMetricas
+from registro import registro
+
+class ServidorWorkerPrefork(ServidorWebConcorrente):
+    #Servidor concorrente de um worker que publica seus contadores na memória compartilhada
+    def __init__(self, id_worker, contadores_compartilhados, **opcoes):
+        super().__init__(reuse_port=True, **opcoes)
+        self.id_worker = id_worker
+        self.contadores = contadores_compartilhados
+
+        #Métricas de /metrics são do processo que atende a requisição
+        self.metricas = RegistroMetricas(f"prefork-{id_worker}")
+
+        #Um worker reiniciado continua a contagem do worker anterior do mesmo slot
+        self.sequencia_requisicoes = itertools.count(self.contadores['requisicoes'][id_worker] + 1)
+
+        #Conexões ativas publicadas com +1/-1 no slot do worker; as do worker anterior morreram com ele
+        self.lock_conexoes = threading.Lock()
+        self.contadores['conexoes_ativas'][id_worker] = 0
+
+    def registrar_requisicao(self):
+        #Número da requisição atual, publicado no slot do worker na memória compartilhada
+        #(escrita sem lock: o slot pode ficar uma requisição atrás por um instante)
+        requisicao_atual = super().registrar_requisicao()
+        self.contadores['requisicoes'][self.id_worker] = requisicao_atual
+        return requisicao_atual
+
+    def registrar_conexao(self):
+        id_conexao = super().registrar_conexao()
+        with self.lock_conexoes:
+            self.contadores['conexoes_ativas'][self.id_worker] += 1
+        return id_conexao
+
+    def finalizar_conexao(self, estado):
+        super().finalizar_conexao(estado)
+        with self.lock_conexoes:
+            self.contadores['conexoes_ativas'][self.id_worker] -= 1
+
+    def dados_status(self, dados_resposta):
+        #Dados do /status agregados entre todos os workers
+        dados = super().dados_status(dados_resposta)
+        workers = []
+        for id_worker in range(len(self.contadores['pids'])):
+            workers.append({
+                "id_worker": id_worker,
+                "pid": self.contadores['pids'][id_worker],
+                "total_requisicoes": self.contadores['requisicoes'][id_worker],
+                "conexoes_ativas": self.contadores['conexoes_ativas'][id_worker],
+                "reinicios": self.contadores['reinicios'][id_worker]
+            })
+
+        dados["tipo_servidor"] = "prefork"
+        dados["id_worker"] = self.id_worker
+        dados["total_requisicoes"] = sum(worker["total_requisicoes"] for worker in workers)
+        dados["conexoes_ativas"] = sum(worker["conexoes_ativas"] for worker in workers)
+        dados["workers"] = workers
+        return dados
+
+class ServidorPrefork:
+    #Processo mestre: cria os workers e reinicia os que morrerem
+    def __init__(self, num_workers=None, host='0.0.0.0', porta=PORTA_SERVIDOR, **opcoes_servidor):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.host = host
+        self.porta = porta
+        self.opcoes_servidor = opcoes_servidor
+        self.pids_workers = {}
+        self.inicio_workers = {}  #id_worker -> instante do último fork
+        self.falhas_seguidas = [0] * self.num_workers
+        self.executando = False
+        self.falhou = False  #Todos os slots desistiram: o mestre sai com erro
+
+        #Contadores por worker em memória compartilhada (cada worker escreve só no seu slot)
+        self.contadores = {
+            'pids': multiprocessing.Array('q', self.num_workers, lock=False),
+            'requisicoes': multiprocessing.Array('q', self.num_workers, lock=False),
+            'conexoes_ativas': multiprocessing.Array('q', self.num_workers, lock=False),
+            'reinicios': multiprocessing.Array('q', self.num_workers, lock=False)
+        }
+
+    def iniciar(self):
+        #Cria os workers e supervisiona até ser interrompido
+        print(f"Servidor Pre-fork iniciado em {self.host}:{self.porta} com {self.num_workers} workers")
+        self.executando = True
+        signal.signal(signal.SIGTERM, self.tratar_sinal)
+
+        try:
+            for id_worker in range(self.num_workers):
+                self.criar_worker(id_worker)
+            self.supervisionar()
+        except KeyboardInterrupt:
+            print("\nServidor interrompido pelo usuário")
+        finally:
+            self.parar()
+
+    def criar_worker(self, id_worker):
+        #Faz o fork de um worker que ocupa o slot id_worker
+        pid = os.fork()
+        if pid == 0:
+            #Processo filho: o mestre é quem trata SIGTERM/SIGINT
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            codigo_saida = 0
+            try:
+                servidor = ServidorWorkerPrefork(
+                    id_worker, self.contadores, host=self.host, porta=self.porta, **self.opcoes_servidor
+                )
+                servidor.iniciar()
+                if servidor.erro is not None:
+                    codigo_saida = 1
+            except Exception as e:
+                print(f"Erro no worker {id_worker}: {e}")
+                codigo_saida = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(codigo_saida)
+
+        self.contadores['pids'][id_worker] = pid
+        self.pids_workers[pid] = id_worker
+        self.inicio_workers[id_worker] = time.monotonic()
+        print(f"Worker {id_worker} iniciado (pid {pid})")
+
+    def supervisionar(self):
+        #Aguarda workers terminarem e os recria no mesmo slot
+        #Um worker que morre logo ao iniciar é recriado com espera crescente; após MAX_FALHAS_WORKER falhas seguidas
+        #o slot fica vazio (sem laço infinito de fork se a porta não abre)
+        #As recriações são agendadas em vez de dormir, para o tempo de vida dos outros workers ser medido na hora
+        recriar = {}  #id_worker -> instante da recriação
+        while self.executando:
+            agora = time.monotonic()
+            for id_worker, instante in list(recriar.items()):
+                if instante <= agora:
+                    del recriar[id_worker]
+                    self.criar_worker(id_worker)
+
+            if not self.pids_workers and not recriar:
+                print("[ERRO] Nenhum worker em execução, encerrando o mestre")
+                self.falhou = True
+                break
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG if recriar else 0)
+            except ChildProcessError:
+                if not recriar:
+                    break
+                time.sleep(max(0, min(recriar.values()) - time.monotonic()))
+                continue
+            except InterruptedError:
+                continue
+            if pid == 0:
+                time.sleep(0.05)
+                continue
+
+            id_worker = self.pids_workers.pop(pid, None)
+            if id_worker is None or not self.executando:
+                continue
+
+            codigo_saida = os.waitstatus_to_exitcode(status)
+            if time.monotonic() - self.inicio_workers[id_worker] < TEMPO_MINIMO_WORKER:
+                self.falhas_seguidas[id_worker] += 1
+            else:
+                self.falhas_seguidas[id_worker] = 0
+
+            falhas = self.falhas_seguidas[id_worker]
+            if falhas >= MAX_FALHAS_WORKER:
+                print(f"Worker {id_worker} (pid {pid}) falhou ao iniciar {falhas} vezes seguidas "
+                      f"(código {codigo_saida}), slot desativado")
+                self.contadores['pids'][id_worker] = 0
+                continue
+
+            espera = 0.1 * (2 ** falhas) if falhas else 0.1
+            print(f"Worker {id_worker} (pid {pid}) terminou com código {codigo_saida}, reiniciando em {espera:.1f}s")
+            self.contadores['reinicios'][id_worker] += 1
+            recriar[id_worker] = time.monotonic() + espera
+
+    def tratar_sinal(self, numero_sinal, quadro):
+        #SIGTERM (docker stop) encerra o mestre e os workers
+        self.executando = False
+        raise KeyboardInterrupt
+
+    def parar(self):
+        #Encerra todos os workers
+        self.executando = False
+        for pid in list(self.pids_workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.pids_workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.pids_workers = {}
+        print("Servidor pre-fork parado")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servidor Web Pre-fork (SO_REUSEPORT)')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=PORTA_SERVIDOR,
+                       help='Porta de escuta')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Número de processos worker (padrão: número de núcleos)')
+    parser.add_argument('--pool', action='store_true',
+                       help='Cada worker usa pool fixo de threads com fila limitada')
+    parser.add_argument('--threads', type=int, default=TAMANHO_POOL_THREADS,
+                       help='Número de threads do pool de cada worker')
+    parser.add_argument('--fila', type=int, default=TAMANHO_FILA_CONEXOES,
+                       help='Tamanho máximo da fila de conexões de cada worker')
+    parser.add_argument('--roda-temporizacao', action='store_true',
+                       help='Atrasos simulados viram temporizadores em vez de sleep em cada worker')
+    parser.add_argument('--log-nivel', choices=['DEBUG', 'INFO', 'AVISO', 'ERRO'], default=None,
+                       help='Nível mínimo dos registros por requisição')
+    parser.add_argument('--log-amostragem', type=float, default=None,
+                       help='Fração dos registros DEBUG/INFO mantidos (0 a 1)')
+    args = parser.parse_args()
+    registro.configurar(nivel=args.log_nivel, amostragem=args.log_amostragem)
+
+    servidor = ServidorPrefork(
+        args.workers, args.host, args.porta, usar_pool=args.pool, tamanho_pool=args.threads, tamanho_fila=args.fila,
+        usar_roda=args.roda_temporizacao
+    )
+    servidor.iniciar()
+    if servidor.falhou:
+        sys.exit(1)
@@ -2,18 +2,27 @@
 #Implementa um servidor que atende uma requisição por vez
 
 import socket
-import json
 import time
-from datetime import datetime
-from configuracao import PORTA_SERVIDOR, ID_CUSTOMIZADO
-import os
+import argparse
+from configuracao import PORTA_SERVIDOR, ID_CUSTOMIZADO, TEMPO_KEEP_ALIVE
+from protocolo_http import ParserHTTP, ConexaoPipeline, ErroRequisicaoHTTP, receber_requisicao, negociar_keep_alive
+from respostas import ConstrutorRespostas, relogio
+from roteador import ROTEADOR_PADRAO, ErroRota
+from metricas import RegistroMetricas, ROTA_DESCONHECIDA
+from registro import registro
 
 class ServidorWebSequencial:
+    TIPO_SERVIDOR = "sequencial"
+    NOME_SERVIDOR = "ServidorSequencial/1.0"
+
     def __init__(self, host = '0.0.0.0', porta = PORTA_SERVIDOR):
         self.host = host
         self.porta = porta
         self.socket_servidor = None
         self.contador_requisicoes = 0
+        self.construtor = ConstrutorRespostas(self.NOME_SERVIDOR, self.TIPO_SERVIDOR)
+        self.roteador = ROTEADOR_PADRAO
+        self.metricas = RegistroMetricas(self.TIPO_SERVIDOR)
         
     def iniciar(self):
         #Inicia o servidor sequencial
@@ -27,7 +36,8 @@ class ServidorWebSequencial:
             
             while True:
                 socket_cliente, endereco_cliente = self.socket_servidor.accept()
-                print(f"Conexão aceita de {endereco_cliente}")
+                self.metricas.conexao_aceita()
+                registro.info("Conexão aceita", endereco=endereco_cliente)
                 self.processar_requisicao(socket_cliente, endereco_cliente)
                 
         except KeyboardInterrupt:
@@ -38,134 +48,148 @@ class ServidorWebSequencial:
             self.parar()
 
     def processar_requisicao(self, socket_cliente, endereco_cliente):
-        #Processa uma requisição HTTP
+        #Atende as requisições HTTP de uma conexão (persistente ou não)
+        parser = ParserHTTP()
+        requisicoes_atendidas = 0
+        tempo_limite = TEMPO_KEEP_ALIVE
+        #Respostas de requisições em pipeline saem juntas em um único envio
+        socket_cliente = ConexaoPipeline(socket_cliente, parser)
+        
+        try:
+            while True:
+                #Aguarda a próxima requisição até o tempo ocioso expirar
+                socket_cliente.settimeout(tempo_limite)
+                try:
+                    requisicao = receber_requisicao(socket_cliente, parser)
+                except socket.timeout:
+                    break
+                except ErroRequisicaoHTTP as e:
+                    resposta_erro = self.gerar_resposta_erro(e.codigo_status, e.texto_status)
+                    socket_cliente.sendall(resposta_erro)
+                    break
+                if requisicao is None:
+                    break
+                
+                requisicoes_atendidas += 1
+                keep_alive = self.atender_requisicao(socket_cliente, requisicao, requisicoes_atendidas)
+                if keep_alive is None:
+                    break
+                tempo_limite = keep_alive[0]
+        except OSError as e:
+            registro.aviso("Erro na conexão", endereco=endereco_cliente, erro=e)
+        finally:
+            socket_cliente.close()
+            self.metricas.conexao_encerrada()
+    
+    def atender_requisicao(self, socket_cliente, requisicao, requisicoes_atendidas):
+        #Processa uma requisição HTTP e retorna o keep-alive negociado (None fecha a conexão)
         try:
             tempo_inicio = time.time()
-            #Recebe a requisição
-            dados_requisicao = socket_cliente.recv(4096).decode('utf-8')
-            if not dados_requisicao:
-                return
-            #Parse da requisição HTTP
-            linhas_requisicao = dados_requisicao.split('\n')
-            linha_requisicao = linhas_requisicao[0].strip()
-            metodo, caminho, versao = linha_requisicao.split(' ')
-            
-            #Extrai headers
-            cabecalhos = {}
-            for linha in linhas_requisicao[1:]:
-                if ':' in linha:
-                    chave, valor = linha.split(':', 1)
-                    cabecalhos[chave.strip()] = valor.strip()
             
             #Verifica o cabeçalho customizado
-            id_customizado = cabecalhos.get('X-Custom-ID', '')
+            id_customizado = requisicao.cabecalhos.get('x-custom-id', '')
+            keep_alive = negociar_keep_alive(requisicao.versao, requisicao.cabecalhos, requisicoes_atendidas)
             
             self.contador_requisicoes += 1
             
             #Gera resposta baseada no método e path
-            resposta = self.gerar_resposta(metodo, caminho, id_customizado, tempo_inicio)
+            try:
+                rota, parametros = self.roteador.resolver(requisicao.metodo, requisicao.caminho)
+            except ErroRota as e:
+                nome_rota, codigo_status = ROTA_DESCONHECIDA, e.codigo_status
+                resposta = self.gerar_resposta_erro(e.codigo_status, e.texto_status, id_customizado, keep_alive, e.cabecalhos())
+            else:
+                nome_rota, codigo_status = rota.nome, 200
+                if rota.atraso:
+                    #Respostas anteriores do pipeline não esperam pelo atraso desta requisição
+                    socket_cliente.descarregar()
+                resposta = self.gerar_resposta(requisicao.metodo, requisicao.caminho, id_customizado, tempo_inicio,
+                                               rota, parametros, keep_alive)
             
             #Envia resposta
-            socket_cliente.send(resposta.encode('utf-8'))
+            socket_cliente.sendall(resposta)
             
             tempo_processamento = time.time() - tempo_inicio
-            print(f"Requisição {self.contador_requisicoes} processada em {tempo_processamento:.4f}s")
+            self.metricas.registrar(nome_rota, codigo_status, tempo_processamento, requisicao.tamanho, len(resposta))
+            registro.info("Requisição processada", requisicao=self.contador_requisicoes, tempo=tempo_processamento)
+            
+            return keep_alive
             
         except Exception as e:
-            print(f"Erro ao processar requisição: {e}")
+            registro.erro("Erro ao processar requisição", erro=e)
             resposta_erro = self.gerar_resposta_erro(500, "Erro Interno do Servidor")
-            socket_cliente.send(resposta_erro.encode('utf-8'))
-        finally:
-            socket_cliente.close()
+            socket_cliente.sendall(resposta_erro)
+            return None
     
-    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio):
-        #Gera resposta HTTP baseada no método e path
-
-        #Simula diferentes tipos de processamento
-        if caminho == '/lento':
-            time.sleep(2)  #Simula processamento lento
-        elif caminho == '/medio':
-            time.sleep(0.5)  #Processamento médio
-        #Path '/' ou '/rapido' - processamento rápido (sem delay)
+    def gerar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, rota, parametros, keep_alive=None):
+        #Gera resposta HTTP da rota resolvida
+        
+        #Simula o processamento com o atraso definido na rota ('/' e '/rapido' não têm atraso)
+        if rota.atraso:
+            time.sleep(rota.atraso)
+        
+        return self.montar_resposta(metodo, caminho, id_customizado, tempo_inicio, rota, parametros, keep_alive=keep_alive)
+    
+    def montar_resposta(self, metodo, caminho, id_customizado, tempo_inicio, rota, parametros,
+                        num_requisicao=None, keep_alive=None):
+        #Monta a resposta HTTP da rota já resolvida, sem simular o processamento
+        if rota.bruta:
+            corpo, tipo_conteudo = rota.handler(self, None, parametros)
+            return self.construtor.montar_bruta(200, "OK", corpo, tipo_conteudo, id_customizado, keep_alive)
+        
+        if num_requisicao is None:
+            num_requisicao = self.contador_requisicoes
         
         dados_resposta = {
-            "tipo_servidor": "sequencial",
+            "tipo_servidor": self.TIPO_SERVIDOR,
             "metodo": metodo,
             "caminho": caminho,
-            "timestamp": datetime.now().isoformat(),
-            "contador_requisicoes": self.contador_requisicoes,
+            "timestamp": relogio.agora(),
+            "contador_requisicoes": num_requisicao,
             "id_customizado_recebido": id_customizado,
             "id_customizado_esperado": ID_CUSTOMIZADO,
             "id_customizado_valido": id_customizado == ID_CUSTOMIZADO,
             "tempo_processamento": time.time() - tempo_inicio,
-            "mensagem": f"Resposta do servidor sequencial para {metodo} {caminho}"
+            "mensagem": f"Resposta do servidor {self.TIPO_SERVIDOR} para {metodo} {caminho}"
         }
+        dados_resposta["conteudo"] = rota.handler(self, dados_resposta, parametros)
         
-        if metodo == 'GET':
-            if caminho == '/':
-                dados_resposta["conteudo"] = "Página inicial do servidor sequencial"
-            elif caminho == '/status':
-                dados_resposta["conteudo"] = {
-                    "status_servidor": "rodando",
-                    "total_requisicoes": self.contador_requisicoes,
-                    "tipo_servidor": "sequencial"
-                }
-            elif caminho in ['/rapido', '/medio', '/lento']:
-                dados_resposta["conteudo"] = f"Endpoint {caminho} processado"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_customizado)
-                
-        elif metodo == 'POST':
-            if caminho == '/dados':
-                dados_resposta["conteudo"] = "Dados recebidos via POST"
-            else:
-                return self.gerar_resposta_erro(404, "Não Encontrado", id_customizado)
-                
-        else:
-            return self.gerar_resposta_erro(405, "Método Não Permitido", id_customizado)
-        
-        resposta_json = json.dumps(dados_resposta, indent=2)
-        
-        resposta = f"""HTTP/1.1 200 OK\r
-Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
-Server: ServidorSequencial/1.0\r
-X-Server-Type: sequencial\r
-X-Custom-ID: {id_customizado}\r
-Connection: close\r
-\r
-{resposta_json}"""
-        
-        return resposta
+        return self.construtor.montar(200, "OK", dados_resposta, id_customizado, keep_alive,
+                                      cachear_valores=rota.cacheavel)
+    
+    def dados_status(self, dados_resposta=None):
+        #Dados retornados pelo endpoint /status
+        return {
+            "status_servidor": "rodando",
+            "total_requisicoes": self.contador_requisicoes,
+            "tipo_servidor": self.TIPO_SERVIDOR
+        }
     
-    def gerar_resposta_erro(self, codigo_status, texto_status, id_customizado=""):
+    def gerar_resposta_erro(self, codigo_status, texto_status, id_customizado="", keep_alive=None, cabecalhos_extras=None):
         #Gera resposta de erro HTTP
         dados_erro = {
             "erro": codigo_status,
             "mensagem": texto_status,
-            "tipo_servidor": "sequencial",
-            "timestamp": datetime.now().isoformat()
+            "tipo_servidor": self.TIPO_SERVIDOR,
+            "timestamp": relogio.agora()
         }
         
-        resposta_json = json.dumps(dados_erro, indent=2)
-        
-        resposta = f"""HTTP/1.1 {codigo_status} {texto_status}\r
-Content-Type: application/json\r
-Content-Length: {len(resposta_json)}\r
-Server: ServidorSequencial/1.0\r
-X-Custom-ID: {id_customizado}\r
-Connection: close\r
-\r
-{resposta_json}"""
-        
-        return resposta
+        return self.construtor.montar(codigo_status, texto_status, dados_erro, id_customizado, keep_alive, cabecalhos_extras)
     
     def parar(self):
         #Para o servidor
         if self.socket_servidor:
             self.socket_servidor.close()
             print("Servidor sequencial parado")
+        registro.fechar()
 
 if __name__ == "__main__":
-    servidor = ServidorWebSequencial()
+    parser = argparse.ArgumentParser(description='Servidor Web Sequencial')
+    parser.add_argument('--host', default='0.0.0.0',
+                       help='Endereço de escuta')
+    parser.add_argument('--porta', type=int, default=PORTA_SERVIDOR,
+                       help='Porta de escuta')
+    args = parser.parse_args()
+    
+    servidor = ServidorWebSequencial(args.host, args.porta)
     servidor.iniciar()
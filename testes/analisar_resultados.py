@@ -1,417 +1,497 @@
 """
 Script para gerar gráficos e análises dos resultados dos testes
 """
+import hashlib
 import json
+import matplotlib
+matplotlib.use('Agg')  # Sem display no contêiner e nos processos do pool
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+import argparse
 import os
 
+# Nomes usados pelo testador (resultados_testes.json) -> nomes usados nos gráficos
+SERVER_NAMES = {
+    'sequencial': 'sequential',
+    'concorrente': 'concurrent',
+    'assincrono': 'asynchronous',
+    'prefork': 'prefork',
+    'eventos': 'event_loop'
+}
+SCENARIO_NAMES = {'rapido': 'fast', 'medio': 'medium', 'lento': 'slow'}
+KEYS = ['servidor', 'cenario', 'num_clientes']
+REQUEST_COLUMNS = ['timestamp', 'tempo_resposta', 'tempo_conexao', 'tempo_envio', 'tempo_recepcao',
+                   'codigo_status', 'sucesso', 'cliente']
+
+SCENARIOS = ['fast', 'medium', 'slow']
+SCENARIO_LABELS = ['Rápido', 'Médio (0.5s)', 'Lento (2s)']
+COMPARED_SERVERS = ['sequential', 'concurrent']
+SERVER_LABELS = {'sequential': 'Sequencial', 'concurrent': 'Concorrente'}
+
+PLOT_FORMAT = 'png'
+PLOT_DPI = 300
+MANIFEST_FILE = '.plots_manifest.json'  # Hash dos dados de cada gráfico já salvo
+
+def by_clients(df, scenario, column):
+    """Tabela num_clients x servidor de uma métrica em um cenário"""
+    table = df[df['scenario'] == scenario].pivot_table(index='num_clients', columns='server_type',
+                                                         values=column, dropna=False)
+    return table.reindex(columns=COMPARED_SERVERS)
+
+def by_scenario(df, column):
+    """Média de uma métrica por cenário x servidor (sobre todos os números de clientes)"""
+    table = df.groupby(['scenario', 'server_type'])[column].mean().unstack()
+    return table.reindex(index=SCENARIOS, columns=COMPARED_SERVERS)
+
+def bar_pair(ax, values, errors=None, width=0.35):
+    """Barras lado a lado sequencial x concorrente para cada linha de values"""
+    x = np.arange(len(values.index))
+    for offset, server in zip((-width/2, width/2), COMPARED_SERVERS):
+        ax.bar(x + offset, values[server], width, label=SERVER_LABELS[server],
+               yerr=None if errors is None else errors[server], capsize=5, alpha=0.8)
+    ax.set_xticks(x)
+    return x
+
+def plot_response_time_comparison(df):
+    """Gráfico de comparação de tempo de resposta"""
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    fig.suptitle('Comparação de Tempo de Resposta - Servidor Sequencial vs Concorrente', fontsize=16)
+    
+    for ax, scenario, scenario_name in zip(axes, SCENARIOS, SCENARIO_LABELS):
+        means = by_clients(df, scenario, 'response_time_mean')
+        bar_pair(ax, means, by_clients(df, scenario, 'response_time_std'))
+        
+        ax.set_title(f'Cenário {scenario_name}')
+        ax.set_xlabel('Número de Clientes')
+        ax.set_ylabel('Tempo de Resposta (s)')
+        ax.set_xticklabels(means.index)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    
+    return fig
+
+def plot_success_rate_comparison(df):
+    """Gráfico de comparação de taxa de sucesso"""
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    fig.suptitle('Comparação de Taxa de Sucesso - Servidor Sequencial vs Concorrente', fontsize=16)
+    
+    for ax, scenario, scenario_name in zip(axes, SCENARIOS, SCENARIO_LABELS):
+        rates = by_clients(df, scenario, 'success_rate_mean') * 100
+        bar_pair(ax, rates, by_clients(df, scenario, 'success_rate_std') * 100)
+        
+        ax.set_title(f'Cenário {scenario_name}')
+        ax.set_xlabel('Número de Clientes')
+        ax.set_ylabel('Taxa de Sucesso (%)')
+        ax.set_xticklabels(rates.index)
+        ax.set_ylim(0, 105)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    
+    return fig
+
+def plot_scalability_analysis(df):
+    """Análise de escalabilidade"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Análise de Escalabilidade', fontsize=16)
+    
+    df = df[df['server_type'].isin(COMPARED_SERVERS)].sort_values('num_clients')
+    panels = [
+        (axes[0, 0], 'response_time_mean', 'o', 'Tempo de Resposta (s)', 'Escalabilidade: Tempo de Resposta'),
+        (axes[0, 1], 'success_rate_mean', 's', 'Taxa de Sucesso', 'Escalabilidade: Taxa de Sucesso'),
+        (axes[1, 0], 'throughput', '^', 'Throughput (req/s)', 'Escalabilidade: Throughput')
+    ]
+    
+    # Gráficos 1-3: tempo de resposta, taxa de sucesso e throughput vs número de clientes
+    for ax, column, marker, ylabel, title in panels:
+        for scenario in SCENARIOS:
+            for server_type in COMPARED_SERVERS:
+                server_data = df[(df['scenario'] == scenario) & (df['server_type'] == server_type)]
+                ax.plot(server_data['num_clients'], server_data[column],
+                        marker=marker, label=f'{server_type.title()} - {scenario}')
+        
+        ax.set_xlabel('Número de Clientes')
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    
+    # Gráfico 4: Heatmap de performance
+    ax4 = axes[1, 1]
+    pivot_data = df.pivot_table(values='response_time_mean',
+                                index=['server_type', 'scenario'],
+                                columns='num_clients')
+    sns.heatmap(pivot_data, annot=True, fmt='.3f', ax=ax4, cmap='YlOrRd')
+    ax4.set_title('Heatmap: Tempo de Resposta')
+    
+    return fig
+
+def plot_scenario_comparison(df):
+    """Comparação por cenário"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Comparação Detalhada por Cenário', fontsize=16)
+    labels = ['Rápido', 'Médio', 'Lento']
+    
+    # Gráfico 1: Tempo médio por cenário
+    ax1 = axes[0, 0]
+    means = by_scenario(df, 'response_time_mean')
+    bar_pair(ax1, means)
+    ax1.set_xlabel('Cenário')
+    ax1.set_ylabel('Tempo Médio de Resposta (s)')
+    ax1.set_title('Tempo Médio por Cenário')
+    ax1.set_xticklabels(labels)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    # Gráfico 2: Eficiência relativa
+    ax2 = axes[0, 1]
+    concurrent = means['concurrent'].where(means['concurrent'] > 0)
+    efficiency = (means['sequential'] / concurrent).fillna(0)
+    colors = ['green' if e > 1 else 'red' for e in efficiency]
+    x = np.arange(len(SCENARIOS))
+    ax2.bar(x, efficiency, color=colors, alpha=0.7)
+    ax2.axhline(y=1, color='black', linestyle='--', alpha=0.5)
+    ax2.set_xlabel('Cenário')
+    ax2.set_ylabel('Eficiência Relativa (Seq/Conc)')
+    ax2.set_title('Eficiência: Sequencial vs Concorrente')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(labels)
+    ax2.grid(True, alpha=0.3)
+    
+    # Gráfico 3: Variabilidade (desvio padrão)
+    ax3 = axes[1, 0]
+    bar_pair(ax3, by_scenario(df, 'response_time_std'))
+    ax3.set_xlabel('Cenário')
+    ax3.set_ylabel('Desvio Padrão Médio (s)')
+    ax3.set_title('Variabilidade por Cenário')
+    ax3.set_xticklabels(labels)
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+    
+    # Gráfico 4: Taxa de sucesso por cenário
+    ax4 = axes[1, 1]
+    bar_pair(ax4, by_scenario(df, 'success_rate_mean') * 100)
+    ax4.set_xlabel('Cenário')
+    ax4.set_ylabel('Taxa de Sucesso Média (%)')
+    ax4.set_title('Taxa de Sucesso por Cenário')
+    ax4.set_xticklabels(labels)
+    ax4.set_ylim(0, 105)
+    ax4.legend()
+    ax4.grid(True, alpha=0.3)
+    
+    return fig
+
+def plot_statistical_analysis(df):
+    """Análise estatística detalhada"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Análise Estatística Detalhada', fontsize=16)
+    
+    df = df[df['server_type'].isin(COMPARED_SERVERS)]
+    
+    # Boxplot 1: Distribuição de tempos de resposta
+    ax1 = axes[0, 0]
+    sns.boxplot(data=df, x='scenario', y='response_time_mean', hue='server_type', ax=ax1)
+    ax1.set_title('Distribuição dos Tempos de Resposta')
+    ax1.set_xlabel('Cenário')
+    ax1.set_ylabel('Tempo de Resposta (s)')
+    
+    # Boxplot 2: Distribuição de desvios padrão
+    ax2 = axes[0, 1]
+    sns.boxplot(data=df, x='scenario', y='response_time_std', hue='server_type', ax=ax2)
+    ax2.set_title('Distribuição dos Desvios Padrão')
+    ax2.set_xlabel('Cenário')
+    ax2.set_ylabel('Desvio Padrão (s)')
+    
+    # Scatter plot: Correlação entre clientes e tempo
+    ax3 = axes[1, 0]
+    for server_type in COMPARED_SERVERS:
+        server_data = df[df['server_type'] == server_type]
+        ax3.scatter(server_data['num_clients'], server_data['response_time_mean'],
+                    label=server_type.title(), alpha=0.7, s=60)
+    
+    ax3.set_xlabel('Número de Clientes')
+    ax3.set_ylabel('Tempo de Resposta (s)')
+    ax3.set_title('Correlação: Clientes vs Tempo de Resposta')
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+    
+    # Violin plot: Distribuição detalhada
+    ax4 = axes[1, 1]
+    sns.violinplot(data=df, x='server_type', y='success_rate_mean', ax=ax4)
+    ax4.set_title('Distribuição da Taxa de Sucesso')
+    ax4.set_xlabel('Tipo de Servidor')
+    ax4.set_ylabel('Taxa de Sucesso')
+    
+    return fig
+
+# Nome do arquivo (sem extensão) -> função que desenha a figura a partir do DataFrame compartilhado
+PLOTS = {
+    'response_time_comparison': plot_response_time_comparison,
+    'success_rate_comparison': plot_success_rate_comparison,
+    'scalability_analysis': plot_scalability_analysis,
+    'scenario_comparison': plot_scenario_comparison,
+    'statistical_analysis': plot_statistical_analysis
+}
+
+def render_plot(name, df, path, dpi):
+    """Desenha e salva um gráfico; roda nos processos do pool, por isso é uma função de módulo"""
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    fig = PLOTS[name](df)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return name
+
+def data_hash(df):
+    """Hash do conteúdo do DataFrame e deste módulo: muda se os dados ou o código dos gráficos mudarem"""
+    digest = hashlib.sha256()
+    digest.update(','.join(df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
 class ResultsAnalyzer:
-    def __init__(self, results_file='/app/results/test_results.json'):
+    def __init__(self, results_file='/app/resultados/resultados_testes.json', output_dir=None,
+                 plot_format=PLOT_FORMAT, dpi=PLOT_DPI, jobs=None):
         self.results_file = results_file
+        self.output_dir = output_dir or os.path.dirname(results_file)
+        self.plots_dir = os.path.join(self.output_dir, 'plots')
+        self.plot_format = plot_format
+        self.dpi = dpi
+        self.jobs = jobs  # Processos para desenhar os gráficos (None: um por CPU)
         self.results = None
+        self.requests = None  # Uma linha por requisição
+        self.tests = None     # Uma linha por teste (servidor, cenário, clientes)
         self.load_results()
         
     def load_results(self):
-        """Carrega os resultados dos testes"""
+        """Carrega os resultados brutos do testador e calcula os agregados usados nos gráficos"""
         try:
             with open(self.results_file, 'r') as f:
-                self.results = json.load(f)
+                raw = json.load(f)
             print(f"Resultados carregados de {self.results_file}")
         except FileNotFoundError:
             print(f"Arquivo de resultados não encontrado: {self.results_file}")
-            self.results = None
+            return
         except Exception as e:
             print(f"Erro ao carregar resultados: {e}")
-            self.results = None
-    
-    def generate_all_plots(self):
-        """Gera todos os gráficos de análise"""
-        if not self.results:
-            print("Nenhum resultado disponível para análise")
             return
         
-        # Configura o estilo dos gráficos
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-        
-        # Cria diretório para gráficos
-        os.makedirs('/app/results/plots', exist_ok=True)
-        
-        print("Gerando gráficos...")
-        
-        # 1. Comparação de tempo de resposta
-        self.plot_response_time_comparison()
-        
-        # 2. Taxa de sucesso
-        self.plot_success_rate_comparison()
-        
-        # 3. Escalabilidade por número de clientes
-        self.plot_scalability_analysis()
-        
-        # 4. Comparação por cenário
-        self.plot_scenario_comparison()
-        
-        # 5. Análise estatística detalhada
-        self.plot_statistical_analysis()
-        
-        print("Gráficos salvos em /app/results/plots/")
+        self.tests = self.build_tests_frame(raw)
+        self.requests = self.build_requests_frame(raw)
+        self.results = self.aggregate(raw)
+        print(f"{len(self.requests)} requisições em {len(self.tests)} testes")
     
-    def plot_response_time_comparison(self):
-        """Gráfico de comparação de tempo de resposta"""
-        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-        fig.suptitle('Comparação de Tempo de Resposta - Servidor Sequencial vs Concorrente', fontsize=16)
-        
-        scenarios = ['fast', 'medium', 'slow']
-        scenario_names = ['Rápido', 'Médio (0.5s)', 'Lento (2s)']
-        
-        for idx, (scenario, scenario_name) in enumerate(zip(scenarios, scenario_names)):
-            ax = axes[idx]
-            
-            # Dados para cada servidor
-            clients = []
-            seq_times = []
-            seq_errors = []
-            conc_times = []
-            conc_errors = []
-            
-            for num_clients in sorted([int(k) for k in self.results['results']['sequential'][scenario].keys()]):
-                clients.append(num_clients)
-                
-                # Servidor sequencial
-                seq_data = self.results['results']['sequential'][scenario][str(num_clients)]
-                seq_times.append(seq_data['response_time_mean'])
-                seq_errors.append(seq_data['response_time_std'])
-                
-                # Servidor concorrente
-                conc_data = self.results['results']['concurrent'][scenario][str(num_clients)]
-                conc_times.append(conc_data['response_time_mean'])
-                conc_errors.append(conc_data['response_time_std'])
-            
-            # Plota os dados
-            x = np.arange(len(clients))
-            width = 0.35
-            
-            ax.bar(x - width/2, seq_times, width, label='Sequencial', 
-                   yerr=seq_errors, capsize=5, alpha=0.8)
-            ax.bar(x + width/2, conc_times, width, label='Concorrente', 
-                   yerr=conc_errors, capsize=5, alpha=0.8)
-            
-            ax.set_title(f'Cenário {scenario_name}')
-            ax.set_xlabel('Número de Clientes')
-            ax.set_ylabel('Tempo de Resposta (s)')
-            ax.set_xticks(x)
-            ax.set_xticklabels(clients)
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('/app/results/plots/response_time_comparison.png', dpi=300, bbox_inches='tight')
-        plt.close()
+    def build_tests_frame(self, raw):
+        """Uma linha por teste, com a duração e os resumos de latência gravados pelo testador"""
+        records = []
+        for server, scenarios in raw['resultados'].items():
+            for scenario, by_clients in scenarios.items():
+                for num_clients, test in by_clients.items():
+                    stats = test.get('estatisticas', {})
+                    summary = stats.get('resumo', {})
+                    records.append({
+                        'servidor': server,
+                        'cenario': scenario,
+                        'num_clientes': int(num_clients),
+                        'tempo_total': test['tempo_total'],
+                        'total_requisicoes': test.get('total_requisicoes', 0),
+                        'sucessos_resumo': stats.get('sucessos'),
+                        'media_resumo': summary.get('media'),
+                        'p50_resumo': summary.get('p50'),
+                        'p90_resumo': summary.get('p90'),
+                        'p99_resumo': summary.get('p99')
+                    })
+        tests = pd.DataFrame.from_records(records)
+        summary_columns = ['sucessos_resumo', 'media_resumo', 'p50_resumo', 'p90_resumo', 'p99_resumo']
+        tests[summary_columns] = tests[summary_columns].astype(float)
+        return tests
     
-    def plot_success_rate_comparison(self):
-        """Gráfico de comparação de taxa de sucesso"""
-        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
-        fig.suptitle('Comparação de Taxa de Sucesso - Servidor Sequencial vs Concorrente', fontsize=16)
-        
-        scenarios = ['fast', 'medium', 'slow']
-        scenario_names = ['Rápido', 'Médio (0.5s)', 'Lento (2s)']
-        
-        for idx, (scenario, scenario_name) in enumerate(zip(scenarios, scenario_names)):
-            ax = axes[idx]
-            
-            # Dados para cada servidor
-            clients = []
-            seq_success = []
-            seq_errors = []
-            conc_success = []
-            conc_errors = []
-            
-            for num_clients in sorted([int(k) for k in self.results['results']['sequential'][scenario].keys()]):
-                clients.append(num_clients)
-                
-                # Servidor sequencial
-                seq_data = self.results['results']['sequential'][scenario][str(num_clients)]
-                seq_success.append(seq_data['success_rate_mean'] * 100)
-                seq_errors.append(seq_data['success_rate_std'] * 100)
-                
-                # Servidor concorrente
-                conc_data = self.results['results']['concurrent'][scenario][str(num_clients)]
-                conc_success.append(conc_data['success_rate_mean'] * 100)
-                conc_errors.append(conc_data['success_rate_std'] * 100)
-            
-            # Plota os dados
-            x = np.arange(len(clients))
-            width = 0.35
-            
-            ax.bar(x - width/2, seq_success, width, label='Sequencial', 
-                   yerr=seq_errors, capsize=5, alpha=0.8)
-            ax.bar(x + width/2, conc_success, width, label='Concorrente', 
-                   yerr=conc_errors, capsize=5, alpha=0.8)
-            
-            ax.set_title(f'Cenário {scenario_name}')
-            ax.set_xlabel('Número de Clientes')
-            ax.set_ylabel('Taxa de Sucesso (%)')
-            ax.set_xticks(x)
-            ax.set_xticklabels(clients)
-            ax.set_ylim(0, 105)
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('/app/results/plots/success_rate_comparison.png', dpi=300, bbox_inches='tight')
-        plt.close()
+    def build_requests_frame(self, raw):
+        """Achata os resultados por requisição em um único DataFrame
+        
+        Aceita as três formas gravadas pelo testador: colunas (uma lista por campo), lista de
+        dicionários (versões antigas) e o arquivo JSONL de --saida-jsonl. Os laços são por teste;
+        nenhuma linha é processada individualmente em Python."""
+        frames = []
+        for server, scenarios in raw['resultados'].items():
+            for scenario, by_clients in scenarios.items():
+                for num_clients, test in by_clients.items():
+                    results = test.get('resultados')
+                    if isinstance(results, dict):
+                        frame = pd.DataFrame(results['colunas'])
+                    elif results:
+                        frame = pd.DataFrame.from_records(results, exclude=['corpo'])
+                    else:
+                        continue
+                    frames.append(frame.assign(servidor=server, cenario=scenario, num_clientes=int(num_clients)))
+        
+        # Com --saida-jsonl as requisições estão no arquivo indicado nos metadados, já com as chaves
+        requests_file = raw.get('metadados', {}).get('arquivo_requisicoes')
+        if requests_file:
+            if not os.path.exists(requests_file):
+                requests_file = os.path.join(os.path.dirname(self.results_file), os.path.basename(requests_file))
+            if os.path.exists(requests_file):
+                frames.append(pd.read_json(requests_file, lines=True, dtype={'id_cliente': str}))
+        
+        if not frames:
+            return pd.DataFrame(columns=KEYS + REQUEST_COLUMNS)
+        
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        
+        # Formato antigo/JSONL: "cliente-sequência" -> coluna numérica cliente
+        if 'id_cliente' in df.columns:
+            from_id = pd.to_numeric(df['id_cliente'].astype(str).str.rsplit('-', n=1).str[0], errors='coerce')
+            df['cliente'] = df['cliente'].fillna(from_id) if 'cliente' in df.columns else from_id
+        
+        df = df.reindex(columns=KEYS + REQUEST_COLUMNS)
+        df['sucesso'] = df['sucesso'].fillna(False).astype(bool)
+        df['num_clientes'] = df['num_clientes'].astype(int)
+        for key in ('servidor', 'cenario'):
+            df[key] = df[key].astype('category')
+        return df
     
-    def plot_scalability_analysis(self):
-        """Análise de escalabilidade"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('Análise de Escalabilidade', fontsize=16)
-        
-        # Prepara dados
-        data = []
-        for server_type in ['sequential', 'concurrent']:
-            for scenario in ['fast', 'medium', 'slow']:
-                for num_clients in self.results['results'][server_type][scenario]:
-                    stats = self.results['results'][server_type][scenario][num_clients]
-                    data.append({
-                        'server_type': server_type,
-                        'scenario': scenario,
-                        'num_clients': int(num_clients),
-                        'response_time': stats['response_time_mean'],
-                        'success_rate': stats['success_rate_mean'],
-                        'throughput': stats['successful_requests_mean'] / stats['response_time_mean'] if stats['response_time_mean'] > 0 else 0
-                    })
-        
-        df = pd.DataFrame(data)
-        
-        # Gráfico 1: Tempo de resposta vs número de clientes
-        ax1 = axes[0, 0]
-        for scenario in ['fast', 'medium', 'slow']:
-            scenario_data = df[df['scenario'] == scenario]
-            for server_type in ['sequential', 'concurrent']:
-                server_data = scenario_data[scenario_data['server_type'] == server_type]
-                ax1.plot(server_data['num_clients'], server_data['response_time'], 
-                        marker='o', label=f'{server_type.title()} - {scenario}')
-        
-        ax1.set_xlabel('Número de Clientes')
-        ax1.set_ylabel('Tempo de Resposta (s)')
-        ax1.set_title('Escalabilidade: Tempo de Resposta')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Gráfico 2: Taxa de sucesso vs número de clientes
-        ax2 = axes[0, 1]
-        for scenario in ['fast', 'medium', 'slow']:
-            scenario_data = df[df['scenario'] == scenario]
-            for server_type in ['sequential', 'concurrent']:
-                server_data = scenario_data[scenario_data['server_type'] == server_type]
-                ax2.plot(server_data['num_clients'], server_data['success_rate'], 
-                        marker='s', label=f'{server_type.title()} - {scenario}')
-        
-        ax2.set_xlabel('Número de Clientes')
-        ax2.set_ylabel('Taxa de Sucesso')
-        ax2.set_title('Escalabilidade: Taxa de Sucesso')
-        ax2.legend()
-        ax2.grid(True, alpha=0.3)
-        
-        # Gráfico 3: Throughput
-        ax3 = axes[1, 0]
-        for scenario in ['fast', 'medium', 'slow']:
-            scenario_data = df[df['scenario'] == scenario]
-            for server_type in ['sequential', 'concurrent']:
-                server_data = scenario_data[scenario_data['server_type'] == server_type]
-                ax3.plot(server_data['num_clients'], server_data['throughput'], 
-                        marker='^', label=f'{server_type.title()} - {scenario}')
-        
-        ax3.set_xlabel('Número de Clientes')
-        ax3.set_ylabel('Throughput (req/s)')
-        ax3.set_title('Escalabilidade: Throughput')
-        ax3.legend()
-        ax3.grid(True, alpha=0.3)
-        
-        # Gráfico 4: Heatmap de performance
-        ax4 = axes[1, 1]
-        pivot_data = df.pivot_table(values='response_time', 
-                                   index=['server_type', 'scenario'], 
-                                   columns='num_clients')
-        sns.heatmap(pivot_data, annot=True, fmt='.3f', ax=ax4, cmap='YlOrRd')
-        ax4.set_title('Heatmap: Tempo de Resposta')
-        
-        plt.tight_layout()
-        plt.savefig('/app/results/plots/scalability_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close()
+    def aggregate(self, raw):
+        """Calcula médias, desvios, percentis, taxa de sucesso e throughput com groupby"""
+        df = self.requests
+        ok = df[df['sucesso']]
+        
+        latency = ok.groupby(KEYS, observed=True)['tempo_resposta']
+        stats = latency.agg(response_time_mean='mean', response_time_std='std')
+        quantiles = latency.quantile([0.5, 0.9, 0.99]).unstack()
+        quantiles.columns = ['response_time_p50', 'response_time_p90', 'response_time_p99']
+        
+        success = df.groupby(KEYS, observed=True)['sucesso'].agg(
+            success_rate_mean='mean', successful_requests='sum', total_requests='size'
+        )
+        # Variação da taxa de sucesso entre os clientes de um mesmo teste
+        success_std = (df.groupby(KEYS + ['cliente'], observed=True)['sucesso'].mean()
+                         .groupby(level=KEYS, observed=True).std().rename('success_rate_std'))
+        
+        per_test = (self.tests.set_index(KEYS)
+                    .join([stats, quantiles, success, success_std], how='left'))
+        
+        # Testes sem linhas por requisição (multiprocesso sem JSONL) usam os resumos dos histogramas
+        per_test['successful_requests'] = per_test['successful_requests'].fillna(per_test['sucessos_resumo'])
+        per_test['total_requests'] = per_test['total_requests'].fillna(per_test['total_requisicoes'])
+        per_test['response_time_mean'] = per_test['response_time_mean'].fillna(per_test['media_resumo'])
+        for p in ('p50', 'p90', 'p99'):
+            per_test[f'response_time_{p}'] = per_test[f'response_time_{p}'].fillna(per_test[f'{p}_resumo'])
+        per_test['success_rate_mean'] = per_test['success_rate_mean'].fillna(
+            per_test['successful_requests'] / per_test['total_requests'].where(per_test['total_requests'] > 0)
+        )
+        per_test = per_test.fillna({'response_time_std': 0.0, 'success_rate_std': 0.0,
+                                    'response_time_mean': 0.0, 'success_rate_mean': 0.0,
+                                    'successful_requests': 0})
+        per_test['throughput'] = per_test['successful_requests'] / per_test['tempo_total'].where(per_test['tempo_total'] > 0)
+        per_test['throughput'] = per_test['throughput'].fillna(0.0)
+        per_test['successful_requests_mean'] = per_test['successful_requests']
+        
+        self.summary = per_test.reset_index()
+        
+        # Estrutura aninhada esperada pelos gráficos: results[servidor][cenário][str(clientes)]
+        columns = ['response_time_mean', 'response_time_std', 'response_time_p50', 'response_time_p90',
+                   'response_time_p99', 'success_rate_mean', 'success_rate_std', 'successful_requests_mean',
+                   'throughput']
+        nested = {}
+        for row in self.summary[KEYS + columns].to_dict('records'):
+            server = SERVER_NAMES.get(row['servidor'], row['servidor'])
+            scenario = SCENARIO_NAMES.get(row['cenario'], row['cenario'])
+            nested.setdefault(server, {}).setdefault(scenario, {})[str(row['num_clientes'])] = {
+                column: row[column] for column in columns
+            }
+        
+        metadata = raw.get('metadados', {})
+        first = next(iter(raw['resultados'].values()), {})
+        first = next(iter(first.values()), {})
+        first = next(iter(first.values()), {})
+        return {
+            'timestamp': metadata.get('data_teste', ''),
+            'test_config': {
+                'iterations': 1,
+                'client_counts': sorted(self.summary['num_clientes'].unique().tolist()),
+                'requests_per_client': first.get('requisicoes_por_cliente', 0)
+            },
+            'results': nested
+        }
     
-    def plot_scenario_comparison(self):
-        """Comparação por cenário"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('Comparação Detalhada por Cenário', fontsize=16)
-        
-        # Dados agregados
-        scenarios = ['fast', 'medium', 'slow']
-        server_types = ['sequential', 'concurrent']
-        
-        # Gráfico 1: Tempo médio por cenário
-        ax1 = axes[0, 0]
-        scenario_means = {}
-        for scenario in scenarios:
-            scenario_means[scenario] = {}
-            for server_type in server_types:
-                times = []
-                for num_clients in self.results['results'][server_type][scenario]:
-                    times.append(self.results['results'][server_type][scenario][num_clients]['response_time_mean'])
-                scenario_means[scenario][server_type] = np.mean(times)
-        
-        x = np.arange(len(scenarios))
-        width = 0.35
-        
-        seq_means = [scenario_means[s]['sequential'] for s in scenarios]
-        conc_means = [scenario_means[s]['concurrent'] for s in scenarios]
-        
-        ax1.bar(x - width/2, seq_means, width, label='Sequencial', alpha=0.8)
-        ax1.bar(x + width/2, conc_means, width, label='Concorrente', alpha=0.8)
-        ax1.set_xlabel('Cenário')
-        ax1.set_ylabel('Tempo Médio de Resposta (s)')
-        ax1.set_title('Tempo Médio por Cenário')
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(['Rápido', 'Médio', 'Lento'])
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Gráfico 2: Eficiência relativa
-        ax2 = axes[0, 1]
-        efficiency = []
-        for scenario in scenarios:
-            seq_time = scenario_means[scenario]['sequential']
-            conc_time = scenario_means[scenario]['concurrent']
-            if conc_time > 0:
-                efficiency.append(seq_time / conc_time)
-            else:
-                efficiency.append(0)
-        
-        colors = ['green' if e > 1 else 'red' for e in efficiency]
-        ax2.bar(scenarios, efficiency, color=colors, alpha=0.7)
-        ax2.axhline(y=1, color='black', linestyle='--', alpha=0.5)
-        ax2.set_xlabel('Cenário')
-        ax2.set_ylabel('Eficiência Relativa (Seq/Conc)')
-        ax2.set_title('Eficiência: Sequencial vs Concorrente')
-        ax2.set_xticklabels(['Rápido', 'Médio', 'Lento'])
-        ax2.grid(True, alpha=0.3)
-        
-        # Gráfico 3: Variabilidade (desvio padrão)
-        ax3 = axes[1, 0]
-        scenario_stds = {}
-        for scenario in scenarios:
-            scenario_stds[scenario] = {}
-            for server_type in server_types:
-                stds = []
-                for num_clients in self.results['results'][server_type][scenario]:
-                    stds.append(self.results['results'][server_type][scenario][num_clients]['response_time_std'])
-                scenario_stds[scenario][server_type] = np.mean(stds)
-        
-        seq_stds = [scenario_stds[s]['sequential'] for s in scenarios]
-        conc_stds = [scenario_stds[s]['concurrent'] for s in scenarios]
-        
-        ax3.bar(x - width/2, seq_stds, width, label='Sequencial', alpha=0.8)
-        ax3.bar(x + width/2, conc_stds, width, label='Concorrente', alpha=0.8)
-        ax3.set_xlabel('Cenário')
-        ax3.set_ylabel('Desvio Padrão Médio (s)')
-        ax3.set_title('Variabilidade por Cenário')
-        ax3.set_xticks(x)
-        ax3.set_xticklabels(['Rápido', 'Médio', 'Lento'])
-        ax3.legend()
-        ax3.grid(True, alpha=0.3)
-        
-        # Gráfico 4: Taxa de sucesso por cenário
-        ax4 = axes[1, 1]
-        scenario_success = {}
-        for scenario in scenarios:
-            scenario_success[scenario] = {}
-            for server_type in server_types:
-                success_rates = []
-                for num_clients in self.results['results'][server_type][scenario]:
-                    success_rates.append(self.results['results'][server_type][scenario][num_clients]['success_rate_mean'])
-                scenario_success[scenario][server_type] = np.mean(success_rates) * 100
-        
-        seq_success = [scenario_success[s]['sequential'] for s in scenarios]
-        conc_success = [scenario_success[s]['concurrent'] for s in scenarios]
-        
-        ax4.bar(x - width/2, seq_success, width, label='Sequencial', alpha=0.8)
-        ax4.bar(x + width/2, conc_success, width, label='Concorrente', alpha=0.8)
-        ax4.set_xlabel('Cenário')
-        ax4.set_ylabel('Taxa de Sucesso Média (%)')
-        ax4.set_title('Taxa de Sucesso por Cenário')
-        ax4.set_xticks(x)
-        ax4.set_xticklabels(['Rápido', 'Médio', 'Lento'])
-        ax4.set_ylim(0, 105)
-        ax4.legend()
-        ax4.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig('/app/results/plots/scenario_comparison.png', dpi=300, bbox_inches='tight')
-        plt.close()
+    def plot_frame(self):
+        """DataFrame único (uma linha por teste) compartilhado por todos os gráficos"""
+        columns = ['response_time_mean', 'response_time_std', 'success_rate_mean', 'success_rate_std',
+                   'throughput']
+        df = self.summary[KEYS + columns].copy()
+        df.insert(0, 'server_type', df.pop('servidor').map(lambda s: SERVER_NAMES.get(s, s)))
+        df.insert(1, 'scenario', df.pop('cenario').map(lambda s: SCENARIO_NAMES.get(s, s)))
+        df.insert(2, 'num_clients', df.pop('num_clientes').astype(int))
+        df[columns] = df[columns].astype(float)
+        return df.sort_values(['server_type', 'scenario', 'num_clients']).reset_index(drop=True)
     
-    def plot_statistical_analysis(self):
-        """Análise estatística detalhada"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('Análise Estatística Detalhada', fontsize=16)
-        
-        # Prepara dados para boxplots
-        data_for_analysis = []
-        for server_type in ['sequential', 'concurrent']:
-            for scenario in ['fast', 'medium', 'slow']:
-                for num_clients in self.results['results'][server_type][scenario]:
-                    stats = self.results['results'][server_type][scenario][num_clients]
-                    data_for_analysis.append({
-                        'server_type': server_type,
-                        'scenario': scenario,
-                        'num_clients': int(num_clients),
-                        'response_time_mean': stats['response_time_mean'],
-                        'response_time_std': stats['response_time_std'],
-                        'success_rate_mean': stats['success_rate_mean']
-                    })
+    def has_compared_servers(self):
+        """Os gráficos e o relatório comparam sequencial x concorrente; o orquestrador pode rodar outros motores"""
+        return all(server in self.results['results'] for server in COMPARED_SERVERS)
+    
+    def generate_all_plots(self, force=False):
+        """Gera os gráficos em paralelo, pulando os que já existem para os mesmos dados"""
+        if not self.results:
+            print("Nenhum resultado disponível para análise")
+            return
+        
+        if not self.has_compared_servers():
+            print(f"Gráficos comparativos ignorados: resultados sem os servidores {' e '.join(COMPARED_SERVERS)}")
+            return
         
-        df = pd.DataFrame(data_for_analysis)
-        
-        # Boxplot 1: Distribuição de tempos de resposta
-        ax1 = axes[0, 0]
-        sns.boxplot(data=df, x='scenario', y='response_time_mean', hue='server_type', ax=ax1)
-        ax1.set_title('Distribuição dos Tempos de Resposta')
-        ax1.set_xlabel('Cenário')
-        ax1.set_ylabel('Tempo de Resposta (s)')
-        
-        # Boxplot 2: Distribuição de desvios padrão
-        ax2 = axes[0, 1]
-        sns.boxplot(data=df, x='scenario', y='response_time_std', hue='server_type', ax=ax2)
-        ax2.set_title('Distribuição dos Desvios Padrão')
-        ax2.set_xlabel('Cenário')
-        ax2.set_ylabel('Desvio Padrão (s)')
-        
-        # Scatter plot: Correlação entre clientes e tempo
-        ax3 = axes[1, 0]
-        for server_type in ['sequential', 'concurrent']:
-            server_data = df[df['server_type'] == server_type]
-            ax3.scatter(server_data['num_clients'], server_data['response_time_mean'], 
-                       label=server_type.title(), alpha=0.7, s=60)
-        
-        ax3.set_xlabel('Número de Clientes')
-        ax3.set_ylabel('Tempo de Resposta (s)')
-        ax3.set_title('Correlação: Clientes vs Tempo de Resposta')
-        ax3.legend()
-        ax3.grid(True, alpha=0.3)
-        
-        # Violin plot: Distribuição detalhada
-        ax4 = axes[1, 1]
-        sns.violinplot(data=df, x='server_type', y='success_rate_mean', ax=ax4)
-        ax4.set_title('Distribuição da Taxa de Sucesso')
-        ax4.set_xlabel('Tipo de Servidor')
-        ax4.set_ylabel('Taxa de Sucesso')
-        
-        plt.tight_layout()
-        plt.savefig('/app/results/plots/statistical_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        # Cria diretório para gráficos
+        os.makedirs(self.plots_dir, exist_ok=True)
+        
+        data = self.plot_frame()
+        key = f"{data_hash(data)}:{self.dpi}"
+        manifest_file = os.path.join(self.plots_dir, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_file):
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+        
+        pending = {}
+        for name in PLOTS:
+            filename = f"{name}.{self.plot_format}"
+            path = os.path.join(self.plots_dir, filename)
+            if force or manifest.get(filename) != key or not os.path.exists(path):
+                pending[filename] = (name, path)
+        
+        print(f"Gerando {len(pending)} gráficos ({len(PLOTS) - len(pending)} sem alterações)...")
+        
+        workers = min(self.jobs or os.cpu_count() or 1, len(pending))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(render_plot, name, data, path, self.dpi): filename
+                           for filename, (name, path) in pending.items()}
+                for future in as_completed(futures):
+                    self.record_plot(manifest, futures[future], key, future.exception())
+        else:
+            for filename, (name, path) in pending.items():
+                try:
+                    render_plot(name, data, path, self.dpi)
+                    self.record_plot(manifest, filename, key, None)
+                except Exception as e:
+                    self.record_plot(manifest, filename, key, e)
+        
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        print(f"Gráficos salvos em {self.plots_dir}/")
+    
+    def record_plot(self, manifest, filename, key, error):
+        """Registra no manifesto só os gráficos salvos com sucesso"""
+        if error is not None:
+            manifest.pop(filename, None)
+            print(f"Erro ao gerar {filename}: {error}")
+            return
+        manifest[filename] = key
     
     def generate_report(self):
         """Gera relatório em texto"""
@@ -436,10 +516,26 @@ class ResultsAnalyzer:
         scenarios = ['fast', 'medium', 'slow']
         scenario_names = ['Rápido', 'Médio (0.5s)', 'Lento (2s)']
         
-        for scenario, scenario_name in zip(scenarios, scenario_names):
+        # Só os cenários executados nos dois servidores (o orquestrador local pode rodar um subconjunto)
+        compared = [
+            (scenario, name) for scenario, name in zip(scenarios, scenario_names)
+            if all(scenario in self.results['results'].get(server, {}) for server in COMPARED_SERVERS)
+        ]
+        scenarios = [scenario for scenario, _ in compared]
+        
+        if not compared:
+            report.append("=== COMPARAÇÃO ===")
+            report.append(f"Sem resultados dos servidores {' e '.join(COMPARED_SERVERS)} nos mesmos cenários; "
+                          f"servidores testados: {', '.join(sorted(self.results['results']))}")
+            self.save_report(report)
+            return
+        
+        for scenario, scenario_name in compared:
             report.append(f"=== CENÁRIO: {scenario_name.upper()} ===")
             
-            for num_clients in sorted([int(k) for k in self.results['results']['sequential'][scenario].keys()]):
+            # Números de clientes testados nos dois servidores
+            client_counts = set(self.results['results']['sequential'][scenario]) & set(self.results['results']['concurrent'][scenario])
+            for num_clients in sorted(int(k) for k in client_counts):
                 report.append(f"\nClientes simultâneos: {num_clients}")
                 
                 # Dados do servidor sequencial
@@ -459,7 +555,7 @@ class ResultsAnalyzer:
                     speedup = seq_data['response_time_mean'] / conc_data['response_time_mean']
                     if speedup > 1:
                         report.append(f"    -> Servidor concorrente é {speedup:.2f}x mais rápido")
-                    else:
+                    elif speedup > 0:
                         report.append(f"    -> Servidor sequencial é {1/speedup:.2f}x mais rápido")
             
             report.append("")
@@ -472,20 +568,20 @@ class ResultsAnalyzer:
         seq_avg = np.mean([
             self.results['results']['sequential'][scenario][str(num_clients)]['response_time_mean']
             for scenario in scenarios
-            for num_clients in [1, 5, 10, 20, 50]
+            for num_clients in self.results['results']['sequential'][scenario]
         ])
         
         conc_avg = np.mean([
             self.results['results']['concurrent'][scenario][str(num_clients)]['response_time_mean']
             for scenario in scenarios
-            for num_clients in [1, 5, 10, 20, 50]
+            for num_clients in self.results['results']['concurrent'][scenario]
         ])
         
         if conc_avg > 0:
             overall_speedup = seq_avg / conc_avg
             if overall_speedup > 1:
                 report.append(f"   - Servidor concorrente é em média {overall_speedup:.2f}x mais rápido")
-            else:
+            elif overall_speedup > 0:
                 report.append(f"   - Servidor sequencial é em média {1/overall_speedup:.2f}x mais rápido")
         
         report.append("\n2. Recomendações:")
@@ -493,13 +589,30 @@ class ResultsAnalyzer:
         report.append("   - Use servidor sequencial para processamento simples com poucos clientes")
         report.append("   - O servidor concorrente escala melhor com o aumento de clientes")
         
-        # Salva relatório
-        with open('/app/results/performance_report.txt', 'w') as f:
+        self.save_report(report)
+    
+    def save_report(self, report):
+        """Salva o relatório em texto ao lado dos resultados"""
+        report_file = os.path.join(self.output_dir, 'performance_report.txt')
+        with open(report_file, 'w') as f:
             f.write('\n'.join(report))
         
-        print("Relatório salvo em /app/results/performance_report.txt")
+        print(f"Relatório salvo em {report_file}")
 
 if __name__ == "__main__":
-    analyzer = ResultsAnalyzer()
-    analyzer.generate_all_plots()
+    parser = argparse.ArgumentParser(description='Gera gráficos e relatório a partir dos resultados dos testes')
+    parser.add_argument('results_file', nargs='?', default='/app/resultados/resultados_testes.json',
+                        help='Arquivo gerado por teste_completo.py')
+    parser.add_argument('--format', default=PLOT_FORMAT, choices=['png', 'svg', 'pdf', 'jpg'],
+                        help='Formato dos gráficos (padrão: png)')
+    parser.add_argument('--dpi', type=int, default=PLOT_DPI,
+                        help='Resolução dos gráficos; use valores baixos (ex.: 72) para prévias rápidas')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Processos para desenhar os gráficos (padrão: um por CPU)')
+    parser.add_argument('--force', action='store_true',
+                        help='Redesenha todos os gráficos mesmo sem mudança nos dados')
+    args = parser.parse_args()
+    
+    analyzer = ResultsAnalyzer(args.results_file, plot_format=args.format, dpi=args.dpi, jobs=args.jobs)
+    analyzer.generate_all_plots(force=args.force)
     analyzer.generate_report()
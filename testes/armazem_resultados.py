@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+#Armazenamento colunar dos resultados por requisição
+#Em vez de um dicionário por requisição (com o corpo da resposta), cada campo vive numa coluna array.array
+#pré-alocada em blocos; cerca de 60 bytes por amostra em vez de centenas
+
+import array
+
+TAMANHO_BLOCO = 4096  #Linhas acrescentadas a todas as colunas quando o armazém enche
+
+#Nome da coluna, código de tipo do array (e do NumPy equivalente) e valor padrão
+COLUNAS = (
+    ('timestamp', 'd', 0.0),
+    ('tempo_resposta', 'd', 0.0),
+    ('tempo_conexao', 'd', 0.0),
+    ('tempo_envio', 'd', 0.0),
+    ('tempo_recepcao', 'd', 0.0),
+    ('latencia_corrigida', 'd', float('nan')),  #Só no teste em malha aberta
+    ('atraso_envio', 'd', float('nan')),
+    ('codigo_status', 'H', 0),
+    ('sucesso', 'b', 0),
+    ('conexao_reutilizada', 'b', -1),  #-1: cliente sem pool de conexões
+    ('cliente', 'i', -1),
+    ('sequencia', 'i', -1),
+    ('erro', 'i', -1)  #Índice em ArmazemResultados.erros
+)
+
+TIPOS_NUMPY = {'d': 'float64', 'H': 'uint16', 'b': 'int8', 'i': 'int32'}
+
+def separar_id_cliente(id_cliente):
+    #"3-7" -> (3, 7); "aberto-12" -> (-1, 12); None -> (-1, -1)
+    if not id_cliente:
+        return -1, -1
+    cliente, _, sequencia = str(id_cliente).rpartition('-')
+    return (int(cliente) if cliente.isdigit() else -1), (int(sequencia) if sequencia.isdigit() else -1)
+
+class ArmazemResultados:
+    #Colunas de tamanho fixo que crescem de TAMANHO_BLOCO em TAMANHO_BLOCO linhas
+    def __init__(self, tamanho_bloco=TAMANHO_BLOCO):
+        self.tamanho_bloco = tamanho_bloco
+        self.blocos = {nome: array.array(tipo, [padrao]) * tamanho_bloco for nome, tipo, padrao in COLUNAS}
+        self.colunas = {nome: array.array(tipo) for nome, tipo, _ in COLUNAS}
+        self.tamanho = 0
+        self.capacidade = 0
+        self.erros = []
+        self.indices_erros = {}
+
+    def __len__(self):
+        return self.tamanho
+
+    def reservar(self):
+        #Garante espaço para mais uma linha (cresce um bloco inteiro de cada vez)
+        if self.tamanho == self.capacidade:
+            for nome, coluna in self.colunas.items():
+                coluna.extend(self.blocos[nome])
+            self.capacidade += self.tamanho_bloco
+
+    def adicionar(self, resultado):
+        #Copia os campos de um resultado (dicionário do ClienteHTTP) para as colunas; o corpo é descartado
+        self.reservar()
+        i = self.tamanho
+        colunas = self.colunas
+
+        colunas['timestamp'][i] = resultado.get('timestamp', 0.0)
+        colunas['tempo_resposta'][i] = resultado['tempo_resposta']
+        colunas['tempo_conexao'][i] = resultado['tempo_conexao']
+        colunas['tempo_envio'][i] = resultado['tempo_envio']
+        colunas['tempo_recepcao'][i] = resultado['tempo_recepcao']
+        colunas['codigo_status'][i] = resultado['codigo_status']
+        colunas['sucesso'][i] = resultado['sucesso']
+        cliente, sequencia = separar_id_cliente(resultado.get('id_cliente'))
+        colunas['cliente'][i] = cliente
+        colunas['sequencia'][i] = sequencia
+
+        if 'latencia_corrigida' in resultado:
+            colunas['latencia_corrigida'][i] = resultado['latencia_corrigida']
+            colunas['atraso_envio'][i] = resultado['atraso_envio']
+        if 'conexao_reutilizada' in resultado:
+            colunas['conexao_reutilizada'][i] = resultado['conexao_reutilizada']
+        if 'erro' in resultado:
+            colunas['erro'][i] = self.indice_erro(resultado['erro'])
+
+        self.tamanho += 1
+
+    def indice_erro(self, erro):
+        #Mensagens de erro se repetem muito: guarda cada texto uma vez
+        indice = self.indices_erros.get(erro)
+        if indice is None:
+            indice = self.indices_erros[erro] = len(self.erros)
+            self.erros.append(erro)
+        return indice
+
+    def coluna(self, nome):
+        #Cópia da coluna sem a parte pré-alocada ainda não usada
+        #(uma visão travaria o array: o próximo bloco levantaria BufferError ao estender a coluna)
+        return self.colunas[nome][:self.tamanho]
+
+    def registro(self, i):
+        #Uma linha de volta como dicionário (mesmas chaves do ClienteHTTP, sem o corpo)
+        resultado = {nome: self.colunas[nome][i] for nome, _, _ in COLUNAS}
+        resultado['sucesso'] = bool(resultado['sucesso'])
+        resultado['erro'] = self.erros[resultado['erro']] if resultado['erro'] >= 0 else None
+        return resultado
+
+    def para_numpy(self):
+        #Colunas como arrays NumPy sobre cópias das colunas; o armazém continua podendo crescer (requer NumPy)
+        import numpy as np
+        return {nome: np.frombuffer(self.coluna(nome), dtype=TIPOS_NUMPY[tipo]) for nome, tipo, _ in COLUNAS}
+
+    def para_dict(self):
+        #Forma colunar para o JSON: uma lista por campo (carregável direto em um DataFrame)
+        return {
+            'tamanho': self.tamanho,
+            'erros': self.erros,
+            'colunas': {nome: self.coluna(nome).tolist() for nome, _, _ in COLUNAS}
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        armazem = cls()
+        armazem.tamanho = armazem.capacidade = dados['tamanho']
+        armazem.colunas = {nome: array.array(tipo, dados['colunas'][nome]) for nome, tipo, _ in COLUNAS}
+        armazem.erros = list(dados['erros'])
+        armazem.indices_erros = {erro: indice for indice, erro in enumerate(armazem.erros)}
+        return armazem
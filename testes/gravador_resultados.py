@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+#Gravação incremental dos resultados dos testes de carga
+#Cada requisição vira uma linha JSON num arquivo só de acréscimo, gravada em lotes enquanto o teste roda,
+#então a memória não cresce com o número de requisições e um teste interrompido deixa o que já foi gravado
+
+import os
+import json
+import time
+import threading
+
+TAMANHO_LOTE_RESULTADOS = 1000  #Linhas acumuladas antes de cada escrita
+INTERVALO_ESCRITA_RESULTADOS = 1.0  #Segundos máximos entre escritas, mesmo com o lote incompleto
+
+class GravadorJSONL:
+    #Destino de resultados em JSON Lines; seguro entre threads e entre processos (O_APPEND, um write por lote)
+    def __init__(self, caminho, manter_corpo=False, tamanho_lote=TAMANHO_LOTE_RESULTADOS,
+                 intervalo=INTERVALO_ESCRITA_RESULTADOS):
+        self.caminho = caminho
+        self.manter_corpo = manter_corpo
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.lote = []
+        self.gravados = 0
+        self.ultima_escrita = time.monotonic()
+        self.lock = threading.Lock()
+        self.descritor = None
+        self.pid = None
+
+    def registrar(self, resultado, contexto=None):
+        #Serializa fora do lock; o lock só protege o lote
+        registro = dict(contexto, **resultado) if contexto else dict(resultado)
+        if not self.manter_corpo:
+            registro.pop('corpo', None)
+            registro.pop('cabecalhos', None)
+        linha = json.dumps(registro, ensure_ascii=False, separators=(',', ':'))
+
+        with self.lock:
+            self.lote.append(linha)
+            if len(self.lote) < self.tamanho_lote and time.monotonic() - self.ultima_escrita < self.intervalo:
+                return
+            lote, self.lote = self.lote, []
+            self.escrever(lote)
+
+    def escrever(self, lote):
+        #Um único write com O_APPEND por lote: linhas de processos diferentes não se misturam
+        if not lote:
+            return
+        if self.descritor is None or self.pid != os.getpid():
+            #Depois de um fork o filho abre o próprio descritor
+            pasta = os.path.dirname(self.caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            self.descritor = os.open(self.caminho, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            self.pid = os.getpid()
+
+        dados = ("\n".join(lote) + "\n").encode('utf-8')
+        escritos = 0
+        while escritos < len(dados):
+            escritos += os.write(self.descritor, dados[escritos:])
+        self.gravados += len(lote)
+        self.ultima_escrita = time.monotonic()
+
+    def descarregar(self):
+        #Grava o lote pendente (fim de cada teste)
+        with self.lock:
+            lote, self.lote = self.lote, []
+            self.escrever(lote)
+
+    def fechar(self):
+        self.descarregar()
+        if self.descritor is not None and self.pid == os.getpid():
+            os.close(self.descritor)
+        self.descritor = None
+
+def ler_resultados(caminho):
+    #Lê um arquivo JSONL linha a linha (gerador: não carrega o arquivo inteiro na memória)
+    #Uma última linha truncada por interrupção do teste é ignorada
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+#Orquestrador local dos testes de carga, sem Docker
+#Sobe cada servidor como subprocesso em uma porta efêmera do loopback, espera a sonda de prontidão,
+#executa a mesma matriz de cenários do TestadorAutomatizado, derruba o servidor e grava os resultados
+
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import subprocess
+
+#Adicionar diretório src ao path (um nível acima da pasta testes)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cliente import ClienteHTTP
+from teste_completo import TestadorAutomatizado, CENARIOS_TESTE
+
+PASTA_SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+SAIDA_PADRAO = os.path.join(os.path.dirname(__file__), '..', 'resultados', 'local', 'resultados_testes.json')
+
+HOST_LOOPBACK = '127.0.0.1'
+TEMPO_PRONTIDAO = 10.0  #Segundos para o servidor responder à sonda depois de iniciado
+INTERVALO_SONDA = 0.05
+TEMPO_ENCERRAMENTO = 5.0  #Segundos entre o SIGINT e o SIGKILL
+TENTATIVAS_PORTA = 3  #A porta efêmera pode ser ocupada por outro processo antes do bind do servidor
+
+#Tipo do servidor -> script em src/
+MOTORES = {
+    'sequencial': 'servidor_sequencial.py',
+    'concorrente': 'servidor_concorrente.py',
+    'assincrono': 'servidor_assincrono.py',
+    'prefork': 'servidor_prefork.py',
+    'eventos': 'servidor_eventos.py'
+}
+
+def porta_efemera(host=HOST_LOOPBACK):
+    #Porta livre escolhida pelo kernel (bind na porta 0), liberada para o servidor usar em seguida
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sonda:
+        sonda.bind((host, 0))
+        return sonda.getsockname()[1]
+
+class ServidorLocal:
+    #Servidor rodando como subprocesso em um grupo de processos próprio (derrubar o grupo leva os workers do prefork)
+    def __init__(self, tipo, argumentos_extras=(), host=HOST_LOOPBACK, pasta_logs=None):
+        self.tipo = tipo
+        self.argumentos_extras = list(argumentos_extras)
+        self.host = host
+        self.porta = None
+        self.pasta_logs = pasta_logs
+        self.processo = None
+        self.arquivo_log = None
+        self.tempo_inicio = 0.0
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excecao):
+        self.parar()
+
+    def iniciar(self, tempo_limite=TEMPO_PRONTIDAO):
+        #Sobe o servidor e só retorna quando ele responder; tenta outra porta se o processo morrer no bind
+        for _ in range(TENTATIVAS_PORTA):
+            self.porta = porta_efemera(self.host)
+            comando = [sys.executable, '-u', MOTORES[self.tipo], '--host', self.host, '--porta', str(self.porta)]
+            comando += self.argumentos_extras
+
+            saida = subprocess.DEVNULL
+            if self.pasta_logs:
+                os.makedirs(self.pasta_logs, exist_ok=True)
+                self.arquivo_log = open(os.path.join(self.pasta_logs, f"servidor_{self.tipo}.log"), 'ab')
+                saida = self.arquivo_log
+
+            self.tempo_inicio = time.monotonic()
+            self.processo = subprocess.Popen(comando, cwd=PASTA_SRC, stdout=saida, stderr=subprocess.STDOUT,
+                                             start_new_session=True)
+            if self.aguardar_pronto(tempo_limite):
+                return time.monotonic() - self.tempo_inicio
+            self.parar()
+
+        raise RuntimeError(f"Servidor {self.tipo} não respondeu em {self.host} após {TENTATIVAS_PORTA} tentativas")
+
+    def aguardar_pronto(self, tempo_limite):
+        #Sonda de prontidão: GET /status até receber 200 (desiste se o processo terminar)
+        cliente = ClienteHTTP(self.host, self.porta)
+        limite = time.monotonic() + tempo_limite
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                return False
+            resultado = cliente.enviar_requisicao('GET', '/status')
+            if resultado['sucesso'] and resultado['codigo_status'] == 200:
+                return True
+            time.sleep(INTERVALO_SONDA)
+        return False
+
+    def parar(self):
+        #SIGINT vira KeyboardInterrupt e o servidor executa parar(); o que sobrar do grupo leva SIGKILL
+        if self.processo is not None:
+            if self.processo.poll() is None:
+                self.sinalizar(signal.SIGINT)
+                try:
+                    self.processo.wait(TEMPO_ENCERRAMENTO)
+                except subprocess.TimeoutExpired:
+                    print(f"[AVISO] Servidor {self.tipo} não encerrou em {TEMPO_ENCERRAMENTO:.0f}s; forçando")
+                    self.sinalizar(signal.SIGKILL)
+                    self.processo.wait()
+            self.sinalizar(signal.SIGKILL)  #Workers órfãos, se houver
+            self.processo = None
+
+        if self.arquivo_log is not None:
+            self.arquivo_log.close()
+            self.arquivo_log = None
+
+    def sinalizar(self, sinal):
+        try:
+            os.killpg(self.processo.pid, sinal)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Testes de carga locais (loopback), sem Docker')
+    parser.add_argument('--servidores', nargs='+', choices=list(MOTORES), default=list(MOTORES),
+                       help='Servidores a testar, um de cada vez')
+    parser.add_argument('--cenarios', nargs='+', choices=[cenario['nome'] for cenario in CENARIOS_TESTE],
+                       default=[cenario['nome'] for cenario in CENARIOS_TESTE],
+                       help='Cenários a executar (rapido, medio, lento)')
+    parser.add_argument('--clientes', type=int, nargs='+', default=[1, 5, 10, 20],
+                       help='Números de clientes simultâneos')
+    parser.add_argument('--requisicoes', type=int, default=5,
+                       help='Requisições por cliente')
+    parser.add_argument('--gerador', choices=['threads', 'asyncio'], default='threads',
+                       help='Gerador de carga: uma thread ou uma corrotina asyncio por cliente')
+    parser.add_argument('--processos', type=int, default=1,
+                       help='Processos geradores de carga')
+    parser.add_argument('--pool-conexoes', action='store_true',
+                       help='Reutilizar conexões keep-alive entre requisições')
+    parser.add_argument('--pipeline', type=int, default=1, metavar='PROFUNDIDADE',
+                       help='Requisições enviadas de uma vez por conexão (pipelining HTTP/1.1)')
+    parser.add_argument('--saida', default=SAIDA_PADRAO,
+                       help='Arquivo JSON com os resultados (lido por analisar_resultados.py)')
+    parser.add_argument('--saida-jsonl', metavar='CAMINHO',
+                       help='Grava cada requisição em um arquivo JSON Lines')
+    parser.add_argument('--workers-prefork', type=int, default=None,
+                       help='Processos worker do servidor prefork (padrão: número de núcleos)')
+    args = parser.parse_args()
+
+    cenarios = [cenario for cenario in CENARIOS_TESTE if cenario['nome'] in args.cenarios]
+    testador = TestadorAutomatizado(usar_pool=args.pool_conexoes, gerador=args.gerador, clientes_teste=args.clientes,
+                                    num_processos=args.processos, saida_jsonl=args.saida_jsonl, cenarios=cenarios,
+                                    requisicoes_por_cliente=args.requisicoes, arquivo_resultados=args.saida,
+                                    profundidade_pipeline=args.pipeline)
+    extras = {'prefork': ['--workers', str(args.workers_prefork)] if args.workers_prefork else []}
+    pasta_logs = os.path.join(os.path.dirname(os.path.abspath(args.saida)), 'logs')
+
+    print("=== Testes Locais (loopback, sem Docker) ===")
+    inicio = time.monotonic()
+    enderecos = {}
+    for tipo in args.servidores:
+        servidor = ServidorLocal(tipo, extras.get(tipo, ()), pasta_logs=pasta_logs)
+        try:
+            tempo_pronto = servidor.iniciar()
+        except (RuntimeError, OSError) as e:
+            print(f"[ERRO] {e} (log em {pasta_logs})")
+            continue
+
+        print(f"\n[OK] Servidor {tipo} pronto em {servidor.host}:{servidor.porta} ({tempo_pronto:.2f}s)")
+        enderecos[tipo] = f"{servidor.host}:{servidor.porta}"
+        try:
+            testador.testar_servidor(tipo, servidor.host, servidor.porta)
+        finally:
+            servidor.parar()
+
+    if not testador.resultados:
+        print("[ERRO] Nenhum servidor foi testado")
+        sys.exit(1)
+
+    testador.finalizar({'ambiente': 'loopback', 'enderecos': enderecos})
+    print(f"\nTempo total: {time.monotonic() - inicio:.1f}s")
+    print(f"Para os gráficos: python3 testes/analisar_resultados.py {args.saida}")
+
+if __name__ == "__main__":
+    main()
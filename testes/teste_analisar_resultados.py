@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+#Testes do analisar_resultados.py com resultados no formato gravado pelo testador/orquestrador local
+#Execução: python3 testes/teste_analisar_resultados.py
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazem_resultados import ArmazemResultados
+from analisar_resultados import ResultsAnalyzer
+
+def resultado_teste(num_clientes, requisicoes_por_cliente=3, tempo_resposta=0.01):
+    #Um teste de teste_concorrente com as requisições em forma colunar
+    armazem = ArmazemResultados()
+    for cliente in range(num_clientes):
+        for sequencia in range(requisicoes_por_cliente):
+            armazem.adicionar({
+                'timestamp': 1700000000.0 + sequencia,
+                'tempo_resposta': tempo_resposta * (1 + cliente),
+                'tempo_conexao': 0.001,
+                'tempo_envio': 0.0001,
+                'tempo_recepcao': 0.002,
+                'codigo_status': 200,
+                'sucesso': True,
+                'id_cliente': f"{cliente}-{sequencia}"
+            })
+    total = num_clientes * requisicoes_por_cliente
+    return {
+        'tempo_total': 1.0,
+        'num_clientes': num_clientes,
+        'requisicoes_por_cliente': requisicoes_por_cliente,
+        'total_requisicoes': total,
+        'estatisticas': {'sucessos': total},
+        'resultados': armazem.para_dict()
+    }
+
+class TesteAnalisarResultados(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta)
+
+    def gravar(self, servidores, cenarios=('rapido',), clientes=(1, 5)):
+        #Mesmo formato de TestadorAutomatizado.salvar_resultados
+        dados = {
+            'metadados': {'data_teste': '2025-01-01T00:00:00', 'ambiente': 'loopback'},
+            'resultados': {
+                servidor: {cenario: {str(n): resultado_teste(n) for n in clientes} for cenario in cenarios}
+                for servidor in servidores
+            }
+        }
+        caminho = os.path.join(self.pasta, 'resultados_testes.json')
+        with open(caminho, 'w') as f:
+            json.dump(dados, f)
+        return caminho
+
+    def relatorio(self):
+        with open(os.path.join(self.pasta, 'performance_report.txt')) as f:
+            return f.read()
+
+    def test_sem_sequencial_e_concorrente(self):
+        #Orquestrador com --servidores eventos assincrono: sem gráficos comparativos, relatório sem erro
+        analisador = ResultsAnalyzer(self.gravar(['eventos', 'assincrono']), jobs=1, dpi=20)
+        analisador.generate_all_plots()
+        analisador.generate_report()
+
+        self.assertFalse(os.path.exists(os.path.join(self.pasta, 'plots', 'response_time_comparison.png')))
+        relatorio = self.relatorio()
+        self.assertIn('servidores testados: asynchronous, event_loop', relatorio)
+        self.assertNotIn('=== CENÁRIO', relatorio)
+
+    def test_so_um_dos_servidores_comparados(self):
+        analisador = ResultsAnalyzer(self.gravar(['sequencial', 'eventos']), jobs=1, dpi=20)
+        analisador.generate_all_plots()
+        analisador.generate_report()
+
+        self.assertIn('servidores testados: event_loop, sequential', self.relatorio())
+
+    def test_sequencial_e_concorrente_com_clientes_diferentes(self):
+        caminho = self.gravar(['sequencial', 'concorrente'], cenarios=('rapido', 'medio'))
+        with open(caminho) as f:
+            dados = json.load(f)
+        #Cenário médio só no sequencial e um número de clientes a mais no concorrente
+        del dados['resultados']['concorrente']['medio']
+        dados['resultados']['concorrente']['rapido']['10'] = resultado_teste(10)
+        with open(caminho, 'w') as f:
+            json.dump(dados, f)
+
+        analisador = ResultsAnalyzer(caminho, jobs=1, dpi=20)
+        analisador.generate_report()
+
+        relatorio = self.relatorio()
+        self.assertIn('=== CENÁRIO: RÁPIDO ===', relatorio)
+        self.assertNotIn('MÉDIO', relatorio)
+        self.assertNotIn('Clientes simultâneos: 10', relatorio)
+
+if __name__ == "__main__":
+    unittest.main()
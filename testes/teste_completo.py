@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 
 #Teste Completo do Projeto Redes II
-#Arquivo único para testar servidores sequencial e concorrente
+#Arquivo único para testar os servidores sequencial, concorrente, assíncrono, pre-fork e de eventos
 #Consolida funcionalidades de teste_cliente.py e testes_automatizados.py
 
 import sys
 import os
 import time
 import json
+import queue
+import asyncio
+import random
 import argparse
 import threading
-import statistics
+import multiprocessing
 from datetime import datetime
 
 #Adicionar diretório src ao path (um nível acima da pasta testes)
@@ -18,18 +21,123 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 try:
     from cliente import ClienteHTTP
-    from configuracao import ID_CUSTOMIZADO, PORTA_SERVIDOR
+    from cliente_assincrono import ClienteHTTPAssincrono, ajustar_limite_descritores
+    from histograma import HistogramaLatencia
+    from gravador_resultados import GravadorJSONL
+    from armazem_resultados import ArmazemResultados
+    from configuracao import (ID_CUSTOMIZADO, PORTA_SERVIDOR, TRABALHADORES_TAXA_CONSTANTE,
+                              INTERVALO_HISTOGRAMA_PROCESSO, TEMPO_BARREIRA_PROCESSOS)
 except ImportError as e:
     print(f"[ERRO] Erro ao importar módulos: {e}")
     print("Certifique-se de estar no diretório correto do projeto")
     sys.exit(1)
 
+PERCENTIS_RELATORIO = (50, 90, 99, 99.9)
+
+class AgregadorResultados:
+    #Resumo incremental dos resultados de um teste, com memória que não cresce com o número de requisições
+    #Latências vão para histogramas HDR (log-linear) e a vazão é contada por segundo de relógio;
+    #tudo é serializável e mesclável (entre processos ou entre execuções)
+    def __init__(self):
+        self.histograma = HistogramaLatencia()
+        self.histograma_corrigido = HistogramaLatencia()  #Latência a partir do horário agendado (malha aberta)
+        self.vazao = {}  #Segundo (epoch) -> respostas com sucesso
+        self.erros = {}
+        self.falhas = 0
+        self.soma_atraso_envio = 0.0
+        self.reutilizadas = 0
+        self.com_pool = False
+    
+    def registrar(self, resultado):
+        if 'conexao_reutilizada' in resultado:
+            self.com_pool = True
+            self.reutilizadas += resultado['conexao_reutilizada']
+        
+        if not resultado['sucesso']:
+            self.falhas += 1
+            erro = resultado.get('erro', 'Erro desconhecido')
+            self.erros[erro] = self.erros.get(erro, 0) + 1
+            return
+        
+        self.histograma.registrar(resultado['tempo_resposta'])
+        if 'latencia_corrigida' in resultado:
+            self.histograma_corrigido.registrar(resultado['latencia_corrigida'])
+            self.soma_atraso_envio += resultado['atraso_envio']
+        segundo = int(resultado['timestamp'])
+        self.vazao[segundo] = self.vazao.get(segundo, 0) + 1
+    
+    def mesclar(self, outro):
+        self.histograma.mesclar(outro.histograma)
+        self.histograma_corrigido.mesclar(outro.histograma_corrigido)
+        for segundo, quantidade in outro.vazao.items():
+            self.vazao[segundo] = self.vazao.get(segundo, 0) + quantidade
+        for erro, quantidade in outro.erros.items():
+            self.erros[erro] = self.erros.get(erro, 0) + quantidade
+        self.falhas += outro.falhas
+        self.soma_atraso_envio += outro.soma_atraso_envio
+        self.reutilizadas += outro.reutilizadas
+        self.com_pool = self.com_pool or outro.com_pool
+        return self
+    
+    @property
+    def total(self):
+        return self.histograma.total + self.falhas
+    
+    def vazao_por_segundo(self):
+        #Série contínua de respostas por segundo desde o primeiro segundo com resposta
+        if not self.vazao:
+            return []
+        inicio = min(self.vazao)
+        return [self.vazao.get(segundo, 0) for segundo in range(inicio, max(self.vazao) + 1)]
+    
+    def para_dict(self):
+        #Forma gravada no resultados_testes.json: resumos prontos e histogramas sem perda para mesclas futuras
+        dados = {
+            'total': self.total,
+            'sucessos': self.histograma.total,
+            'falhas': self.falhas,
+            'erros': self.erros,
+            'resumo': self.histograma.resumo(PERCENTIS_RELATORIO),
+            'histograma': self.histograma.para_dict(),
+            'vazao': {str(segundo): quantidade for segundo, quantidade in self.vazao.items()},
+            'vazao_por_segundo': self.vazao_por_segundo()
+        }
+        if self.histograma_corrigido.total:
+            dados['resumo_corrigido'] = self.histograma_corrigido.resumo(PERCENTIS_RELATORIO)
+            dados['histograma_corrigido'] = self.histograma_corrigido.para_dict()
+            dados['soma_atraso_envio'] = self.soma_atraso_envio
+        if self.com_pool:
+            dados['reutilizadas'] = self.reutilizadas
+        return dados
+    
+    @classmethod
+    def de_dict(cls, dados):
+        agregador = cls()
+        agregador.histograma = HistogramaLatencia.de_dict(dados['histograma'])
+        if 'histograma_corrigido' in dados:
+            agregador.histograma_corrigido = HistogramaLatencia.de_dict(dados['histograma_corrigido'])
+            agregador.soma_atraso_envio = dados['soma_atraso_envio']
+        agregador.vazao = {int(segundo): quantidade for segundo, quantidade in dados['vazao'].items()}
+        agregador.erros = dict(dados['erros'])
+        agregador.falhas = dados['falhas']
+        agregador.com_pool = 'reutilizadas' in dados
+        agregador.reutilizadas = dados.get('reutilizadas', 0)
+        return agregador
+
 class TestadorCarga:
     #Classe para executar testes de carga e concorrencia
-    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR):
-        self.cliente = ClienteHTTP(host_servidor, porta_servidor)
-        self.resultados = []
+    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR, usar_pool=False, gravador=None,
+                 profundidade_pipeline=1):
+        self.cliente = ClienteHTTP(host_servidor, porta_servidor, usar_pool)
+        #Requisições enviadas de uma vez na mesma conexão (1 = sem pipelining)
+        self.profundidade_pipeline = max(1, profundidade_pipeline)
+        self.resultados = ArmazemResultados()
+        self.agregador = AgregadorResultados()
         self.lock = threading.Lock()
+        #Resultados por requisição ficam em colunas compactas; com um gravador vão direto para o arquivo
+        #e self.resultados fica vazio (memória constante)
+        self.gravador = gravador
+        self.contexto = {}  #Campos acrescentados a cada linha gravada (servidor, cenário, clientes...)
         
     def teste_requisicao_unica(self, metodo='GET', caminho='/', id_cliente=None):
         #Executa um único teste de requisição
@@ -37,21 +145,54 @@ class TestadorCarga:
         resultado['id_cliente'] = id_cliente
         resultado['timestamp'] = time.time()
         
-        with self.lock:
-            self.resultados.append(resultado)
+        self.registrar_resultado(resultado)
         
         return resultado
     
+    def teste_pipeline(self, metodo='GET', caminho='/', quantidade=1, id_cliente=None, primeira=0):
+        #Envia um lote de requisições em pipeline e registra cada resposta
+        resultados = self.cliente.enviar_pipeline([caminho] * quantidade, metodo)
+        agora = time.time()
+        for posicao, resultado in enumerate(resultados):
+            resultado['id_cliente'] = f"{id_cliente}-{primeira + posicao}"
+            resultado['timestamp'] = agora
+            self.registrar_resultado(resultado)
+        
+        return resultados
+    
+    def registrar_resultado(self, resultado):
+        #Destino de todo resultado: agregado sempre, guardado em memória só sem gravador
+        with self.lock:
+            self.agregador.registrar(resultado)
+            if self.gravador is None:
+                self.resultados.adicionar(resultado)
+        if self.gravador is not None:
+            self.gravador.registrar(resultado, self.contexto)
+    
+    def finalizar_teste(self):
+        #Grava o que ficou no lote para o arquivo refletir o teste inteiro
+        if self.gravador is not None:
+            self.gravador.descarregar()
+    
     def teste_concorrente(self, num_clientes, requisicoes_por_cliente, metodo='GET', caminho='/'):
         #Executa teste com múltiplos clientes simultâneos
         threads = []
-        self.resultados = []
+        self.resultados = ArmazemResultados()
+        self.agregador = AgregadorResultados()
         
-        print(f"Iniciando teste com {num_clientes} clientes, {requisicoes_por_cliente} requisições cada")
+        print(f"Iniciando teste com {num_clientes} clientes, {requisicoes_por_cliente} requisições cada"
+              + (f" (pipeline de {self.profundidade_pipeline})" if self.profundidade_pipeline > 1 else ""))
         
         tempo_inicio = time.time()
         
         def executar_cliente(id_cliente):
+            if self.profundidade_pipeline > 1:
+                for primeira in range(0, requisicoes_por_cliente, self.profundidade_pipeline):
+                    quantidade = min(self.profundidade_pipeline, requisicoes_por_cliente - primeira)
+                    self.teste_pipeline(metodo, caminho, quantidade, id_cliente, primeira)
+                    time.sleep(0.01)  #Pequeno delay entre lotes
+                return
+            
             for i in range(requisicoes_por_cliente):
                 self.teste_requisicao_unica(metodo, caminho, f"{id_cliente}-{i}")
                 time.sleep(0.01)  #Pequeno delay entre requisições
@@ -67,157 +208,568 @@ class TestadorCarga:
             thread.join()
         
         tempo_total = time.time() - tempo_inicio
+        self.finalizar_teste()
         
         return {
             'tempo_total': tempo_total,
             'num_clientes': num_clientes,
             'requisicoes_por_cliente': requisicoes_por_cliente,
-            'total_requisicoes': len(self.resultados),
+            'profundidade_pipeline': self.profundidade_pipeline,
+            'total_requisicoes': self.agregador.total,
+            'estatisticas': self.agregador.para_dict(),
             'resultados': self.resultados
         }
     
-    def gerar_relatorio(self, resultado_teste):
-        #Gera relatório detalhado do teste
-        resultados = resultado_teste['resultados']
-        sucessos = [r for r in resultados if r['sucesso']]
-        falhas = [r for r in resultados if not r['sucesso']]
-        
-        if sucessos:
-            tempos_resposta = [r['tempo_resposta'] for r in sucessos]
-            tempo_medio = statistics.mean(tempos_resposta)
-            tempo_min = min(tempos_resposta)
-            tempo_max = max(tempos_resposta)
-            tempo_mediano = statistics.median(tempos_resposta)
-        else:
-            tempo_medio = tempo_min = tempo_max = tempo_mediano = 0
+    def teste_taxa_constante(self, taxa, duracao, metodo='GET', caminho='/', distribuicao='poisson',
+                             num_trabalhadores=TRABALHADORES_TAXA_CONSTANTE):
+        #Executa teste em malha aberta: as requisições saem em horários agendados, sem esperar as anteriores
+        #A latência é medida a partir do horário agendado (correção de omissão coordenada), então
+        #a espera causada por um servidor lento entra na medida em vez de reduzir a carga oferecida
+        if taxa <= 0 or duracao <= 0:
+            #expovariate(0) divide por zero e taxa negativa geraria intervalos negativos (laço sem fim)
+            raise ValueError(f"Taxa e duração devem ser positivas (taxa={taxa}, duracao={duracao})")
+        self.resultados = ArmazemResultados()
+        self.agregador = AgregadorResultados()
+        
+        print(f"Iniciando teste em malha aberta: {taxa:.1f} req/s por {duracao:.1f}s ({distribuicao}, "
+              f"{num_trabalhadores} trabalhadores)")
+        
+        #Agenda gerada sob demanda: chegadas com intervalos exponenciais (Poisson) ou fixos até a duração
+        tempo_inicio = time.monotonic() + 0.1
+        agenda = {'proximo': 0, 'instante': 0.0}
+        envios = {'quantidade': 0, 'ultimo': tempo_inicio}
+        lock_agenda = threading.Lock()
+        
+        def proximo_agendamento():
+            with lock_agenda:
+                if agenda['instante'] >= duracao:
+                    return None, None
+                indice = agenda['proximo']
+                agendado = tempo_inicio + agenda['instante']
+                agenda['proximo'] += 1
+                agenda['instante'] += random.expovariate(taxa) if distribuicao == 'poisson' else 1.0 / taxa
+                return indice, agendado
+        
+        def executar_trabalhador():
+            while True:
+                indice, agendado = proximo_agendamento()
+                if indice is None:
+                    return
+                
+                espera = agendado - time.monotonic()
+                if espera > 0:
+                    time.sleep(espera)
+                
+                envio = time.monotonic()
+                resultado = self.cliente.enviar_requisicao(metodo, caminho)
+                fim = time.monotonic()
+                
+                resultado['id_cliente'] = f"aberto-{indice}"
+                resultado['timestamp'] = time.time()
+                resultado['atraso_envio'] = max(0.0, envio - agendado)
+                resultado['latencia_corrigida'] = fim - agendado
+                
+                self.registrar_resultado(resultado)
+                with lock_agenda:
+                    envios['quantidade'] += 1
+                    envios['ultimo'] = max(envios['ultimo'], envio)
+        
+        threads = [threading.Thread(target=executar_trabalhador, daemon=True)
+                   for _ in range(max(1, min(num_trabalhadores, int(taxa * duracao))))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        tempo_total = time.monotonic() - tempo_inicio
+        self.finalizar_teste()
         
-        throughput = len(sucessos) / resultado_teste['tempo_total'] if resultado_teste['tempo_total'] > 0 else 0
+        #Taxa de envio efetiva: se o gerador atrasar, a janela de envio passa da duração agendada
+        janela_envio = max(duracao, envios['ultimo'] - tempo_inicio)
+        taxa_envio = envios['quantidade'] / janela_envio if janela_envio > 0 else 0
         
-        print(f"\n[RELATÓRIO]")
-        print(f"Total de requisições: {len(resultados)}")
-        print(f"Sucessos: {len(sucessos)}")
-        print(f"Falhas: {len(falhas)}")
-        print(f"Taxa de sucesso: {(len(sucessos)/len(resultados)*100):.1f}%")
+        return {
+            'modo': 'aberto',
+            'tempo_total': tempo_total,
+            'taxa_alvo': taxa,
+            'taxa_envio': taxa_envio,
+            'duracao': duracao,
+            'distribuicao': distribuicao,
+            'num_trabalhadores': num_trabalhadores,
+            'total_requisicoes': self.agregador.total,
+            'estatisticas': self.agregador.para_dict(),
+            'resultados': self.resultados
+        }
+    
+    def gerar_relatorio(self, resultado_teste):
+        #Gera relatório detalhado do teste a partir dos histogramas (percentis de cauda e vazão ao longo do tempo)
+        agregador = AgregadorResultados.de_dict(resultado_teste['estatisticas'])
+        histograma = agregador.histograma
+        total = agregador.total
+        throughput = histograma.total / resultado_teste['tempo_total'] if resultado_teste['tempo_total'] > 0 else 0
+        
+        if 'processos' in resultado_teste:
+            print(f"\n[RELATÓRIO] ({resultado_teste['processos']} processos)")
+        else:
+            print(f"\n[RELATÓRIO]")
+        print(f"Total de requisições: {total}")
+        print(f"Sucessos: {histograma.total}")
+        print(f"Falhas: {agregador.falhas}")
+        print(f"Taxa de sucesso: {(histograma.total / total * 100 if total else 0):.1f}%")
         print(f"Tempo total: {resultado_teste['tempo_total']:.2f}s")
         print(f"Throughput: {throughput:.2f} req/s")
+        if resultado_teste.get('profundidade_pipeline', 1) > 1:
+            print(f"Pipeline: {resultado_teste['profundidade_pipeline']} requisições por lote")
+        
+        if histograma.total:
+            self.imprimir_latencias("Tempo de resposta", histograma)
+            
+            vazao = agregador.vazao_por_segundo()
+            if len(vazao) > 1:
+                print(f"Vazão por segundo: mín {min(vazao)}, máx {max(vazao)} req/s")
+                print(f"  {' '.join(str(quantidade) for quantidade in vazao[:60])}{' ...' if len(vazao) > 60 else ''}")
         
-        if sucessos:
-            print(f"Tempo de resposta médio: {tempo_medio:.4f}s")
-            print(f"Tempo de resposta mínimo: {tempo_min:.4f}s")
-            print(f"Tempo de resposta máximo: {tempo_max:.4f}s")
-            print(f"Tempo de resposta mediano: {tempo_mediano:.4f}s")
+        for erro, quantidade in agregador.erros.items():
+            print(f"  [ERRO] {quantidade}x {erro}")
+        
+        #Teste em malha aberta: taxa alcançada x alvo e latência a partir do horário agendado
+        if 'taxa_alvo' in resultado_teste:
+            print(f"Taxa alvo: {resultado_teste['taxa_alvo']:.2f} req/s")
+            print(f"Taxa de envio alcançada: {resultado_teste['taxa_envio']:.2f} req/s")
+            if histograma.total:
+                atraso_envio = agregador.soma_atraso_envio / histograma.total
+                if atraso_envio > 1.0 / resultado_teste['taxa_alvo']:
+                    print(f"[AVISO] Gerador atrasou os envios em média {atraso_envio:.4f}s (aumente --trabalhadores)")
+                self.imprimir_latencias("Latência corrigida", agregador.histograma_corrigido)
+                print(f"Atraso médio de envio: {atraso_envio:.4f}s")
+        
+        #Custo do próprio gerador de carga (modo --gerador asyncio)
+        if 'cpu_por_requisicao' in resultado_teste:
+            print(f"CPU do gerador por requisição: {resultado_teste['cpu_por_requisicao'] * 1000000:.1f}µs")
+        
+        #Estatísticas do pool de conexões do cliente (modo --pool-conexoes)
+        if agregador.com_pool:
+            print(f"Conexões reutilizadas: {agregador.reutilizadas}/{total}")
+    
+    def imprimir_latencias(self, titulo, histograma):
+        #Média e percentis de cauda de um histograma
+        resumo = histograma.resumo(PERCENTIS_RELATORIO)
+        print(f"{titulo}: média {resumo['media']:.4f}s, mínimo {resumo['minimo']:.4f}s, "
+              f"máximo {resumo['maximo']:.4f}s")
+        print(f"{titulo} (percentis): p50 {resumo['p50']:.4f}s, p90 {resumo['p90']:.4f}s, "
+              f"p99 {resumo['p99']:.4f}s, p99.9 {resumo['p99_9']:.4f}s")
+
+class TestadorCargaAssincrono(TestadorCarga):
+    #Mesmos testes de TestadorCarga, mas cada cliente simulado é uma corrotina em vez de uma thread
+    #Com isso um único processo sustenta milhares de conexões simultâneas
+    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR, usar_pool=False, gravador=None,
+                 manter_corpo=False, profundidade_pipeline=1):
+        super().__init__(host_servidor, porta_servidor, usar_pool, gravador, profundidade_pipeline)
+        self.host_servidor = host_servidor
+        self.porta_servidor = porta_servidor
+        self.usar_pool = usar_pool
+        self.manter_corpo = manter_corpo
+    
+    def teste_concorrente(self, num_clientes, requisicoes_por_cliente, metodo='GET', caminho='/'):
+        #Executa teste com múltiplos clientes simultâneos em um laço de eventos
+        self.resultados = ArmazemResultados()
+        self.agregador = AgregadorResultados()
+        
+        print(f"Iniciando teste assíncrono com {num_clientes} clientes, {requisicoes_por_cliente} requisições cada"
+              + (f" (pipeline de {self.profundidade_pipeline})" if self.profundidade_pipeline > 1 else ""))
+        
+        #Uma conexão por cliente mais folga para o próprio processo
+        limite = ajustar_limite_descritores(num_clientes + 64)
+        if limite < num_clientes + 64:
+            print(f"[AVISO] Limite de arquivos abertos ({limite}) menor que o número de clientes")
+        
+        return asyncio.run(self.executar_clientes(num_clientes, requisicoes_por_cliente, metodo, caminho))
+    
+    async def executar_clientes(self, num_clientes, requisicoes_por_cliente, metodo, caminho):
+        #Os bytes da requisição são montados uma vez e compartilhados por todos os clientes
+        modelo = ClienteHTTPAssincrono(self.host_servidor, self.porta_servidor, self.usar_pool)
+        requisicao = modelo.montar_requisicao(metodo, caminho)
+        #Em pipeline todas as requisições do lote mantêm a conexão; só a última segue o modo do cliente
+        requisicao_lote = modelo.montar_requisicao(metodo, caminho, persistente=True)
+        
+        async def executar_lotes(cliente, id_cliente):
+            for primeira in range(0, requisicoes_por_cliente, self.profundidade_pipeline):
+                quantidade = min(self.profundidade_pipeline, requisicoes_por_cliente - primeira)
+                lote = [requisicao_lote] * (quantidade - 1) + [requisicao]
+                resultados = await cliente.enviar_pipeline(lote, metodo)
+                agora = time.time()
+                for posicao, resultado in enumerate(resultados):
+                    resultado['id_cliente'] = f"{id_cliente}-{primeira + posicao}"
+                    resultado['timestamp'] = agora
+                    self.registrar_resultado(resultado)
+                await asyncio.sleep(0.01)  #Pequeno delay entre lotes
+        
+        async def executar_cliente(id_cliente):
+            cliente = ClienteHTTPAssincrono(self.host_servidor, self.porta_servidor, self.usar_pool,
+                                            manter_corpo=self.manter_corpo)
+            if self.profundidade_pipeline > 1:
+                await executar_lotes(cliente, id_cliente)
+                cliente.fechar()
+                return
+            
+            for i in range(requisicoes_por_cliente):
+                resultado = await cliente.enviar_requisicao(requisicao=requisicao)
+                resultado['id_cliente'] = f"{id_cliente}-{i}"
+                resultado['timestamp'] = time.time()
+                self.registrar_resultado(resultado)
+                await asyncio.sleep(0.01)  #Pequeno delay entre requisições
+            cliente.fechar()
+        
+        tempo_inicio = time.time()
+        cpu_inicio = time.process_time()
+        
+        await asyncio.gather(*(executar_cliente(i) for i in range(num_clientes)))
+        
+        tempo_total = time.time() - tempo_inicio
+        cpu_total = time.process_time() - cpu_inicio
+        self.finalizar_teste()
+        
+        return {
+            'gerador': 'asyncio',
+            'tempo_total': tempo_total,
+            'num_clientes': num_clientes,
+            'requisicoes_por_cliente': requisicoes_por_cliente,
+            'profundidade_pipeline': self.profundidade_pipeline,
+            'total_requisicoes': self.agregador.total,
+            'cpu_por_requisicao': cpu_total / self.agregador.total if self.agregador.total else 0,
+            'estatisticas': self.agregador.para_dict(),
+            'resultados': self.resultados
+        }
+
+class EncaminhadorParcial:
+    #Gravador usado nos processos filhos: acumula um agregado parcial que o transmissor troca e envia ao pai
+    #Se houver arquivo de saída, cada resultado também segue para ele (todos os processos acrescentam no mesmo)
+    def __init__(self, destino=None):
+        self.lock = threading.Lock()
+        self.parcial = AgregadorResultados()
+        self.destino = destino
+    
+    def registrar(self, resultado, contexto=None):
+        with self.lock:
+            self.parcial.registrar(resultado)
+        if self.destino is not None:
+            self.destino.registrar(resultado, contexto)
+    
+    def retirar(self):
+        with self.lock:
+            parcial, self.parcial = self.parcial, AgregadorResultados()
+        return parcial
+    
+    def descarregar(self):
+        if self.destino is not None:
+            self.destino.descarregar()
+
+def executar_processo_carga(host_servidor, porta_servidor, usar_pool, gerador, num_clientes,
+                            requisicoes_por_cliente, metodo, caminho, barreira, fila, saida=None, contexto=None,
+                            profundidade_pipeline=1):
+    #Processo filho: roda sua parte dos clientes e envia agregados parciais ao pai a cada intervalo
+    #Só os histogramas atravessam a fila, então o custo de comunicação não cresce com as requisições
+    destino = GravadorJSONL(saida[0], manter_corpo=saida[1]) if saida else None
+    encaminhador = EncaminhadorParcial(destino)
+    testador = criar_testador(host_servidor, porta_servidor, usar_pool, gerador, gravador=encaminhador,
+                              profundidade_pipeline=profundidade_pipeline)
+    testador.contexto = contexto or {}
+    terminou = threading.Event()
+    
+    def enviar_parcial():
+        fila.put(('parcial', encaminhador.retirar().para_dict()))
+    
+    def transmitir():
+        while not terminou.wait(INTERVALO_HISTOGRAMA_PROCESSO):
+            enviar_parcial()
+    
+    #Todos os processos começam juntos para a carga subir ao mesmo tempo
+    #(barreira quebrada: o pai ou outro processo desistiu, então este não gera carga)
+    try:
+        barreira.wait(TEMPO_BARREIRA_PROCESSOS)
+    except threading.BrokenBarrierError:
+        return
+    transmissor = threading.Thread(target=transmitir, daemon=True)
+    transmissor.start()
+    
+    testador.teste_concorrente(num_clientes, requisicoes_por_cliente, metodo, caminho)
+    
+    terminou.set()
+    transmissor.join()
+    enviar_parcial()
+    if destino is not None:
+        destino.fechar()
+    fila.put(('fim', None))
+
+class TestadorCargaMultiprocesso(TestadorCarga):
+    #Divide os clientes entre vários processos (um núcleo cada) e mescla os histogramas de latência
+    #A mescla é exata: os processos usam os mesmos buckets, então os percentis não são médias de percentis
+    def __init__(self, host_servidor, porta_servidor=PORTA_SERVIDOR, usar_pool=False, gerador='threads',
+                 num_processos=None, gravador=None, profundidade_pipeline=1):
+        super().__init__(host_servidor, porta_servidor, usar_pool, gravador, profundidade_pipeline)
+        self.host_servidor = host_servidor
+        self.porta_servidor = porta_servidor
+        self.usar_pool = usar_pool
+        self.gerador = gerador
+        self.num_processos = num_processos or os.cpu_count() or 1
+    
+    def teste_concorrente(self, num_clientes, requisicoes_por_cliente, metodo='GET', caminho='/'):
+        #Executa teste com múltiplos clientes simultâneos espalhados entre os processos
+        num_processos = max(1, min(self.num_processos, num_clientes))
+        base, resto = divmod(num_clientes, num_processos)
+        
+        print(f"Iniciando teste com {num_clientes} clientes em {num_processos} processos "
+              f"({self.gerador}), {requisicoes_por_cliente} requisições cada")
+        
+        #Os filhos gravam direto no arquivo; o lote pendente do pai vai antes para não ser herdado no fork
+        saida = None
+        if self.gravador is not None:
+            self.gravador.descarregar()
+            saida = (self.gravador.caminho, self.gravador.manter_corpo)
+        
+        barreira = multiprocessing.Barrier(num_processos + 1)
+        fila = multiprocessing.Queue()
+        processos = []
+        for i in range(num_processos):
+            clientes_processo = base + (1 if i < resto else 0)
+            processo = multiprocessing.Process(
+                target=executar_processo_carga,
+                args=(self.host_servidor, self.porta_servidor, self.usar_pool, self.gerador, clientes_processo,
+                      requisicoes_por_cliente, metodo, caminho, barreira, fila, saida, self.contexto,
+                      self.profundidade_pipeline),
+                daemon=True
+            )
+            processo.start()
+            processos.append(processo)
+        
+        agregador = AgregadorResultados()
+        em_andamento = num_processos
+        try:
+            barreira.wait(TEMPO_BARREIRA_PROCESSOS)
+        except threading.BrokenBarrierError:
+            #Algum filho morreu (ou travou) antes da largada: nenhum deles gera carga
+            print(f"[ERRO] Processos de carga não chegaram à largada em {TEMPO_BARREIRA_PROCESSOS}s")
+            self.relatar_processos(processos)
+            for processo in processos:
+                processo.terminate()
+            em_andamento = 0
+        tempo_inicio = time.time()
+        
+        #Mescla os agregados parciais conforme chegam, até todos os processos avisarem o fim
+        while em_andamento:
+            try:
+                tipo, dados_parciais = fila.get(timeout=1)
+            except queue.Empty:
+                if not any(processo.is_alive() for processo in processos):
+                    print("[ERRO] Processos de carga terminaram sem enviar o resultado final")
+                    self.relatar_processos(processos)
+                    break
+                continue
+            
+            if tipo == 'fim':
+                em_andamento -= 1
+                continue
+            agregador.mesclar(AgregadorResultados.de_dict(dados_parciais))
+        
+        tempo_total = time.time() - tempo_inicio
+        
+        for processo in processos:
+            processo.join()
+        
+        return {
+            'gerador': self.gerador,
+            'processos': num_processos,
+            'tempo_total': tempo_total,
+            'num_clientes': num_clientes,
+            'requisicoes_por_cliente': requisicoes_por_cliente,
+            'profundidade_pipeline': self.profundidade_pipeline,
+            'total_requisicoes': agregador.total,
+            'estatisticas': agregador.para_dict(),
+            'resultados': ArmazemResultados()  #Os filhos só enviam agregados
+        }
+    
+    def relatar_processos(self, processos):
+        #Mostra os processos de carga que terminaram com erro
+        for i, processo in enumerate(processos):
+            if not processo.is_alive() and processo.exitcode != 0:
+                print(f"  processo {i} (pid {processo.pid}) terminou com código {processo.exitcode}")
+
+def criar_testador(host_servidor, porta_servidor=PORTA_SERVIDOR, usar_pool=False, gerador='threads',
+                   num_processos=1, gravador=None, profundidade_pipeline=1):
+    #Escolhe o gerador de carga: uma thread ou uma corrotina por cliente, em um ou vários processos
+    if num_processos > 1:
+        return TestadorCargaMultiprocesso(host_servidor, porta_servidor, usar_pool, gerador, num_processos, gravador,
+                                          profundidade_pipeline)
+    if gerador == 'asyncio':
+        return TestadorCargaAssincrono(host_servidor, porta_servidor, usar_pool, gravador,
+                                       profundidade_pipeline=profundidade_pipeline)
+    return TestadorCarga(host_servidor, porta_servidor, usar_pool, gravador, profundidade_pipeline)
+
+def serializar_json(objeto):
+    #Resultados por requisição são gravados em forma colunar (uma lista por campo)
+    if isinstance(objeto, ArmazemResultados):
+        return objeto.para_dict()
+    raise TypeError(f"Objeto não serializável: {type(objeto).__name__}")
+
+#Endereços dos servidores (baseado no docker-compose)
+SERVIDORES_DOCKER = {
+    'sequencial': ('76.1.0.10', PORTA_SERVIDOR),
+    'concorrente': ('76.1.0.11', PORTA_SERVIDOR),
+    'assincrono': ('76.1.0.12', PORTA_SERVIDOR),
+    'prefork': ('76.1.0.13', PORTA_SERVIDOR),
+    'eventos': ('76.1.0.14', PORTA_SERVIDOR)
+}
+
+#Diferentes cenários de teste
+CENARIOS_TESTE = [
+    {'nome': 'rapido', 'caminho': '/rapido', 'descricao': 'Processamento rápido'},
+    {'nome': 'medio', 'caminho': '/medio', 'descricao': 'Processamento médio (0.5s)'},
+    {'nome': 'lento', 'caminho': '/lento', 'descricao': 'Processamento lento (2s)'},
+]
+
+ARQUIVO_RESULTADOS = '/app/resultados/resultados_testes.json'
 
 class TestadorAutomatizado:
     #Classe para executar testes automatizados
-    def __init__(self):
+    def __init__(self, usar_pool=False, gerador='threads', clientes_teste=None, num_processos=1,
+                 saida_jsonl=None, manter_corpo=False, servidores=None, cenarios=None,
+                 requisicoes_por_cliente=5, arquivo_resultados=ARQUIVO_RESULTADOS, profundidade_pipeline=1):
         self.resultados = {}
+        self.usar_pool = usar_pool
+        self.gerador = gerador
+        self.num_processos = num_processos
+        self.clientes_teste = clientes_teste or [1, 5, 10, 20]
+        self.servidores = servidores or SERVIDORES_DOCKER  #Tipo -> (host, porta)
+        self.cenarios = cenarios or CENARIOS_TESTE
+        self.requisicoes_por_cliente = requisicoes_por_cliente
+        self.profundidade_pipeline = profundidade_pipeline
+        self.arquivo_resultados = arquivo_resultados
+        #Com saída JSONL cada requisição é gravada ao terminar e o JSON final guarda só os agregados
+        self.gravador = GravadorJSONL(saida_jsonl, manter_corpo) if saida_jsonl else None
         
     def executar_todos_testes(self):
         #Executa todos os testes automatizados
         print("=== Iniciando Testes Automatizados ===")
         print(f"Data/Hora: {datetime.now()}")
         
-        #Endereços dos servidores (baseado no docker-compose)
-        servidores = {
-            'sequencial': '76.1.0.10',
-            'concorrente': '76.1.0.11'
-        }
-        
-        #Diferentes cenários de teste
-        cenarios_teste = [
-            {'nome': 'rapido', 'caminho': '/rapido', 'descricao': 'Processamento rápido'},
-            {'nome': 'medio', 'caminho': '/medio', 'descricao': 'Processamento médio (0.5s)'},
-            {'nome': 'lento', 'caminho': '/lento', 'descricao': 'Processamento lento (2s)'},
-        ]
+        for tipo_servidor, (host_servidor, porta_servidor) in self.servidores.items():
+            self.testar_servidor(tipo_servidor, host_servidor, porta_servidor)
         
-        #Configurações de teste
-        clientes_teste = [1, 5, 10, 20]
-        requisicoes_por_cliente = 5
+        self.finalizar()
+    
+    def testar_servidor(self, tipo_servidor, host_servidor, porta_servidor=PORTA_SERVIDOR):
+        #Executa a matriz de cenários x número de clientes contra um servidor
+        print(f"\n=== Testando Servidor {tipo_servidor.upper()} ({host_servidor}:{porta_servidor}) ===")
+        self.resultados[tipo_servidor] = {}
         
-        for tipo_servidor, ip_servidor in servidores.items():
-            print(f"\n=== Testando Servidor {tipo_servidor.upper()} ({ip_servidor}) ===")
-            self.resultados[tipo_servidor] = {}
+        for cenario in self.cenarios:
+            print(f"\n--- Cenário: {cenario['descricao']} ---")
+            self.resultados[tipo_servidor][cenario['nome']] = {}
             
-            for cenario in cenarios_teste:
-                print(f"\n--- Cenário: {cenario['descricao']} ---")
-                self.resultados[tipo_servidor][cenario['nome']] = {}
+            for num_clientes in self.clientes_teste:
+                print(f"\nTestando com {num_clientes} clientes simultâneos...")
                 
-                for num_clientes in clientes_teste:
-                    print(f"\nTestando com {num_clientes} clientes simultâneos...")
-                    
-                    testador = TestadorCarga(ip_servidor)
-                    resultado = testador.teste_concorrente(
-                        num_clientes, 
-                        requisicoes_por_cliente,
-                        'GET',
-                        cenario['caminho']
-                    )
-                    
-                    self.resultados[tipo_servidor][cenario['nome']][num_clientes] = resultado
-                    testador.gerar_relatorio(resultado)
+                testador = criar_testador(host_servidor, porta_servidor, usar_pool=self.usar_pool,
+                                          gerador=self.gerador, num_processos=self.num_processos,
+                                          gravador=self.gravador, profundidade_pipeline=self.profundidade_pipeline)
+                testador.contexto = {'servidor': tipo_servidor, 'cenario': cenario['nome'],
+                                     'num_clientes': num_clientes}
+                resultado = testador.teste_concorrente(
+                    num_clientes, 
+                    self.requisicoes_por_cliente,
+                    'GET',
+                    cenario['caminho']
+                )
+                
+                self.resultados[tipo_servidor][cenario['nome']][num_clientes] = resultado
+                testador.gerar_relatorio(resultado)
+    
+    def finalizar(self, metadados_extras=None):
+        #Fecha o arquivo JSONL, salva o JSON agregado e imprime a comparação
+        if self.gravador is not None:
+            self.gravador.fechar()
+            print(f"\n[SUCESSO] {self.gravador.gravados} requisições gravadas em {self.gravador.caminho}")
         
-        self.salvar_resultados()
+        self.salvar_resultados(metadados_extras)
         self.gerar_comparacao()
     
-    def salvar_resultados(self):
+    def salvar_resultados(self, metadados_extras=None):
         #Salva os resultados em arquivo JSON
         resultados_com_metadados = {
             'metadados': {
                 'data_teste': datetime.now().isoformat(),
                 'id_personalizado': ID_CUSTOMIZADO,
-                'versao_teste': '2.0'
+                'versao_teste': '2.0',
+                'profundidade_pipeline': self.profundidade_pipeline
             },
             'resultados': self.resultados
         }
+        if self.gravador is not None:
+            resultados_com_metadados['metadados']['arquivo_requisicoes'] = self.gravador.caminho
+        if metadados_extras:
+            resultados_com_metadados['metadados'].update(metadados_extras)
         
         #Salvar resultados
-        os.makedirs('/app/resultados', exist_ok=True)
-        with open('/app/resultados/resultados_testes.json', 'w') as f:
-            json.dump(resultados_com_metadados, f, indent=2)
+        pasta = os.path.dirname(self.arquivo_resultados)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(self.arquivo_resultados, 'w') as f:
+            json.dump(resultados_com_metadados, f, indent=2, default=serializar_json)
         
-        print(f"\n[SUCESSO] Resultados salvos em /app/resultados/resultados_testes.json")
+        print(f"\n[SUCESSO] Resultados salvos em {self.arquivo_resultados}")
     
     def gerar_comparacao(self):
         #Gera comparação entre servidores
         print("\n=== COMPARAÇÃO ENTRE SERVIDORES ===")
         
-        if 'sequencial' in self.resultados and 'concorrente' in self.resultados:
-            for cenario in ['rapido', 'medio', 'lento']:
-                if cenario in self.resultados['sequencial'] and cenario in self.resultados['concorrente']:
-                    print(f"\n--- Cenário: {cenario} ---")
+        if 'sequencial' not in self.resultados:
+            return
+        
+        #Servidores comparados com o sequencial (referência)
+        outros_servidores = [tipo for tipo in self.resultados if tipo != 'sequencial']
+        
+        for cenario in ['rapido', 'medio', 'lento']:
+            if cenario not in self.resultados['sequencial']:
+                continue
+            
+            print(f"\n--- Cenário: {cenario} ---")
+            
+            for num_clientes in self.clientes_teste:
+                if num_clientes not in self.resultados['sequencial'][cenario]:
+                    continue
+                
+                seq_throughput = self.calcular_throughput(self.resultados['sequencial'][cenario][num_clientes])
+                
+                print(f"  {num_clientes} clientes:")
+                print(f"    Sequencial: {seq_throughput:.2f} req/s")
+                
+                for tipo_servidor in outros_servidores:
+                    if num_clientes not in self.resultados[tipo_servidor].get(cenario, {}):
+                        continue
+                    
+                    throughput = self.calcular_throughput(self.resultados[tipo_servidor][cenario][num_clientes])
+                    print(f"    {tipo_servidor.title()}: {throughput:.2f} req/s")
                     
-                    for num_clientes in [1, 5, 10, 20]:
-                        if (num_clientes in self.resultados['sequencial'][cenario] and 
-                            num_clientes in self.resultados['concorrente'][cenario]):
-                            
-                            seq = self.resultados['sequencial'][cenario][num_clientes]
-                            conc = self.resultados['concorrente'][cenario][num_clientes]
-                            
-                            seq_sucessos = len([r for r in seq['resultados'] if r['sucesso']])
-                            conc_sucessos = len([r for r in conc['resultados'] if r['sucesso']])
-                            
-                            seq_throughput = seq_sucessos / seq['tempo_total'] if seq['tempo_total'] > 0 else 0
-                            conc_throughput = conc_sucessos / conc['tempo_total'] if conc['tempo_total'] > 0 else 0
-                            
-                            print(f"  {num_clientes} clientes:")
-                            print(f"    Sequencial: {seq_throughput:.2f} req/s")
-                            print(f"    Concorrente: {conc_throughput:.2f} req/s")
-                            
-                            if seq_throughput > 0:
-                                melhoria = ((conc_throughput - seq_throughput) / seq_throughput) * 100
-                                print(f"    Melhoria: {melhoria:.1f}%")
+                    if seq_throughput > 0:
+                        melhoria = ((throughput - seq_throughput) / seq_throughput) * 100
+                        print(f"    Melhoria ({tipo_servidor}): {melhoria:.1f}%")
+    
+    def calcular_throughput(self, resultado):
+        #Calcula o throughput (req/s) de um teste
+        sucessos = resultado['estatisticas']['sucessos']
+        return sucessos / resultado['tempo_total'] if resultado['tempo_total'] > 0 else 0
 
 class TestadorProjeto:
     #Classe principal para testes do projeto
     
     def __init__(self):
-        self.servidores_docker = {
-            'sequencial': '76.1.0.10',
-            'concorrente': '76.1.0.11'
-        }
+        self.servidores_docker = {tipo: host for tipo, (host, _) in SERVIDORES_DOCKER.items()}
         self.servidores_local = {
             'sequencial': 'localhost:8080',
-            'concorrente': 'localhost:8081'
+            'concorrente': 'localhost:8081',
+            'assincrono': 'localhost:8082',
+            'prefork': 'localhost:8083',
+            'eventos': 'localhost:8084'
         }
     
     def detectar_ambiente(self):
@@ -317,10 +869,10 @@ class TestadorProjeto:
             resultado = cliente.enviar_requisicao('GET', '/')
             
             if resultado['sucesso']:
-                cabecalhos = resultado.get('cabecalhos', {})
-                if 'X-Custom-ID' in cabecalhos:
-                    print(f"  [SUCESSO] X-Custom-ID encontrado: {cabecalhos['X-Custom-ID']}")
-                    if cabecalhos['X-Custom-ID'] == ID_CUSTOMIZADO:
+                cabecalhos = resultado.get('cabecalhos', {})  #Nomes em minúsculas
+                if 'x-custom-id' in cabecalhos:
+                    print(f"  [SUCESSO] X-Custom-ID encontrado: {cabecalhos['x-custom-id']}")
+                    if cabecalhos['x-custom-id'] == ID_CUSTOMIZADO:
                         print(f"  [SUCESSO] ID correto!")
                     else:
                         print(f"  [AVISO] ID diferente do esperado")
@@ -329,12 +881,31 @@ class TestadorProjeto:
             else:
                 print(f"  [ERRO] Falha na requisição")
     
-    def teste_concorrencia(self, ambiente='docker'):
+    def teste_concorrencia(self, ambiente='docker', gerador='threads', num_clientes=5, num_processos=1):
         #Executa teste de concorrência básico
         print("\n=== Teste de Concorrência ===")
         
         servidores = self.servidores_docker if ambiente == 'docker' else self.servidores_local
         
+        for tipo_servidor, endereco in servidores.items():
+            print(f"\n--- Servidor {tipo_servidor} ---")
+            
+            if ':' in endereco:
+                host, porta = endereco.split(':')
+            else:
+                host, porta = endereco, PORTA_SERVIDOR
+            
+            testador = criar_testador(host, int(porta), gerador=gerador, num_processos=num_processos)
+            resultado = testador.teste_concorrente(num_clientes, 3, 'GET', '/medio')
+            testador.gerar_relatorio(resultado)
+    
+    def teste_taxa_constante(self, ambiente='docker', taxa=50.0, duracao=10.0, caminho='/rapido',
+                             distribuicao='poisson', num_trabalhadores=TRABALHADORES_TAXA_CONSTANTE):
+        #Executa teste em malha aberta (taxa de chegada constante) em cada servidor
+        print("\n=== Teste de Taxa Constante (malha aberta) ===")
+        
+        servidores = self.servidores_docker if ambiente == 'docker' else self.servidores_local
+        
         for tipo_servidor, endereco in servidores.items():
             print(f"\n--- Servidor {tipo_servidor} ---")
             
@@ -344,7 +915,7 @@ class TestadorProjeto:
                 host, porta = endereco, PORTA_SERVIDOR
             
             testador = TestadorCarga(host, int(porta))
-            resultado = testador.teste_concorrente(5, 3, 'GET', '/medio')
+            resultado = testador.teste_taxa_constante(taxa, duracao, 'GET', caminho, distribuicao, num_trabalhadores)
             testador.gerar_relatorio(resultado)
     
     def executar_tudo(self, ambiente=None):
@@ -381,19 +952,49 @@ def main():
                        help='Executar apenas teste de concorrência')
     parser.add_argument('--completo', action='store_true',
                        help='Executar testes automatizados completos')
+    parser.add_argument('--pool-conexoes', action='store_true',
+                       help='Reutilizar conexões keep-alive do cliente nos testes de carga')
+    parser.add_argument('--gerador', choices=['threads', 'asyncio'], default='threads',
+                       help='Gerador de carga: uma thread ou uma corrotina por cliente simulado')
+    parser.add_argument('--clientes', type=int, nargs='+',
+                       help='Quantidades de clientes simultâneos (padrão: 1 5 10 20; no teste de concorrência, o primeiro valor)')
+    parser.add_argument('--processos', type=int, default=1,
+                       help='Processos geradores de carga (os clientes são divididos entre eles)')
+    parser.add_argument('--saida-jsonl', metavar='CAMINHO',
+                       help='Gravar cada requisição em JSON Lines durante o teste completo (memória constante)')
+    parser.add_argument('--manter-corpo', action='store_true',
+                       help='Incluir o corpo e os cabeçalhos das respostas nas linhas do --saida-jsonl')
+    parser.add_argument('--pipeline', type=int, default=1, metavar='PROFUNDIDADE',
+                       help='Requisições enviadas de uma vez por conexão no teste completo (pipelining HTTP/1.1)')
+    parser.add_argument('--taxa-constante', type=float, metavar='REQ_S',
+                       help='Executar teste em malha aberta com esta taxa de chegada (req/s)')
+    parser.add_argument('--duracao', type=float, default=10.0,
+                       help='Duração do teste de taxa constante em segundos')
+    parser.add_argument('--distribuicao', choices=['poisson', 'fixa'], default='poisson',
+                       help='Intervalos entre chegadas do teste de taxa constante')
+    parser.add_argument('--caminho', default='/rapido',
+                       help='Endpoint usado no teste de taxa constante')
+    parser.add_argument('--trabalhadores', type=int, default=TRABALHADORES_TAXA_CONSTANTE,
+                       help='Threads que enviam as requisições agendadas')
     
     args = parser.parse_args()
+    if args.taxa_constante is not None and (args.taxa_constante <= 0 or args.duracao <= 0):
+        parser.error("--taxa-constante e --duracao devem ser positivos")
     
     if args.completo:
         #Executar testes automatizados completos
-        testador_auto = TestadorAutomatizado()
+        testador_auto = TestadorAutomatizado(usar_pool=args.pool_conexoes, gerador=args.gerador,
+                                             clientes_teste=args.clientes, num_processos=args.processos,
+                                             saida_jsonl=args.saida_jsonl, manter_corpo=args.manter_corpo,
+                                             profundidade_pipeline=args.pipeline)
         testador_auto.executar_todos_testes()
     else:
         #Executar testes básicos
         testador = TestadorProjeto()
         
         #Se nenhum teste específico foi especificado, executar tudo
-        if not any([args.conectividade, args.endpoints, args.cabecalho, args.concorrencia]):
+        if not any([args.conectividade, args.endpoints, args.cabecalho, args.concorrencia,
+                    args.taxa_constante]):
             testador.executar_tudo(args.ambiente)
         else:
             #Detectar ambiente se não especificado
@@ -415,7 +1016,12 @@ def main():
                 testador.teste_validacao_cabecalho(ambiente)
             
             if args.concorrencia:
-                testador.teste_concorrencia(ambiente)
+                testador.teste_concorrencia(ambiente, args.gerador, args.clientes[0] if args.clientes else 5,
+                                            args.processos)
+            
+            if args.taxa_constante:
+                testador.teste_taxa_constante(ambiente, args.taxa_constante, args.duracao, args.caminho,
+                                              args.distribuicao, args.trabalhadores)
 
 if __name__ == "__main__":
     main()
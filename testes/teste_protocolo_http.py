@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+#Testes do ParserHTTP incremental (src/protocolo_http.py)
+#Execução: python3 testes/teste_protocolo_http.py
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from protocolo_http import ParserHTTP, ErroRequisicaoHTTP, negociar_keep_alive
+
+GET = b"GET /rapido HTTP/1.1\r\nHost: servidor\r\nX-Custom-ID: abc\r\n\r\n"
+POST = b"POST /dados HTTP/1.1\r\nHost: servidor\r\nContent-Length: 5\r\n\r\nola!!"
+
+class TesteParserHTTP(unittest.TestCase):
+    def assertErro(self, parser, codigo_status):
+        with self.assertRaises(ErroRequisicaoHTTP) as contexto:
+            parser.proxima_requisicao()
+        self.assertEqual(contexto.exception.codigo_status, codigo_status)
+
+    def test_requisicao_completa(self):
+        parser = ParserHTTP()
+        parser.alimentar(GET)
+        requisicao = parser.proxima_requisicao()
+        self.assertEqual((requisicao.metodo, requisicao.caminho, requisicao.versao), ('GET', '/rapido', 'HTTP/1.1'))
+        self.assertEqual(requisicao.cabecalhos['x-custom-id'], 'abc')
+        self.assertEqual(requisicao.tamanho, len(GET))
+        self.assertIsNone(parser.proxima_requisicao())
+        self.assertFalse(parser.tem_dados_pendentes())
+
+    def test_leituras_fragmentadas(self):
+        #Um byte por vez: o terminador e o corpo chegam partidos em qualquer posição
+        parser = ParserHTTP()
+        requisicoes = []
+        for byte in GET + POST:
+            parser.alimentar(bytes([byte]))
+            requisicao = parser.proxima_requisicao()
+            if requisicao is not None:
+                requisicoes.append(requisicao)
+        self.assertEqual([r.metodo for r in requisicoes], ['GET', 'POST'])
+        self.assertEqual(requisicoes[1].corpo, b"ola!!")
+
+    def test_pipeline_no_mesmo_pedaco(self):
+        parser = ParserHTTP()
+        parser.alimentar(GET * 3)
+        self.assertTrue(all(parser.proxima_requisicao() is not None for _ in range(3)))
+        self.assertIsNone(parser.proxima_requisicao())
+
+    def test_corpo_aguarda_content_length(self):
+        parser = ParserHTTP()
+        parser.alimentar(b"POST /dados HTTP/1.1\r\nContent-Length: 4\r\n\r\nab")
+        self.assertIsNone(parser.proxima_requisicao())
+        self.assertTrue(parser.tem_dados_pendentes())
+        parser.alimentar(b"cdGET")
+        self.assertEqual(parser.proxima_requisicao().corpo, b"abcd")
+        self.assertEqual(bytes(parser.buffer), b"GET")
+
+    def test_cabecalho_acima_do_limite(self):
+        #Sem terminador e acima do limite, e com terminador depois do limite
+        parser = ParserHTTP(max_tamanho_cabecalho=64)
+        parser.alimentar(b"GET / HTTP/1.1\r\nX-Longo: " + b"a" * 100)
+        self.assertErro(parser, 431)
+
+        parser = ParserHTTP(max_tamanho_cabecalho=64)
+        parser.alimentar(b"GET / HTTP/1.1\r\nX-Longo: " + b"a" * 100 + b"\r\n\r\n")
+        self.assertErro(parser, 431)
+
+    def test_cabecalho_no_limite(self):
+        parser = ParserHTTP(max_tamanho_cabecalho=len(GET) - 4)
+        parser.alimentar(GET)
+        self.assertIsNotNone(parser.proxima_requisicao())
+
+    def test_corpo_acima_do_limite(self):
+        parser = ParserHTTP(max_tamanho_corpo=10)
+        parser.alimentar(b"POST /dados HTTP/1.1\r\nContent-Length: 11\r\n\r\n")
+        self.assertErro(parser, 413)
+
+    def test_content_length_invalido(self):
+        for valor in (b"abc", b"-1", b"1.5", b"", b"\xb2", b"\xb9\xb2", b"\xd9\xa3"):
+            with self.subTest(valor=valor):
+                parser = ParserHTTP()
+                parser.alimentar(b"POST /dados HTTP/1.1\r\nContent-Length: " + valor + b"\r\n\r\n")
+                self.assertErro(parser, 400)
+
+    def test_linha_de_requisicao_invalida(self):
+        for linha in (b"GET /", b"GET / FTP/1.0", b"GET / HTTP/1.1 extra"):
+            with self.subTest(linha=linha):
+                parser = ParserHTTP()
+                parser.alimentar(linha + b"\r\n\r\n")
+                self.assertErro(parser, 400)
+
+    def test_cabecalho_sem_dois_pontos(self):
+        parser = ParserHTTP()
+        parser.alimentar(b"GET / HTTP/1.1\r\nHost servidor\r\n\r\n")
+        self.assertErro(parser, 400)
+
+    def test_transfer_encoding(self):
+        parser = ParserHTTP()
+        parser.alimentar(b"POST /dados HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n")
+        self.assertErro(parser, 501)
+
+class TesteNegociarKeepAlive(unittest.TestCase):
+    def test_parametros_do_cliente(self):
+        tempo_limite, restantes = negociar_keep_alive('HTTP/1.1', {'keep-alive': 'timeout=1, max=3'}, 1)
+        self.assertEqual((tempo_limite, restantes), (1, 2))
+
+    def test_parametro_invalido_e_ignorado(self):
+        #'²' passa em isdigit() mas não em int(): a requisição não pode virar 500
+        padrao = negociar_keep_alive('HTTP/1.1', {}, 0)
+        for valor in ('timeout=\xb2', 'timeout=-1', 'max=\xb9', 'timeout', 'max=1.5'):
+            with self.subTest(valor=valor):
+                self.assertEqual(negociar_keep_alive('HTTP/1.1', {'keep-alive': valor}, 0), padrao)
+
+    def test_connection_close_e_http_1_0(self):
+        self.assertIsNone(negociar_keep_alive('HTTP/1.1', {'connection': 'close'}, 0))
+        self.assertIsNone(negociar_keep_alive('HTTP/1.0', {}, 0))
+        self.assertIsNotNone(negociar_keep_alive('HTTP/1.0', {'connection': 'keep-alive'}, 0))
+
+if __name__ == "__main__":
+    unittest.main()
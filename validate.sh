@@ -61,13 +61,22 @@ test_dir "testes" "Diretório testes"
 test_file "src/configuracao.py" "Configuração"
 test_file "src/servidor_sequencial.py" "Servidor sequencial"
 test_file "src/servidor_concorrente.py" "Servidor concorrente"
+test_file "src/servidor_assincrono.py" "Servidor assíncrono"
+test_file "src/servidor_prefork.py" "Servidor pre-fork"
+test_file "src/servidor_eventos.py" "Servidor de eventos"
 test_file "src/cliente.py" "Cliente HTTP"
 test_file "docker/Dockerfile.sequencial" "Dockerfile Sequencial"
 test_file "docker/Dockerfile.concorrente" "Dockerfile Concorrente"
+test_file "docker/Dockerfile.assincrono" "Dockerfile Assíncrono"
+test_file "docker/Dockerfile.prefork" "Dockerfile Pre-fork"
+test_file "docker/Dockerfile.eventos" "Dockerfile Eventos"
 test_file "docker/Dockerfile.cliente" "Dockerfile Cliente"
 test_file "docker/docker-compose.yml" "Docker Compose"
 test_file "testes/teste_completo.py" "Testes completos"
 test_file "testes/analisar_resultados.py" "Análise de resultados"
+test_file "testes/orquestrador_local.py" "Testes locais sem Docker"
+test_file "testes/teste_analisar_resultados.py" "Testes da análise de resultados"
+test_file "testes/teste_protocolo_http.py" "Testes do parser HTTP"
 test_file "run_project.sh" "Script principal"
 test_file "requisitos.txt" "Requirements"
 